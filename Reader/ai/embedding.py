@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
 import numpy as np
-from . import logger, monitor, model
+from . import logger, model
+from ..monitoring import monitor
 
 class EmbeddingPipeline:
     def __init__(self):
@@ -18,6 +19,7 @@ class EmbeddingPipeline:
             monitor.track_error("EmbeddingPipeline", str(e))
             raise
 
+    @monitor.timer("ai.process_text")
     async def process_text(self, text: str) -> Dict[str, Any]:
         """Process text and generate embeddings and metadata."""
         if not self.initialized:
@@ -45,7 +47,6 @@ class EmbeddingPipeline:
             }
 
             self.logger.info("Text processed successfully")
-            monitor.track_request(0)  # Track pipeline operation
             return result
         except Exception as e:
             self.logger.error(f"Error processing text: {str(e)}")
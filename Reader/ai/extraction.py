@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional
-from . import logger, monitor, model, pipeline
+from . import logger, model, pipeline
+from ..monitoring import monitor
 
 class ExtractionSystem:
     def __init__(self):
@@ -17,6 +18,7 @@ class ExtractionSystem:
             monitor.track_error("ExtractionSystem", str(e))
             raise
 
+    @monitor.timer("ai.extract_from_document")
     async def extract_from_document(self, document_path: str) -> Dict[str, Any]:
         """Extract information from a document."""
         if not self.initialized:
@@ -39,7 +41,6 @@ class ExtractionSystem:
             }
 
             self.logger.info(f"Document extracted: {document_path}")
-            monitor.track_request(0)  # Track extraction operation
             return result
         except Exception as e:
             self.logger.error(f"Error extracting document: {str(e)}")
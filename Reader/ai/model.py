@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
 import numpy as np
-from . import logger, monitor
+from . import logger
+from ..monitoring import monitor
 from transformers import pipeline, AutoTokenizer, AutoModel
 import torch
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -9,6 +10,8 @@ import nltk
 from nltk.tokenize import sent_tokenize
 from nltk.corpus import stopwords
 import re
+from ..session_store import feature_matrix, session_store
+from ..tracing import tracer
 
 class AIModel:
     def __init__(self, model_name: str = "default"):
@@ -47,6 +50,8 @@ class AIModel:
             monitor.track_error("AIModel", str(e))
             raise
 
+    @tracer.traced("ai.model.process_document")
+    @monitor.timer("ai.process_document")
     async def process_document(self, document_path: str) -> Dict[str, Any]:
         """Process a document and extract relevant information."""
         if not self.initialized:
@@ -86,13 +91,13 @@ class AIModel:
             }
             
             self.logger.info(f"Document processed: {document_path}")
-            monitor.track_request(0)  # Track AI operation
             return result
         except Exception as e:
             self.logger.error(f"Error processing document: {str(e)}")
             monitor.track_error("AIModel", str(e))
             raise
 
+    @tracer.traced("ai.model.generate_embeddings")
     async def generate_embeddings(self, text: str) -> np.ndarray:
         """Generate embeddings for a given text."""
         try:
@@ -109,6 +114,7 @@ class AIModel:
             self.logger.error(f"Error generating embeddings: {str(e)}")
             raise
 
+    @tracer.traced("ai.model.analyze_reading_patterns")
     async def analyze_reading_patterns(self, analytics: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze reading patterns from document analytics."""
         try:
@@ -183,7 +189,19 @@ class AIModel:
         return max(1, len(words) // 200)  # Assuming 200 words per minute
 
     def _extract_features(self, analytics: Dict[str, Any]) -> np.ndarray:
-        """Extract features from analytics data."""
+        """Extract features from analytics data.
+
+        Without an explicit ``reading_sessions`` list, the sessions of the
+        analytics' user and document are read from the session store.
+        """
+        if "reading_sessions" not in analytics and (
+            analytics.get("user_id") is not None or analytics.get("document_id") is not None
+        ):
+            return feature_matrix(session_store.scan(
+                user_id=analytics.get("user_id"),
+                document_id=analytics.get("document_id")
+            ))
+
         features = []
         for session in analytics.get('reading_sessions', []):
             features.append([
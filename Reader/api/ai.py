@@ -1,25 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 from .. import models, schemas
 from ..ai.interface import ai_pipeline
 from ..auth import session_manager
-from ..database import get_db
+from ..database import get_async_db
 
 router = APIRouter()
 
 @router.post("/documents/{document_id}/process")
 async def process_document(
     document_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(session_manager.get_current_user)
 ):
     """Process a document using AI."""
     # Get document from database
-    document = db.query(models.Document).filter(
-        models.Document.id == document_id,
-        models.Document.user_id == current_user.id
-    ).first()
+    document = (await db.execute(
+        select(models.Document).where(
+            models.Document.id == document_id,
+            models.Document.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not document:
         raise HTTPException(
@@ -39,22 +42,24 @@ async def process_document(
     # Update document in database
     document.analysis = result["analysis"]
     document.embeddings = result["embeddings"]
-    db.commit()
+    await db.commit()
     
     return result
 
 @router.get("/documents/{document_id}/analysis")
 async def get_document_analysis(
     document_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(session_manager.get_current_user)
 ):
     """Get AI analysis for a document."""
     # Get document from database
-    document = db.query(models.Document).filter(
-        models.Document.id == document_id,
-        models.Document.user_id == current_user.id
-    ).first()
+    document = (await db.execute(
+        select(models.Document).where(
+            models.Document.id == document_id,
+            models.Document.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not document:
         raise HTTPException(
@@ -73,15 +78,17 @@ async def get_document_analysis(
 @router.post("/analytics/{analytics_id}/analyze")
 async def analyze_reading_session(
     analytics_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(session_manager.get_current_user)
 ):
     """Analyze a reading session using AI."""
     # Get analytics from database
-    analytics = db.query(models.DocumentAnalytics).filter(
-        models.DocumentAnalytics.id == analytics_id,
-        models.DocumentAnalytics.user_id == current_user.id
-    ).first()
+    analytics = (await db.execute(
+        select(models.DocumentAnalytics).where(
+            models.DocumentAnalytics.id == analytics_id,
+            models.DocumentAnalytics.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not analytics:
         raise HTTPException(
@@ -101,22 +108,24 @@ async def analyze_reading_session(
     # Update analytics in database
     analytics.patterns = result["patterns"]
     analytics.recommendations = result["recommendations"]
-    db.commit()
+    await db.commit()
     
     return result
 
 @router.get("/analytics/{analytics_id}/insights")
 async def get_reading_insights(
     analytics_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(session_manager.get_current_user)
 ):
     """Get AI insights for a reading session."""
     # Get analytics from database
-    analytics = db.query(models.DocumentAnalytics).filter(
-        models.DocumentAnalytics.id == analytics_id,
-        models.DocumentAnalytics.user_id == current_user.id
-    ).first()
+    analytics = (await db.execute(
+        select(models.DocumentAnalytics).where(
+            models.DocumentAnalytics.id == analytics_id,
+            models.DocumentAnalytics.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not analytics:
         raise HTTPException(
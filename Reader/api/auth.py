@@ -15,8 +15,6 @@ from models.schemas import (
     SuccessResponse
 )
 from utils.security import (
-    get_password_hash,
-    verify_password,
     create_access_token,
     get_current_user,
     get_current_active_user,
@@ -24,6 +22,9 @@ from utils.security import (
     log_security_event
 )
 from .. import models, schemas, crud
+from ..api_keys import hash_api_key, key_prefix
+from ..passwords import password_service
+from ..user_cache import token_cache
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -48,7 +49,7 @@ async def register_user(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_service.hash_async(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -75,7 +76,18 @@ async def login_for_access_token(
 ):
     """Login and get access token."""
     user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if user is None:
+        await password_service.dummy_verify_async()
+        verified = False
+    else:
+        verified, new_hash = await password_service.verify_and_update_async(
+            form_data.password, user.hashed_password
+        )
+        if verified and new_hash:
+            # Stored hash uses an old scheme or parameters; upgrade it now
+            user.hashed_password = new_hash
+            db.commit()
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -116,7 +128,8 @@ async def create_api_key_endpoint(
     # Create API key record
     db_api_key = APIKey(
         user_id=current_user.id,
-        key=key,
+        prefix=key_prefix(key),
+        key_hash=hash_api_key(key),
         name=api_key_data.name,
         description=api_key_data.description,
         expires_at=api_key_data.expires_at,
@@ -125,6 +138,8 @@ async def create_api_key_endpoint(
     db.add(db_api_key)
     db.commit()
     db.refresh(db_api_key)
+    # Plaintext is returned once, at creation, and never stored
+    db_api_key.key = key
     
     # Log security event
     log_security_event(
@@ -151,9 +166,11 @@ async def update_user(
     """Update current user information."""
     # Update user data
     current_user.email = user_update.email
-    current_user.hashed_password = get_password_hash(user_update.password)
+    current_user.hashed_password = await password_service.hash_async(user_update.password)
     db.commit()
     db.refresh(current_user)
+    # Cached snapshots still carry the old email; make every token re-resolve
+    token_cache.invalidate_user(current_user.id)
     
     # Log security event
     log_security_event(
@@ -178,7 +195,9 @@ async def delete_user(
     )
     
     # Delete user
+    user_id = current_user.id
     db.delete(current_user)
     db.commit()
+    token_cache.invalidate_user(user_id)
     
     return {"message": "User deleted successfully"} 
\ No newline at end of file
@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import hmac
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional, Tuple, Union
+
+from .cache_versions import InMemoryVersionStore, SharedVersion, VersionStore, version_store
+from .config import settings
+
+# Leading characters of a key stored in clear and indexed; the rest is only
+# ever stored as a salted hash
+PREFIX_LENGTH = 8
+
+
+def generate_api_key() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def key_prefix(key: str) -> str:
+    return key[:PREFIX_LENGTH]
+
+
+def hash_api_key(key: str, salt: Optional[str] = None) -> str:
+    """Salted HMAC-SHA256, encoded as ``sha256$salt$digest``.
+
+    Keys carry 256 bits of entropy, so a fast hash is enough; a slow password
+    hash would only add latency to every cache miss.
+    """
+    salt = salt or secrets.token_hex(16)
+    digest = hmac.new(bytes.fromhex(salt), key.encode(), hashlib.sha256).hexdigest()
+    return f"sha256${salt}${digest}"
+
+
+def verify_api_key(key: str, encoded: str) -> bool:
+    try:
+        _, salt, expected = encoded.split("$")
+    except ValueError:
+        return False
+    return hmac.compare_digest(hash_api_key(key, salt), encoded)
+
+
+def _to_epoch(value: Optional[datetime]) -> Optional[float]:
+    # Stored datetimes are naive UTC
+    return (value - datetime(1970, 1, 1)).total_seconds() if value else None
+
+
+@dataclass(frozen=True)
+class CachedAPIKey:
+    id: int
+    user_id: int
+    expires_at: Optional[float]  # epoch seconds
+
+    @classmethod
+    def from_orm(cls, api_key) -> "CachedAPIKey":
+        return cls(id=api_key.id, user_id=api_key.user_id, expires_at=_to_epoch(api_key.expires_at))
+
+    def is_expired(self, now: float) -> bool:
+        return self.expires_at is not None and self.expires_at <= now
+
+
+# Negative cache marker for keys known to be invalid
+INVALID = object()
+
+
+class APIKeyCache:
+    """LRU of validated keys with TTL, plus a smaller negative cache.
+
+    Entries are keyed by SHA-256 of the key so no plaintext is held. Each
+    entry records the cache ``version`` it was stored under; ``bump_version``
+    (on revoke, update or delete) makes every older entry stale at once,
+    without walking the cache. The version lives in a shared store, so other
+    workers drop their entries within ``CACHE_VERSION_REFRESH_SECONDS``.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_size: int = 10000,
+        negative_ttl: float = 10.0,
+        negative_max_size: int = 10000,
+        store: Optional[VersionStore] = None,
+        version_refresh: float = 0.5
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+        self.negative_max_size = negative_max_size
+        self.shared_version = SharedVersion("api_keys", store or InMemoryVersionStore(), version_refresh)
+        self._valid: "OrderedDict[str, Tuple[CachedAPIKey, float, int]]" = OrderedDict()
+        self._invalid: "OrderedDict[str, float]" = OrderedDict()
+
+    @property
+    def version(self) -> int:
+        return self.shared_version.value
+
+    @staticmethod
+    def digest(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, digest: str, now: Optional[float] = None) -> Union[CachedAPIKey, object, None]:
+        """Return the cached key, ``INVALID`` for a known bad key, or None on a miss."""
+        now = time.monotonic() if now is None else now
+        entry = self._valid.get(digest)
+        if entry is not None:
+            api_key, cached_at, version = entry
+            if version == self.version and now - cached_at < self.ttl:
+                self._valid.move_to_end(digest)
+                return api_key
+            del self._valid[digest]
+
+        cached_at = self._invalid.get(digest)
+        if cached_at is not None:
+            if now - cached_at < self.negative_ttl:
+                return INVALID
+            del self._invalid[digest]
+        return None
+
+    def put(self, digest: str, api_key: CachedAPIKey, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._invalid.pop(digest, None)
+        self._valid[digest] = (api_key, now, self.version)
+        self._valid.move_to_end(digest)
+        while len(self._valid) > self.max_size:
+            self._valid.popitem(last=False)
+
+    def put_invalid(self, digest: str, now: Optional[float] = None) -> None:
+        self._invalid[digest] = time.monotonic() if now is None else now
+        self._invalid.move_to_end(digest)
+        while len(self._invalid) > self.negative_max_size:
+            self._invalid.popitem(last=False)
+
+    def discard(self, digest: str) -> None:
+        self._valid.pop(digest, None)
+        self._invalid.pop(digest, None)
+
+    def bump_version(self) -> int:
+        """Invalidate every positive entry, on every worker; called when any key is revoked."""
+        return self.shared_version.bump()
+
+    def clear(self) -> None:
+        self._valid.clear()
+        self._invalid.clear()
+
+
+class APIKeyValidator:
+    """Validate keys against the cache, falling back to ``loader`` on a miss.
+
+    ``loader(key)`` runs in a worker thread and returns the matching active
+    key row (looked up by prefix, then hash-verified) or None.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[object]], cache: Optional[APIKeyCache] = None):
+        self.loader = loader
+        self.cache = cache or APIKeyCache()
+
+    async def validate(self, key: Optional[str]) -> Optional[CachedAPIKey]:
+        if not key:
+            return None
+        digest = self.cache.digest(key)
+        loop = asyncio.get_event_loop()
+        if self.cache.shared_version.due():
+            # Pick up revocations made on other workers, off the loop
+            await loop.run_in_executor(None, self.cache.shared_version.refresh)
+        cached = self.cache.get(digest)
+        if cached is INVALID:
+            return None
+        if cached is None:
+            version = self.cache.version
+            row = await loop.run_in_executor(None, self.loader, key)
+            if row is None:
+                self.cache.put_invalid(digest)
+                return None
+            cached = CachedAPIKey.from_orm(row)
+            # Skip caching if a revocation landed while the row was loading
+            if version == self.cache.version:
+                self.cache.put(digest, cached)
+        if cached.is_expired(time.time()):
+            self.cache.discard(digest)
+            return None
+        return cached
+
+
+# Create global API key cache instance
+api_key_cache = APIKeyCache(
+    ttl=settings.API_KEY_CACHE_TTL_SECONDS,
+    max_size=settings.API_KEY_CACHE_SIZE,
+    negative_ttl=settings.API_KEY_NEGATIVE_CACHE_TTL_SECONDS,
+    negative_max_size=settings.API_KEY_NEGATIVE_CACHE_SIZE,
+    store=version_store,
+    version_refresh=settings.CACHE_VERSION_REFRESH_SECONDS
+)
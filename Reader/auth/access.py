@@ -1,10 +1,24 @@
-from typing import List, Optional, Set
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import false, or_, select
 from sqlalchemy.orm import Session
-from . import logger, monitor, exceptions
+from . import logger, exceptions
+from ..cache_versions import SharedVersion, VersionStore, version_store
+from ..monitoring import monitor
 from .. import models, schemas
+from ..config import settings
+from ..user_cache import request_users
+
+class CompiledPermissions(NamedTuple):
+    """A user's effective permissions as bitmasks."""
+    mask: int
+    resources: Dict[Tuple[str, int], int]
+    version: int
+    compiled_at: float
 
 class AccessControl:
-    def __init__(self):
+    def __init__(self, store: Optional[VersionStore] = None):
         self.logger = logger.logger
         self.role_permissions: Dict[str, Set[str]] = {
             "admin": {
@@ -24,8 +38,111 @@ class AccessControl:
                 "view_public_collections"
             }
         }
+        self.cache_ttl = settings.PERMISSION_CACHE_TTL_SECONDS
+        self._cache: Dict[int, CompiledPermissions] = {}
+        # Bumped on every grant or revoke, by any worker
+        self.version = SharedVersion(
+            "permissions", store or version_store, settings.CACHE_VERSION_REFRESH_SECONDS
+        )
+        self._lock = threading.Lock()
+        self._compile_roles()
 
-    async def check_permission(
+    def _compile_roles(self) -> None:
+        """Assign each known permission a bit and precompute role masks."""
+        names = sorted(set().union(*self.role_permissions.values()))
+        self.permission_bits: Dict[str, int] = {name: 1 << i for i, name in enumerate(names)}
+        self.role_masks: Dict[str, int] = {
+            role: self._mask(perms) for role, perms in self.role_permissions.items()
+        }
+        with self._lock:
+            self._cache.clear()
+
+    def _mask(self, permissions: Iterable[str]) -> int:
+        mask = 0
+        for permission in permissions:
+            mask |= self.permission_bits.get(permission, 0)
+        return mask
+
+    def _get_user(self, db: Session, user_id: int):
+        """Load a user once per request, reusing the one auth already resolved."""
+        user = request_users.get(user_id)
+        if user is None:
+            user = db.query(models.User).filter(models.User.id == user_id).first()
+            request_users.add(user)
+        return user
+
+    def _role(self, user) -> Optional[str]:
+        # Users carry no role column: active accounts get "user", and anything
+        # beyond that is an explicit grant in the permissions table
+        return "user" if user.is_active else None
+
+    def _load_grants(self, db: Session, user_id: int) -> List[Tuple[str, Optional[int], Optional[str]]]:
+        return db.query(
+            models.Permission.permission,
+            models.Permission.resource_id,
+            models.Permission.resource_type
+        ).filter(models.Permission.user_id == user_id).all()
+
+    def compile_permissions(
+        self,
+        role: Optional[str],
+        grants: Iterable[Tuple[str, Optional[int], Optional[str]]],
+        version: int = 0
+    ) -> CompiledPermissions:
+        """Fold a role and explicit grants into global and per-resource masks."""
+        mask = self.role_masks.get(role, 0)
+        resources: Dict[Tuple[str, int], int] = {}
+        for permission, resource_id, resource_type in grants:
+            bit = self.permission_bits.get(permission, 0)
+            if not bit:
+                continue
+            if resource_id is None or resource_type is None:
+                mask |= bit
+            else:
+                key = (resource_type, resource_id)
+                resources[key] = resources.get(key, 0) | bit
+        return CompiledPermissions(mask, resources, version, time.monotonic())
+
+    def resolve(self, db: Session, user_id: int) -> Optional[CompiledPermissions]:
+        """Return a user's compiled permissions, recompiling when stale.
+
+        A grant or revoke on any worker is seen here within
+        ``CACHE_VERSION_REFRESH_SECONDS``; the TTL only bounds how long an
+        unchanged set is trusted.
+        """
+        version = self.version.get()
+        with self._lock:
+            compiled = self._cache.get(user_id)
+        if (
+            compiled is not None
+            and compiled.version == version
+            and time.monotonic() - compiled.compiled_at < self.cache_ttl
+        ):
+            return compiled
+
+        user = self._get_user(db, user_id)
+        if not user:
+            return None
+        compiled = self.compile_permissions(
+            self._role(user), self._load_grants(db, user_id), version
+        )
+        with self._lock:
+            # A grant or revoke during compilation bumps the version; drop this result
+            if self.version.value == version:
+                self._cache[user_id] = compiled
+        return compiled
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Discard compiled permissions here and, through the shared version, on every worker."""
+        with self._lock:
+            if user_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(user_id, None)
+        self.version.bump()
+
+    @monitor.timer("access.check_permission")
+    def has_permission(
         self,
         db: Session,
         user_id: int,
@@ -35,53 +152,136 @@ class AccessControl:
     ) -> bool:
         """Check if a user has a specific permission."""
         try:
-            user = db.query(models.User).filter(models.User.id == user_id).first()
-            if not user:
+            compiled = self.resolve(db, user_id)
+            if compiled is None:
                 return False
 
-            # Check role-based permissions
-            if user.role in self.role_permissions:
-                if permission in self.role_permissions[user.role]:
-                    return True
+            bit = self.permission_bits.get(permission, 0)
+            if compiled.mask & bit:
+                return True
 
             # Check resource-specific permissions
             if resource_id and resource_type:
-                if resource_type == "document":
-                    document = db.query(models.Document).filter(models.Document.id == resource_id).first()
-                    if document and document.owner_id == user_id:
-                        return True
-                elif resource_type == "collection":
-                    collection = db.query(models.Collection).filter(models.Collection.id == resource_id).first()
-                    if collection and collection.owner_id == user_id:
-                        return True
+                if compiled.resources.get((resource_type, resource_id), 0) & bit:
+                    return True
+                if resource_id in self._owned(db, user_id, resource_type, [resource_id]):
+                    return True
 
             self.logger.warning(f"Permission denied: {user_id} - {permission}")
-            monitor.track_request(0)  # Track permission check
             return False
         except Exception as e:
             self.logger.error(f"Error checking permission: {str(e)}")
             monitor.track_error("AccessControl", str(e))
             return False
 
+    async def check_permission(
+        self,
+        db: Session,
+        user_id: int,
+        permission: str,
+        resource_id: Optional[int] = None,
+        resource_type: Optional[str] = None
+    ) -> bool:
+        """``has_permission`` for async callers."""
+        return self.has_permission(db, user_id, permission, resource_id, resource_type)
+
+    def permitted(
+        self,
+        db: Session,
+        user_id: int,
+        permission: str,
+        resource_type: str,
+        resource_ids: Iterable[int]
+    ) -> Set[int]:
+        """Return the subset of resource_ids the user holds a permission on."""
+        try:
+            resource_ids = set(resource_ids)
+            compiled = self.resolve(db, user_id)
+            if compiled is None or not resource_ids:
+                return set()
+
+            bit = self.permission_bits.get(permission, 0)
+            if compiled.mask & bit:
+                return resource_ids
+
+            allowed = {
+                resource_id for resource_id in resource_ids
+                if compiled.resources.get((resource_type, resource_id), 0) & bit
+            }
+            remaining = resource_ids - allowed
+            if remaining:
+                allowed |= self._owned(db, user_id, resource_type, remaining)
+            return allowed
+        except Exception as e:
+            self.logger.error(f"Error checking permissions: {str(e)}")
+            monitor.track_error("AccessControl", str(e))
+            return set()
+
+    async def filter_permitted(
+        self,
+        db: Session,
+        user_id: int,
+        permission: str,
+        resource_type: str,
+        resource_ids: Iterable[int]
+    ) -> Set[int]:
+        """``permitted`` for async callers."""
+        return self.permitted(db, user_id, permission, resource_type, resource_ids)
+
+    def document_filter(self, db: Session, user_id: int, permission: str):
+        """SQL condition on documents joined to their project, matching those the user holds a permission on.
+
+        Returns None when the permission is held globally, so callers can
+        paginate permitted rows directly instead of filtering a page.
+        """
+        compiled = self.resolve(db, user_id)
+        if compiled is None:
+            return false()
+        if compiled.mask & self.permission_bits.get(permission, 0):
+            return None
+        granted = select(models.Permission.resource_id).where(
+            models.Permission.user_id == user_id,
+            models.Permission.permission == permission,
+            models.Permission.resource_type == "document"
+        )
+        return or_(models.Project.owner_id == user_id, models.Document.id.in_(granted))
+
+    def _owned(self, db: Session, user_id: int, resource_type: str, resource_ids: Iterable[int]) -> Set[int]:
+        """Ids among resource_ids owned by the user, in one query."""
+        resource_ids = list(resource_ids)
+        if resource_type == "document":
+            # Documents are owned through their project
+            query = db.query(models.Document.id).join(
+                models.Project, models.Project.id == models.Document.project_id
+            ).filter(models.Document.id.in_(resource_ids), models.Project.owner_id == user_id)
+        elif resource_type == "project":
+            query = db.query(models.Project.id).filter(
+                models.Project.id.in_(resource_ids), models.Project.owner_id == user_id
+            )
+        else:
+            return set()
+        return {row[0] for row in query.all()}
+
+    @monitor.timer("access.get_user_permissions")
     async def get_user_permissions(self, db: Session, user_id: int) -> Set[str]:
         """Get all permissions for a user."""
         try:
-            user = db.query(models.User).filter(models.User.id == user_id).first()
-            if not user:
+            compiled = self.resolve(db, user_id)
+            if compiled is None:
                 return set()
 
-            permissions = set()
-            if user.role in self.role_permissions:
-                permissions.update(self.role_permissions[user.role])
+            permissions = {
+                name for name, bit in self.permission_bits.items() if compiled.mask & bit
+            }
 
             self.logger.info(f"Retrieved permissions for user {user_id}")
-            monitor.track_request(0)  # Track permissions retrieval
             return permissions
         except Exception as e:
             self.logger.error(f"Error getting permissions: {str(e)}")
             monitor.track_error("AccessControl", str(e))
             return set()
 
+    @monitor.timer("access.grant_permission")
     async def grant_permission(
         self,
         db: Session,
@@ -105,15 +305,16 @@ class AccessControl:
             )
             db.add(permission_record)
             db.commit()
+            self.invalidate(user_id)
 
             self.logger.info(f"Granted permission {permission} to user {user_id}")
-            monitor.track_request(0)  # Track permission grant
             return True
         except Exception as e:
             self.logger.error(f"Error granting permission: {str(e)}")
             monitor.track_error("AccessControl", str(e))
             return False
 
+    @monitor.timer("access.revoke_permission")
     async def revoke_permission(
         self,
         db: Session,
@@ -134,9 +335,9 @@ class AccessControl:
             if permission_record:
                 db.delete(permission_record)
                 db.commit()
+                self.invalidate(user_id)
 
                 self.logger.info(f"Revoked permission {permission} from user {user_id}")
-                monitor.track_request(0)  # Track permission revocation
                 return True
             return False
         except Exception as e:
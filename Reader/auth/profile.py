@@ -1,12 +1,14 @@
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
-from . import logger, monitor, exceptions
+from . import logger, exceptions
+from ..monitoring import monitor
 from .. import models, schemas
 
 class ProfileManager:
     def __init__(self):
         self.logger = logger.logger
 
+    @monitor.timer("profile.get_profile")
     async def get_profile(self, db: Session, user_id: int) -> Optional[schemas.Profile]:
         """Get a user's profile."""
         try:
@@ -15,13 +17,13 @@ class ProfileManager:
                 return None
 
             self.logger.info(f"Retrieved profile for user {user_id}")
-            monitor.track_request(0)  # Track profile retrieval
             return schemas.Profile.from_orm(profile)
         except Exception as e:
             self.logger.error(f"Error getting profile: {str(e)}")
             monitor.track_error("Profile", str(e))
             raise exceptions.DatabaseError("Failed to get profile")
 
+    @monitor.timer("profile.create_profile")
     async def create_profile(
         self,
         db: Session,
@@ -39,13 +41,13 @@ class ProfileManager:
             db.refresh(profile)
 
             self.logger.info(f"Created profile for user {user_id}")
-            monitor.track_request(0)  # Track profile creation
             return schemas.Profile.from_orm(profile)
         except Exception as e:
             self.logger.error(f"Error creating profile: {str(e)}")
             monitor.track_error("Profile", str(e))
             raise exceptions.DatabaseError("Failed to create profile")
 
+    @monitor.timer("profile.update_profile")
     async def update_profile(
         self,
         db: Session,
@@ -65,13 +67,13 @@ class ProfileManager:
             db.refresh(profile)
 
             self.logger.info(f"Updated profile for user {user_id}")
-            monitor.track_request(0)  # Track profile update
             return schemas.Profile.from_orm(profile)
         except Exception as e:
             self.logger.error(f"Error updating profile: {str(e)}")
             monitor.track_error("Profile", str(e))
             raise exceptions.DatabaseError("Failed to update profile")
 
+    @monitor.timer("profile.delete_profile")
     async def delete_profile(self, db: Session, user_id: int) -> bool:
         """Delete a user's profile."""
         try:
@@ -83,13 +85,13 @@ class ProfileManager:
             db.commit()
 
             self.logger.info(f"Deleted profile for user {user_id}")
-            monitor.track_request(0)  # Track profile deletion
             return True
         except Exception as e:
             self.logger.error(f"Error deleting profile: {str(e)}")
             monitor.track_error("Profile", str(e))
             raise exceptions.DatabaseError("Failed to delete profile")
 
+    @monitor.timer("profile.update_preferences")
     async def update_preferences(
         self,
         db: Session,
@@ -110,7 +112,6 @@ class ProfileManager:
             db.refresh(profile)
 
             self.logger.info(f"Updated preferences for user {user_id}")
-            monitor.track_request(0)  # Track preferences update
             return schemas.Profile.from_orm(profile)
         except Exception as e:
             self.logger.error(f"Error updating preferences: {str(e)}")
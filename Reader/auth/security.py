@@ -5,18 +5,28 @@ import hmac
 import hashlib
 import time
 from ..config import settings
+from ..api_keys import APIKeyValidator, api_key_cache
+from ..database import SessionLocal
+from ..services.auth import AuthService
 
 api_key_header = APIKeyHeader(name="X-API-Key")
 
+def load_api_key(api_key: str):
+    """Look up an active API key row; runs in a worker thread on cache misses."""
+    db = SessionLocal()
+    try:
+        return AuthService(db).get_api_key_by_key(api_key)
+    finally:
+        db.close()
+
 class SecurityManager:
     def __init__(self):
-        self.api_keys = {}  # In production, store in database
+        self.api_key_validator = APIKeyValidator(load_api_key, api_key_cache)
         self.request_signatures = {}
     
     async def validate_api_key(self, api_key: str) -> bool:
-        """Validate API key."""
-        # In production, validate against database
-        return api_key in self.api_keys
+        """Validate API key; cache hits cost a SHA-256 and a dict lookup."""
+        return await self.api_key_validator.validate(api_key) is not None
     
     async def generate_request_signature(self, request: Request) -> str:
         """Generate request signature."""
@@ -1,15 +1,65 @@
-from typing import Optional, Dict, Any
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from . import logger, monitor, exceptions
+from . import logger, exceptions
+from ..monitoring import monitor
 from .. import models, schemas
 from ..config import settings
+from .session_backends import SessionBackend, create_session_backend
 
 class SessionManager:
-    def __init__(self):
+    """Sessions kept in a shared backend with a short-lived per-worker near cache.
+
+    Validation costs one dict lookup while the near cache entry is fresh,
+    and one backend GET otherwise. An invalidation on another worker is seen
+    within ``near_cache_ttl`` seconds. Refreshes are buffered and written to
+    the backend in batches, when the buffer fills or every
+    ``refresh_flush_interval`` seconds, whichever comes first; a refresh of a
+    session that would lapse before then is written through at once.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[SessionBackend] = None,
+        near_cache_ttl: float = settings.SESSION_NEAR_CACHE_TTL_SECONDS,
+        near_cache_size: int = 10000,
+        refresh_batch_size: int = settings.SESSION_REFRESH_BATCH_SIZE,
+        refresh_flush_interval: float = settings.SESSION_REFRESH_FLUSH_SECONDS
+    ):
         self.logger = logger.logger
-        self.active_sessions: Dict[str, Dict[str, Any]] = {}
+        self.backend = backend or create_session_backend(settings.SESSION_BACKEND, settings.REDIS_URL)
+        self.near_cache_ttl = near_cache_ttl
+        self.near_cache_size = near_cache_size
+        self.refresh_batch_size = refresh_batch_size
+        self.refresh_flush_interval = refresh_flush_interval
+        self._flusher: Optional[asyncio.Task] = None
+        self._near_cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._pending_refresh: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def ttl_seconds(self) -> int:
+        return settings.SESSION_EXPIRE_HOURS * 3600
+
+    def _cache_put(self, session_id: str, session_data: Dict[str, Any]) -> None:
+        self._near_cache[session_id] = (session_data, time.monotonic())
+        self._near_cache.move_to_end(session_id)
+        while len(self._near_cache) > self.near_cache_size:
+            self._near_cache.popitem(last=False)
+
+    def _cache_get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._near_cache.get(session_id)
+        if entry is None:
+            return None
+        session_data, cached_at = entry
+        if time.monotonic() - cached_at >= self.near_cache_ttl:
+            del self._near_cache[session_id]
+            return None
+        return session_data
 
+    @monitor.timer("session.create_session")
     async def create_session(
         self,
         db: Session,
@@ -38,10 +88,10 @@ class SessionManager:
                 "created_at": datetime.utcnow(),
                 "expires_at": db_session.expires_at
             }
-            self.active_sessions[str(db_session.id)] = session_data
+            await self.backend.set(str(db_session.id), session_data, self.ttl_seconds)
+            self._cache_put(str(db_session.id), session_data)
 
             self.logger.info(f"Created session for user {user.email}")
-            monitor.track_request(0)  # Track session creation
             return schemas.Session.from_orm(db_session)
         except Exception as e:
             self.logger.error(f"Error creating session: {str(e)}")
@@ -51,13 +101,17 @@ class SessionManager:
     async def validate_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Validate a session and return session data if valid."""
         try:
-            session_data = self.active_sessions.get(session_id)
-            if not session_data:
-                return None
+            # A buffered refresh is newer than anything cached or stored
+            session_data = self._pending_refresh.get(session_id) or self._cache_get(session_id)
+            if session_data is None:
+                session_data = await self.backend.get(session_id)
+                if not session_data:
+                    return None
+                self._cache_put(session_id, session_data)
 
             # Check if session is expired
             if datetime.utcnow() > session_data["expires_at"]:
-                del self.active_sessions[session_id]
+                await self.invalidate_session(session_id)
                 return None
 
             return session_data
@@ -66,30 +120,73 @@ class SessionManager:
             monitor.track_error("Session", str(e))
             return None
 
+    @monitor.timer("session.refresh_session")
     async def refresh_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Refresh an existing session."""
         try:
-            session_data = self.active_sessions.get(session_id)
+            session_data = await self.validate_session(session_id)
             if not session_data:
                 return None
 
-            # Update expiration time
-            new_expires_at = datetime.utcnow() + timedelta(hours=settings.SESSION_EXPIRE_HOURS)
-            session_data["expires_at"] = new_expires_at
+            # Update expiration time; the backend write is batched unless the
+            # stored expiry would lapse before the next scheduled flush
+            now = datetime.utcnow()
+            lapses_soon = session_data["expires_at"] - now <= timedelta(seconds=self.refresh_flush_interval)
+            session_data = dict(session_data, expires_at=now + timedelta(hours=settings.SESSION_EXPIRE_HOURS))
+            self._pending_refresh[session_id] = session_data
+            self._cache_put(session_id, session_data)
+            if lapses_soon or len(self._pending_refresh) >= self.refresh_batch_size:
+                await self.flush_refreshes()
 
             self.logger.info(f"Refreshed session {session_id}")
-            monitor.track_request(0)  # Track session refresh
             return session_data
         except Exception as e:
             self.logger.error(f"Error refreshing session: {str(e)}")
             monitor.track_error("Session", str(e))
             return None
 
+    async def flush_refreshes(self) -> int:
+        """Write buffered refreshes to the backend in one batch.
+
+        Sessions deleted meanwhile, on this worker or another, stay deleted.
+        """
+        pending, self._pending_refresh = self._pending_refresh, {}
+        if pending:
+            try:
+                await self.backend.refresh_many(pending, self.ttl_seconds)
+            except Exception:
+                # Keep them for the next flush unless refreshed again meanwhile
+                self._pending_refresh = {**pending, **self._pending_refresh}
+                raise
+        return len(pending)
+
+    def start_flusher(self):
+        """Flush refreshes and purge expired sessions periodically on the running loop."""
+        if self._flusher is None:
+            self._flusher = asyncio.get_event_loop().create_task(self._flush_periodically())
+
+    async def stop_flusher(self):
+        """Stop the periodic flush and write out whatever is still buffered."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.cleanup_expired_sessions()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.refresh_flush_interval)
+            await self.cleanup_expired_sessions()
+
     async def invalidate_session(self, session_id: str) -> bool:
         """Invalidate a session."""
         try:
-            if session_id in self.active_sessions:
-                del self.active_sessions[session_id]
+            self._near_cache.pop(session_id, None)
+            self._pending_refresh.pop(session_id, None)
+            if await self.backend.delete(session_id):
                 self.logger.info(f"Invalidated session {session_id}")
                 return True
             return False
@@ -99,18 +196,13 @@ class SessionManager:
             return False
 
     async def cleanup_expired_sessions(self):
-        """Clean up expired sessions."""
+        """Flush pending refreshes and purge anything the backend does not expire itself."""
         try:
-            current_time = datetime.utcnow()
-            expired_sessions = [
-                session_id for session_id, session_data in self.active_sessions.items()
-                if current_time > session_data["expires_at"]
-            ]
-            for session_id in expired_sessions:
-                del self.active_sessions[session_id]
+            await self.flush_refreshes()
+            purged = await self.backend.purge_expired()
             
-            if expired_sessions:
-                self.logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
+            if purged:
+                self.logger.info(f"Cleaned up {purged} expired sessions")
         except Exception as e:
             self.logger.error(f"Error cleaning up sessions: {str(e)}")
             monitor.track_error("Session", str(e))
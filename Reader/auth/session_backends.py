@@ -0,0 +1,152 @@
+import heapq
+import json
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+_DATETIME_FIELDS = ("created_at", "expires_at")
+
+
+def encode_session(data: Dict[str, Any]) -> str:
+    return json.dumps({
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in data.items()
+    })
+
+
+def decode_session(raw) -> Dict[str, Any]:
+    data = json.loads(raw)
+    for key in _DATETIME_FIELDS:
+        if data.get(key):
+            data[key] = datetime.fromisoformat(data[key])
+    return data
+
+
+class SessionBackend(ABC):
+    """Storage for session data shared by every worker.
+
+    Entries carry a TTL and disappear on their own when it lapses, so there
+    is nothing to scan for expired sessions.
+    """
+
+    @abstractmethod
+    async def set(self, session_id: str, data: Dict[str, Any], ttl_seconds: int) -> None:
+        """Store a session that expires after ``ttl_seconds``."""
+        pass
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return a live session, or None when missing or expired."""
+        pass
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> bool:
+        """Remove a session; True if it existed."""
+        pass
+
+    @abstractmethod
+    async def refresh_many(self, sessions: Dict[str, Dict[str, Any]], ttl_seconds: int) -> None:
+        """Overwrite several sessions and reset their TTL in one round trip.
+
+        Sessions no longer in the store are skipped, so a refresh buffered
+        before a logout cannot bring the session back.
+        """
+        pass
+
+    async def purge_expired(self) -> int:
+        """Drop expired entries the store does not expire natively."""
+        return 0
+
+
+class InMemorySessionBackend(SessionBackend):
+    """Single-process backend for development and tests."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+
+    async def set(self, session_id: str, data: Dict[str, Any], ttl_seconds: int) -> None:
+        self._store(session_id, encode_session(data), ttl_seconds)
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        raw, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[session_id]
+            return None
+        return decode_session(raw)
+
+    async def delete(self, session_id: str) -> bool:
+        return self._entries.pop(session_id, None) is not None
+
+    async def refresh_many(self, sessions: Dict[str, Dict[str, Any]], ttl_seconds: int) -> None:
+        now = time.monotonic()
+        for session_id, data in sessions.items():
+            entry = self._entries.get(session_id)
+            if entry is not None and entry[1] > now:
+                self._store(session_id, encode_session(data), ttl_seconds)
+
+    async def purge_expired(self) -> int:
+        """Pop expired entries off the heap: O(k log n) for k expired sessions."""
+        now = time.monotonic()
+        purged = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, session_id = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(session_id)
+            # Skip heap items superseded by a later set
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[session_id]
+                purged += 1
+        return purged
+
+    def _store(self, session_id: str, raw: str, ttl_seconds: int) -> None:
+        expires_at = time.monotonic() + ttl_seconds
+        self._entries[session_id] = (raw, expires_at)
+        heapq.heappush(self._expiry_heap, (expires_at, session_id))
+
+
+class RedisSessionBackend(SessionBackend):
+    """Backend for any client speaking the redis.asyncio command API.
+
+    Keys use Redis' own expiry, so every worker sees the same sessions and
+    expired ones vanish without a sweep.
+    """
+
+    def __init__(self, client, prefix: str = "session:"):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}"
+
+    async def set(self, session_id: str, data: Dict[str, Any], ttl_seconds: int) -> None:
+        await self.client.set(self._key(session_id), encode_session(data), ex=ttl_seconds)
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.get(self._key(session_id))
+        return decode_session(raw) if raw is not None else None
+
+    async def delete(self, session_id: str) -> bool:
+        return bool(await self.client.delete(self._key(session_id)))
+
+    async def refresh_many(self, sessions: Dict[str, Dict[str, Any]], ttl_seconds: int) -> None:
+        if not sessions:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for session_id, data in sessions.items():
+                # XX: only overwrite a key that still exists
+                pipe.set(self._key(session_id), encode_session(data), ex=ttl_seconds, xx=True)
+            await pipe.execute()
+
+
+def create_session_backend(backend: str, redis_url: Optional[str] = None) -> SessionBackend:
+    """Build the backend named by ``SESSION_BACKEND``."""
+    if backend == "redis":
+        from redis import asyncio as redis_asyncio
+        return RedisSessionBackend(redis_asyncio.from_url(redis_url))
+    if backend == "memory":
+        return InMemorySessionBackend()
+    raise ValueError(f"Unknown session backend: {backend}")
@@ -1,9 +1,9 @@
-from typing import List, Optional
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.services.versioning import VersioningService
-from app.schemas.version import DocumentVersion, VersionComparison
+from app.schemas.version import DocumentVersion, VersionComparison, VersionPage
 from app.core.auth import get_current_user
 
 router = APIRouter()
@@ -24,22 +24,22 @@ async def create_version(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/documents/{document_id}/versions", response_model=List[DocumentVersion])
-async def get_versions(
+@router.get("/documents/{document_id}/versions", response_model=VersionPage)
+def get_versions(
     document_id: str,
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(10, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user: str = Depends(get_current_user)
 ):
-    """Get all versions of a document."""
+    """Get versions of a document, newest first, one keyset page at a time."""
     try:
-        versions = versioning_service.get_versions(db, document_id, skip, limit)
-        return versions
-    except HTTPException as e:
-        raise e
+        items, next_cursor = VersioningService(db).get_versions(document_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/documents/{document_id}/versions/{version_id}", response_model=DocumentVersion)
 async def get_version(
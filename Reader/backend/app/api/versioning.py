@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
 from ..models.versioning import DocumentVersion, VersionList, VersionComparison
 from ..services.versioning import VersioningService
 from ..dependencies import get_current_user, get_versioning_service, get_db
-from ..schemas.version import VersionCreate, VersionResponse, VersionDiff
+from ..schemas.version import VersionCreate, VersionDiff, VersionPage, VersionResponse
 
 router = APIRouter(prefix="/api/versioning", tags=["versioning"])
 
@@ -26,15 +26,20 @@ async def create_version(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/documents/{document_id}/versions", response_model=List[VersionResponse])
-async def get_versions(
+@router.get("/documents/{document_id}/versions", response_model=VersionPage)
+def get_versions(
     document_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
     db = Depends(get_db)
 ):
-    """Get all versions of a document."""
+    """Get versions of a document, newest first, one keyset page at a time."""
     service = VersioningService(db)
-    versions = await service.get_versions(document_id)
-    return [VersionResponse.from_orm(v) for v in versions]
+    try:
+        items, next_cursor = service.get_versions(document_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/documents/{document_id}/versions/{version_id}", response_model=VersionResponse)
 async def get_version(
@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, UniqueConstraint
+from app.db.base_class import Base
+
+class DocumentPermission(Base):
+    """Model for a user's access level on a shared document"""
+    __tablename__ = "document_permissions"
+    __table_args__ = (
+        UniqueConstraint("document_id", "user_id", name="uq_document_permissions_document_user"),
+        Index("ix_document_permissions_user_id", "user_id"),
+    )
+
+    id = Column(String, primary_key=True, index=True)
+    document_id = Column(String, ForeignKey("documents.id"), nullable=False)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    level = Column(String, nullable=False)  # "read", "write", "admin"
+    granted_by = Column(String, ForeignKey("users.id"), nullable=False)
+    granted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
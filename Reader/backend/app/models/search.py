@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
@@ -17,6 +17,9 @@ class SearchResult(BaseModel):
 class SearchHistory(Base):
     """Model for search history"""
     __tablename__ = "search_history"
+    __table_args__ = (
+        Index("ix_search_history_user_id_created_at", "user_id", "created_at"),
+    )
     
     id = Column(String, primary_key=True, index=True)
     query = Column(String, nullable=False)
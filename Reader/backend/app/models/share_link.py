@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from app.db.base_class import Base
+
+class ShareLinkRecord(Base):
+    """Model for a persisted document share link"""
+    __tablename__ = "share_links"
+    __table_args__ = (
+        Index("ix_share_links_expires_at", "expires_at"),
+    )
+
+    # SHA-256 of the link token; the token itself is never stored
+    token_hash = Column(String, primary_key=True)
+    document_id = Column(String, ForeignKey("documents.id"), nullable=False)
+    permission_level = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=True)
+    password_hash = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,10 +1,13 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
 class DocumentVersion(Base):
     __tablename__ = "document_versions"
+    __table_args__ = (
+        Index("ix_document_versions_document_id_version_number", "document_id", "version_number"),
+    )
     
     id = Column(String, primary_key=True, index=True)
     document_id = Column(String, ForeignKey("documents.id"), nullable=False)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Optional
+from typing import Optional
 from ..services.versioning import VersioningService
-from ..models.versioning import DocumentVersion, VersionList, VersionComparison
+from ..models.versioning import DocumentVersion, VersionComparison
+from ..schemas.version import VersionPage
 from ..dependencies import get_versioning_service
 
 router = APIRouter(prefix="/documents/{document_id}/versions", tags=["versioning"])
@@ -22,19 +23,23 @@ async def create_version(
         created_by=created_by
     )
 
-@router.get("", response_model=VersionList)
-async def get_versions(
+@router.get("", response_model=VersionPage)
+def get_versions(
     document_id: str,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 10,
     versioning_service: VersioningService = Depends(get_versioning_service)
 ):
-    """Get all versions of a document."""
-    return await versioning_service.get_versions(
-        document_id=document_id,
-        skip=skip,
-        limit=limit
-    )
+    """Get versions of a document, newest first, one keyset page at a time."""
+    try:
+        items, next_cursor = versioning_service.get_versions(
+            document_id=document_id,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/{version_id}", response_model=DocumentVersion)
 async def get_version(
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import Optional
 from ..services.versioning import VersioningService
-from ..models.versioning import DocumentVersion, VersionList, VersionComparison
+from ..models.versioning import DocumentVersion, VersionComparison
+from ..schemas.version import VersionPage
 from ..auth.auth import get_current_user
 
 router = APIRouter(prefix="/api/versions", tags=["versioning"])
@@ -26,23 +27,25 @@ async def create_version(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/{document_id}", response_model=VersionList)
-async def get_versions(
+@router.get("/{document_id}", response_model=VersionPage)
+def get_versions(
     document_id: str,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 10,
     versioning_service: VersioningService = Depends()
 ):
-    """Get all versions of a document."""
+    """Get versions of a document, newest first, one keyset page at a time."""
     try:
-        versions = await versioning_service.get_versions(
+        items, next_cursor = versioning_service.get_versions(
             document_id=document_id,
-            skip=skip,
+            cursor=cursor,
             limit=limit
         )
-        return versions
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/{document_id}/{version_id}", response_model=DocumentVersion)
 async def get_version(
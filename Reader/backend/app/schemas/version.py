@@ -55,6 +55,11 @@ class VersionResponse(VersionBase):
     class Config:
         orm_mode = True
 
+class VersionPage(BaseModel):
+    """One page of versions, newest first; pass next_cursor back as ?cursor=."""
+    items: List[VersionResponse]
+    next_cursor: Optional[str] = None
+
 class VersionDiff(BaseModel):
     version1_id: str
     version2_id: str
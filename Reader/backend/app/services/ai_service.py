@@ -3,6 +3,12 @@ from abc import ABC, abstractmethod
 from app.models.document import Document
 from app.core.config import settings
 
+try:
+    from opentelemetry import trace
+    _tracer = trace.get_tracer(__name__)
+except ImportError:  # tracing is optional
+    _tracer = None
+
 class AIService(ABC):
     """Abstract base class for AI services."""
     
@@ -37,11 +43,26 @@ class OpenAIService(AIService):
     def __init__(self):
         import openai
         self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+
+    async def _complete(self, operation: str, **request):
+        """Run one chat completion, inside a client span when OpenTelemetry is installed."""
+        if _tracer is None:
+            return await self.client.chat.completions.create(**request)
+        with _tracer.start_as_current_span(f"openai.{operation}", kind=trace.SpanKind.CLIENT) as span:
+            span.set_attribute("gen_ai.system", "openai")
+            span.set_attribute("gen_ai.request.model", request["model"])
+            response = await self.client.chat.completions.create(**request)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                span.set_attribute("gen_ai.usage.input_tokens", usage.prompt_tokens)
+                span.set_attribute("gen_ai.usage.output_tokens", usage.completion_tokens)
+            return response
     
     async def summarize_document(self, document: Document, max_length: int = 500) -> str:
         """Generate a summary using OpenAI's GPT model."""
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._complete(
+                "summarize_document",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that summarizes documents."},
@@ -56,7 +77,8 @@ class OpenAIService(AIService):
     async def extract_keywords(self, document: Document, num_keywords: int = 10) -> List[str]:
         """Extract keywords using OpenAI's GPT model."""
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._complete(
+                "extract_keywords",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that extracts keywords from documents."},
@@ -72,7 +94,8 @@ class OpenAIService(AIService):
     async def analyze_sentiment(self, document: Document) -> Dict[str, float]:
         """Analyze sentiment using OpenAI's GPT model."""
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._complete(
+                "analyze_sentiment",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that analyzes document sentiment."},
@@ -87,7 +110,8 @@ class OpenAIService(AIService):
     async def classify_document(self, document: Document) -> List[Dict[str, float]]:
         """Classify document using OpenAI's GPT model."""
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._complete(
+                "classify_document",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that classifies documents."},
@@ -102,7 +126,8 @@ class OpenAIService(AIService):
     async def get_entities(self, document: Document) -> List[Dict[str, str]]:
         """Extract named entities using OpenAI's GPT model."""
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._complete(
+                "get_entities",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that extracts named entities from documents."},
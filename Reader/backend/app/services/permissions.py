@@ -1,8 +1,19 @@
-from typing import Dict, List, Optional
+import asyncio
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
 from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
 from app.models.document import Document
+from app.models.permission import DocumentPermission
 from app.models.user import User
 from app.services.base import BaseService
+from app.services.share_links import ShareLinkStore, hash_password, parse_expiry, verify_password
 
 class Permission(BaseModel):
     user_id: str
@@ -15,14 +26,85 @@ class ShareLink(BaseModel):
     document_id: str
     token: str
     expires_at: Optional[str]
-    password: Optional[str]
+    password_protected: bool = False
     permission_level: str
 
 class PermissionService(BaseService):
-    def __init__(self):
-        self.permissions: Dict[str, List[Permission]] = {}
-        self.share_links: Dict[str, ShareLink] = {}
-        
+    """Document permissions stored in the database behind an in-memory index.
+
+    ``_index`` maps document_id -> {user_id: Permission}, so a check is two
+    dict lookups. Documents are hydrated from the database on first use and
+    again after ``cache_ttl`` seconds, which bounds how long a grant made by
+    another worker stays invisible. The index is an LRU of at most
+    ``max_documents`` documents. Writes go to the database first and only
+    then to the index.
+
+    A session passed in stays the caller's; one opened here is closed by
+    ``close``.
+    """
+
+    def __init__(self, db: Optional[Session] = None, cache_ttl: float = 60.0, max_documents: int = 100_000):
+        self._owns_db = db is None
+        self.db = db if db is not None else SessionLocal()
+        self.cache_ttl = cache_ttl
+        self.max_documents = max_documents
+        self._index: "OrderedDict[str, Dict[str, Permission]]" = OrderedDict()
+        self._hydrated_at: Dict[str, float] = {}
+        self.share_links = ShareLinkStore(self.db)
+
+    async def close(self) -> None:
+        """Stop the share link sweeper and release a session opened here."""
+        await self.share_links.stop_sweeper()
+        if self._owns_db:
+            self.db.close()
+
+    def _hydrate(self, document_ids: Iterable[str]) -> Dict[str, Dict[str, Permission]]:
+        """Permissions for each document, loading missing or stale ones in one query."""
+        document_ids = set(document_ids)
+        now = time.monotonic()
+        stale = [
+            document_id for document_id in document_ids
+            if now - self._hydrated_at.get(document_id, float("-inf")) >= self.cache_ttl
+        ]
+        if stale:
+            rows = self.db.query(DocumentPermission).filter(
+                DocumentPermission.document_id.in_(stale)
+            ).all()
+            for document_id in stale:
+                self._index[document_id] = {}
+                self._hydrated_at[document_id] = now
+            for row in rows:
+                self._index[row.document_id][row.user_id] = self._to_permission(row)
+
+        found = {}
+        for document_id in document_ids:
+            self._index.move_to_end(document_id)
+            found[document_id] = self._index[document_id]
+        while len(self._index) > self.max_documents:
+            evicted, _ = self._index.popitem(last=False)
+            del self._hydrated_at[evicted]
+        return found
+
+    def _to_permission(self, row: DocumentPermission) -> Permission:
+        return Permission(
+            user_id=row.user_id,
+            document_id=row.document_id,
+            level=row.level,
+            granted_by=row.granted_by,
+            granted_at=str(row.granted_at)
+        )
+
+    def _find_permission(self, document_id: str, user_id: str) -> Optional[DocumentPermission]:
+        return self.db.query(DocumentPermission).filter(
+            DocumentPermission.document_id == document_id,
+            DocumentPermission.user_id == user_id
+        ).first()
+
+    def _apply_grant(self, row: DocumentPermission, level: str, granted_by: User) -> None:
+        row.level = level
+        row.granted_by = granted_by.id
+        row.granted_at = datetime.utcnow()
+
     async def grant_permission(
         self,
         document: Document,
@@ -30,19 +112,27 @@ class PermissionService(BaseService):
         level: str,
         granted_by: User
     ) -> Permission:
-        """Grant permission to a user for a document."""
-        permission = Permission(
-            user_id=user.id,
-            document_id=document.id,
-            level=level,
-            granted_by=granted_by.id,
-            granted_at=str(datetime.utcnow())
-        )
-        
-        if document.id not in self.permissions:
-            self.permissions[document.id] = []
-        
-        self.permissions[document.id].append(permission)
+        """Grant permission to a user for a document, replacing any existing level."""
+        row = self._find_permission(document.id, user.id)
+        if row is None:
+            row = DocumentPermission(
+                id=str(uuid.uuid4()),
+                document_id=document.id,
+                user_id=user.id
+            )
+            self.db.add(row)
+        self._apply_grant(row, level, granted_by)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # A concurrent grant inserted this (document, user) first; update its row
+            self.db.rollback()
+            row = self._find_permission(document.id, user.id)
+            self._apply_grant(row, level, granted_by)
+            self.db.commit()
+
+        permission = self._to_permission(row)
+        self._hydrate([document.id])[document.id][user.id] = permission
         return permission
     
     async def revoke_permission(
@@ -51,20 +141,21 @@ class PermissionService(BaseService):
         user: User
     ) -> bool:
         """Revoke a user's permission for a document."""
-        if document.id in self.permissions:
-            self.permissions[document.id] = [
-                p for p in self.permissions[document.id]
-                if p.user_id != user.id
-            ]
-            return True
-        return False
+        removed = self.db.query(DocumentPermission).filter(
+            DocumentPermission.document_id == document.id,
+            DocumentPermission.user_id == user.id
+        ).delete(synchronize_session=False)
+        self.db.commit()
+
+        self._index.get(document.id, {}).pop(user.id, None)
+        return removed > 0
     
     async def get_permissions(
         self,
         document: Document
     ) -> List[Permission]:
         """Get all permissions for a document."""
-        return self.permissions.get(document.id, [])
+        return list(self._hydrate([document.id])[document.id].values())
     
     async def check_permission(
         self,
@@ -73,16 +164,23 @@ class PermissionService(BaseService):
         required_level: str
     ) -> bool:
         """Check if a user has the required permission level."""
-        if document.id not in self.permissions:
-            return False
-            
-        for permission in self.permissions[document.id]:
-            if permission.user_id == user.id:
-                return self._is_level_sufficient(
-                    permission.level,
-                    required_level
-                )
-        return False
+        permission = self._hydrate([document.id])[document.id].get(user.id)
+        return permission is not None and self._is_level_sufficient(permission.level, required_level)
+
+    async def check_permissions(
+        self,
+        user: User,
+        document_ids: List[str],
+        required_level: str = "read"
+    ) -> List[str]:
+        """Return the document ids, in order, the user may access at ``required_level``."""
+        index = self._hydrate(document_ids)
+        allowed = []
+        for document_id in document_ids:
+            permission = index[document_id].get(user.id)
+            if permission is not None and self._is_level_sufficient(permission.level, required_level):
+                allowed.append(document_id)
+        return allowed
     
     async def create_share_link(
         self,
@@ -92,17 +190,26 @@ class PermissionService(BaseService):
         password: Optional[str] = None
     ) -> ShareLink:
         """Create a shareable link for a document."""
+        self.share_links.start_sweeper()
         token = self._generate_token()
-        share_link = ShareLink(
+        password_hash = None
+        if password:
+            # PBKDF2 is deliberately slow; keep it off the event loop
+            password_hash = await asyncio.get_event_loop().run_in_executor(None, hash_password, password)
+        self.share_links.add(
+            token,
+            document_id=document.id,
+            permission_level=permission_level,
+            expires_at=parse_expiry(expires_at),
+            password_hash=password_hash
+        )
+        return ShareLink(
             document_id=document.id,
             token=token,
             expires_at=expires_at,
-            password=password,
+            password_protected=bool(password),
             permission_level=permission_level
         )
-        
-        self.share_links[token] = share_link
-        return share_link
     
     async def validate_share_link(
         self,
@@ -110,20 +217,27 @@ class PermissionService(BaseService):
         password: Optional[str] = None
     ) -> Optional[ShareLink]:
         """Validate a share link and return the associated permission level."""
-        if token not in self.share_links:
-            return None
-            
-        share_link = self.share_links[token]
-        
-        # Check expiration
-        if share_link.expires_at and datetime.fromisoformat(share_link.expires_at) < datetime.utcnow():
+        self.share_links.start_sweeper()
+        link = self.share_links.get(token)
+        if link is None:
             return None
             
-        # Check password
-        if share_link.password and share_link.password != password:
+        # Check password in the threadpool, as PBKDF2 would block the event loop
+        if link.password_hash and not await asyncio.get_event_loop().run_in_executor(
+            None, verify_password, password, link.password_hash
+        ):
             return None
             
-        return share_link
+        return ShareLink(
+            document_id=link.document_id,
+            token=token,
+            expires_at=(
+                datetime.utcfromtimestamp(link.expires_at).isoformat()
+                if link.expires_at is not None else None
+            ),
+            password_protected=link.password_hash is not None,
+            permission_level=link.permission_level
+        )
     
     def _is_level_sufficient(self, user_level: str, required_level: str) -> bool:
         """Check if a user's permission level is sufficient."""
@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import heapq
+import hmac
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.logging import logger
+from app.db.session import SessionLocal
+from app.models.share_link import ShareLinkRecord
+
+PASSWORD_ITERATIONS = 200_000
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def hash_password(password: str) -> str:
+    """Salted PBKDF2-SHA256, encoded as ``pbkdf2_sha256$iterations$salt$digest``."""
+    salt = secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), PASSWORD_ITERATIONS)
+    return f"pbkdf2_sha256${PASSWORD_ITERATIONS}${salt}${digest.hex()}"
+
+def verify_password(password: Optional[str], encoded: str) -> bool:
+    if password is None:
+        return False
+    try:
+        _, iterations, salt, expected = encoded.split("$")
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(digest.hex(), expected)
+
+def parse_expiry(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp once, normalising to naive UTC for storage."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _to_epoch(value: Optional[datetime]) -> Optional[float]:
+    # Stored datetimes are naive UTC
+    return (value - datetime(1970, 1, 1)).total_seconds() if value else None
+
+@dataclass(frozen=True)
+class StoredShareLink:
+    token_hash: str
+    document_id: str
+    permission_level: str
+    expires_at: Optional[float]  # epoch seconds, parsed once at creation
+    password_hash: Optional[str] = None
+
+    def is_expired(self, now: float) -> bool:
+        return self.expires_at is not None and self.expires_at <= now
+
+class ShareLinkStore:
+    """Share links persisted in ``share_links`` with a bounded in-memory cache.
+
+    The cache is an LRU of at most ``max_cached`` links. A min-heap of
+    (expires_at, token_hash) lets a sweep drop expired cache entries in
+    O(k log n) for k expired links. The sweep also deletes expired rows through
+    the ``expires_at`` index, so neither memory nor the table grows with dead
+    links. That delete runs in a session from ``session_factory``, never the
+    caller's, and the background sweeper runs it in the default executor.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        max_cached: int = 100_000,
+        sweep_interval: float = 60.0,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.db = db
+        self.session_factory = session_factory
+        self.max_cached = max_cached
+        self.sweep_interval = sweep_interval
+        self._cache: "OrderedDict[str, StoredShareLink]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def add(
+        self,
+        token: str,
+        document_id: str,
+        permission_level: str,
+        expires_at: Optional[datetime] = None,
+        password: Optional[str] = None,
+        password_hash: Optional[str] = None
+    ) -> StoredShareLink:
+        """Persist a new link; ``expires_at`` is naive UTC.
+
+        Async callers pass a ``password_hash`` computed off the event loop
+        rather than a plain ``password``.
+        """
+        if password and password_hash is None:
+            password_hash = hash_password(password)
+        record = ShareLinkRecord(
+            token_hash=hash_token(token),
+            document_id=document_id,
+            permission_level=permission_level,
+            expires_at=expires_at,
+            password_hash=password_hash
+        )
+        self.db.add(record)
+        self.db.commit()
+
+        link = self._from_record(record)
+        self._cache_link(link)
+        return link
+
+    def get(self, token: str, now: Optional[float] = None) -> Optional[StoredShareLink]:
+        """Return a live link for ``token``, or None if unknown or expired."""
+        now = time.time() if now is None else now
+        token_hash = hash_token(token)
+
+        link = self._cache.get(token_hash)
+        if link is None:
+            record = self.db.query(ShareLinkRecord).filter(
+                ShareLinkRecord.token_hash == token_hash
+            ).first()
+            if record is None:
+                return None
+            link = self._from_record(record)
+            self._cache_link(link)
+        else:
+            self._cache.move_to_end(token_hash)
+
+        if link.is_expired(now):
+            self._cache.pop(token_hash, None)
+            return None
+        return link
+
+    def remove(self, token: str) -> bool:
+        token_hash = hash_token(token)
+        self._cache.pop(token_hash, None)
+        removed = self.db.query(ShareLinkRecord).filter(
+            ShareLinkRecord.token_hash == token_hash
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return removed > 0
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop expired links from the cache and the table; returns rows deleted."""
+        now = time.time() if now is None else now
+        self._sweep_cache(now)
+        return self._delete_expired(now)
+
+    def _sweep_cache(self, now: float) -> None:
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, token_hash = heapq.heappop(heap)
+            link = self._cache.get(token_hash)
+            if link is not None and link.expires_at == expires_at:
+                del self._cache[token_hash]
+
+    def _delete_expired(self, now: float) -> int:
+        db = self.session_factory()
+        try:
+            deleted = db.query(ShareLinkRecord).filter(
+                ShareLinkRecord.expires_at <= datetime.utcfromtimestamp(now)
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def start_sweeper(self) -> None:
+        """Run ``sweep`` every ``sweep_interval`` seconds on the running loop."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_event_loop().create_task(self._run_sweeper())
+
+    async def stop_sweeper(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    async def _run_sweeper(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                # The cache is only touched on the loop; the DELETE runs off it
+                now = time.time()
+                self._sweep_cache(now)
+                deleted = await loop.run_in_executor(None, self._delete_expired, now)
+                if deleted:
+                    logger.info(f"Swept {deleted} expired share links")
+            except Exception as e:
+                logger.error(f"Error sweeping share links: {str(e)}")
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _from_record(self, record: ShareLinkRecord) -> StoredShareLink:
+        return StoredShareLink(
+            token_hash=record.token_hash,
+            document_id=record.document_id,
+            permission_level=record.permission_level,
+            expires_at=_to_epoch(record.expires_at),
+            password_hash=record.password_hash
+        )
+
+    def _cache_link(self, link: StoredShareLink) -> None:
+        self._cache[link.token_hash] = link
+        self._cache.move_to_end(link.token_hash)
+        if link.expires_at is not None:
+            heapq.heappush(self._expiry_heap, (link.expires_at, link.token_hash))
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        # Entries evicted by the LRU leave stale heap items behind; rebuild
+        # once they outnumber live ones so the heap stays O(max_cached)
+        if len(self._expiry_heap) > 2 * max(len(self._cache), 1024):
+            self._expiry_heap = [
+                (cached.expires_at, token_hash)
+                for token_hash, cached in self._cache.items()
+                if cached.expires_at is not None
+            ]
+            heapq.heapify(self._expiry_heap)
@@ -1,7 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from ..models.version import DocumentVersion
 from ..schemas.version import VersionCreate, VersionResponse, VersionDiff
+from ..utils.pagination import decode_cursor, encode_cursor
 import uuid
 from datetime import datetime
 import difflib
@@ -35,12 +36,33 @@ class VersioningService:
 
         return VersionResponse.from_orm(db_version)
 
-    def get_versions(self, document_id: str, skip: int = 0, limit: int = 10) -> List[VersionResponse]:
-        versions = self.db.query(DocumentVersion).filter(
+    def get_versions(
+        self,
+        document_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 10
+    ) -> Tuple[List[VersionResponse], Optional[str]]:
+        """One page of versions, newest first, and the cursor for the next page.
+
+        Version numbers are unique per document, so the page seeks on
+        version_number alone and deep pages cost the same as the first.
+        """
+        query = self.db.query(DocumentVersion).filter(
             DocumentVersion.document_id == document_id
-        ).order_by(DocumentVersion.version_number.desc()).offset(skip).limit(limit).all()
-
-        return [VersionResponse.from_orm(version) for version in versions]
+        )
+        if cursor:
+            before_version, _ = decode_cursor(cursor)
+            if not isinstance(before_version, int):
+                raise ValueError("Invalid pagination cursor")
+            query = query.filter(DocumentVersion.version_number < before_version)
+        # One extra row tells us whether another page exists
+        versions = query.order_by(DocumentVersion.version_number.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(versions) > limit:
+            versions = versions[:limit]
+            next_cursor = encode_cursor(versions[-1].version_number, versions[-1].id)
+        return [VersionResponse.from_orm(version) for version in versions], next_cursor
 
     def get_version(self, document_id: str, version_id: str) -> Optional[VersionResponse]:
         version = self.db.query(DocumentVersion).filter(
@@ -0,0 +1,17 @@
+import base64
+import json
+from typing import Any, Tuple
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    """Encode a (sort_key, id) position as an opaque URL-safe cursor."""
+    payload = json.dumps([sort_value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """Decode a cursor produced by ``encode_cursor``; ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+    return sort_value, row_id
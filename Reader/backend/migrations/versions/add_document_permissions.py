@@ -0,0 +1,42 @@
+"""add the document_permissions table behind PermissionService
+
+The backend app keys users and documents by string ids, so this lives on
+its own ``backend`` branch rather than in the Reader chain, whose ids are
+integers.
+
+Revision ID: add_document_permissions
+Revises:
+Create Date: 2024-04-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_document_permissions'
+down_revision = None
+branch_labels = ('backend',)
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'document_permissions',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('document_id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('level', sa.String(), nullable=False),
+        sa.Column('granted_by', sa.String(), nullable=False),
+        sa.Column('granted_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['granted_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('document_id', 'user_id', name='uq_document_permissions_document_user')
+    )
+    op.create_index(op.f('ix_document_permissions_id'), 'document_permissions', ['id'], unique=False)
+    op.create_index('ix_document_permissions_user_id', 'document_permissions', ['user_id'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_document_permissions_user_id', table_name='document_permissions')
+    op.drop_index(op.f('ix_document_permissions_id'), table_name='document_permissions')
+    op.drop_table('document_permissions')
@@ -0,0 +1,33 @@
+"""add the share_links table behind ShareLinkStore
+
+Revision ID: add_share_links
+Revises: add_document_permissions
+Create Date: 2024-04-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_share_links'
+down_revision = 'add_document_permissions'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'share_links',
+        sa.Column('token_hash', sa.String(), nullable=False),
+        sa.Column('document_id', sa.String(), nullable=False),
+        sa.Column('permission_level', sa.String(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.Column('password_hash', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+        sa.PrimaryKeyConstraint('token_hash')
+    )
+    op.create_index('ix_share_links_expires_at', 'share_links', ['expires_at'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_share_links_expires_at', table_name='share_links')
+    op.drop_table('share_links')
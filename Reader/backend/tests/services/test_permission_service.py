@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from ..services.permissions import PermissionService
+
+def make_row(document_id, user_id, level):
+    return Mock(
+        document_id=document_id,
+        user_id=user_id,
+        level=level,
+        granted_by="owner",
+        granted_at=datetime(2024, 1, 1)
+    )
+
+@pytest.fixture
+def mock_db():
+    return Mock()
+
+@pytest.fixture
+def permission_service(mock_db):
+    return PermissionService(mock_db)
+
+def test_check_permission_hydrates_once(permission_service, mock_db):
+    mock_db.query.return_value.filter.return_value.all.return_value = [
+        make_row("doc1", "user1", "write")
+    ]
+    document = Mock(id="doc1")
+    user = Mock(id="user1")
+
+    assert asyncio.run(permission_service.check_permission(document, user, "read")) is True
+    assert asyncio.run(permission_service.check_permission(document, user, "admin")) is False
+    mock_db.query.return_value.filter.return_value.all.assert_called_once()
+
+def test_check_permissions_filters_in_one_query(permission_service, mock_db):
+    mock_db.query.return_value.filter.return_value.all.return_value = [
+        make_row("doc1", "user1", "read"),
+        make_row("doc3", "user1", "admin"),
+        make_row("doc2", "user2", "admin"),
+    ]
+    user = Mock(id="user1")
+
+    result = asyncio.run(permission_service.check_permissions(user, ["doc3", "doc2", "doc1"]))
+
+    assert result == ["doc3", "doc1"]
+    mock_db.query.return_value.filter.return_value.all.assert_called_once()
+
+def test_grant_permission_writes_through(permission_service, mock_db):
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+    mock_db.query.return_value.filter.return_value.all.return_value = []
+    document = Mock(id="doc1")
+    user = Mock(id="user1")
+
+    result = asyncio.run(permission_service.grant_permission(document, user, "write", Mock(id="owner")))
+
+    assert result.level == "write"
+    mock_db.add.assert_called_once()
+    mock_db.commit.assert_called_once()
+    assert asyncio.run(permission_service.check_permission(document, user, "write")) is True
+
+def test_concurrent_grant_updates_the_row_that_won(permission_service, mock_db):
+    from sqlalchemy.exc import IntegrityError
+
+    winner = make_row("doc1", "user1", "read")
+    mock_db.query.return_value.filter.return_value.first.side_effect = [None, winner]
+    mock_db.query.return_value.filter.return_value.all.return_value = []
+    mock_db.commit.side_effect = [IntegrityError("INSERT", {}, Exception("unique")), None]
+
+    result = asyncio.run(permission_service.grant_permission(
+        Mock(id="doc1"), Mock(id="user1"), "admin", Mock(id="owner")
+    ))
+
+    mock_db.rollback.assert_called_once()
+    assert winner.level == "admin"
+    assert result.level == "admin"
+    assert mock_db.commit.call_count == 2
+
+def test_share_link_passwords_are_checked_off_the_event_loop(permission_service, mock_db, monkeypatch):
+    from ..services import permissions
+
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+    threads = []
+    verify = permissions.verify_password
+
+    def verify_in_thread(password, encoded):
+        threads.append(threading.get_ident())
+        return verify(password, encoded)
+
+    monkeypatch.setattr(permissions, "verify_password", verify_in_thread)
+
+    async def scenario():
+        link = await permission_service.create_share_link(Mock(id="doc1"), "read", password="secret")
+        assert permission_service.share_links._sweeper is not None
+        assert await permission_service.validate_share_link(link.token, "wrong") is None
+        valid = await permission_service.validate_share_link(link.token, "secret")
+        await permission_service.share_links.stop_sweeper()
+        return valid
+
+    valid = asyncio.run(scenario())
+    assert valid.document_id == "doc1"
+    assert threading.get_ident() not in threads
+
+def test_index_is_bounded_to_max_documents(mock_db):
+    service = PermissionService(mock_db, max_documents=2)
+    mock_db.query.return_value.filter.return_value.all.return_value = [
+        make_row("doc1", "user1", "read"),
+        make_row("doc3", "user1", "read"),
+    ]
+    user = Mock(id="user1")
+
+    assert asyncio.run(service.check_permissions(user, ["doc1", "doc2", "doc3"])) == ["doc1", "doc3"]
+    assert len(service._index) == len(service._hydrated_at) == 2
+
+    asyncio.run(service.check_permission(Mock(id="doc4"), user, "read"))
+    assert len(service._index) == len(service._hydrated_at) == 2
+    assert "doc4" in service._index
+
+def test_close_releases_only_a_session_it_opened(mock_db, monkeypatch):
+    from ..services import permissions
+
+    asyncio.run(PermissionService(mock_db).close())
+    mock_db.close.assert_not_called()
+
+    owned = Mock()
+    monkeypatch.setattr(permissions, "SessionLocal", lambda: owned)
+    asyncio.run(PermissionService().close())
+    owned.close.assert_called_once()
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from ..services.share_links import ShareLinkStore, parse_expiry, verify_password
+
+@pytest.fixture
+def mock_db():
+    db = Mock()
+    db.query.return_value.filter.return_value.first.return_value = None
+    db.query.return_value.filter.return_value.delete.return_value = 0
+    return db
+
+@pytest.fixture
+def sweep_db():
+    db = Mock()
+    db.query.return_value.filter.return_value.delete.return_value = 0
+    return db
+
+@pytest.fixture
+def store(mock_db, sweep_db):
+    return ShareLinkStore(mock_db, session_factory=lambda: sweep_db)
+
+def test_password_is_hashed(store, mock_db):
+    link = store.add("token1", "doc1", "read", password="secret")
+
+    record = mock_db.add.call_args[0][0]
+    assert record.password_hash != "secret"
+    assert record.token_hash != "token1"
+    assert verify_password("secret", link.password_hash)
+    assert not verify_password("wrong", link.password_hash)
+    assert not verify_password(None, link.password_hash)
+
+def test_expired_link_is_rejected(store):
+    expires_at = datetime(2024, 1, 1, 12, 0)
+    store.add("token1", "doc1", "read", expires_at=expires_at)
+    epoch = (expires_at - datetime(1970, 1, 1)).total_seconds()
+
+    assert store.get("token1", now=epoch - 1).document_id == "doc1"
+    assert store.get("token1", now=epoch) is None
+
+def test_sweep_drops_only_expired_links(store, mock_db, sweep_db):
+    store.add("soon", "doc1", "read", expires_at=datetime(2024, 1, 1))
+    store.add("later", "doc2", "read", expires_at=datetime(2024, 6, 1))
+    store.add("never", "doc3", "read")
+    now = (datetime(2024, 2, 1) - datetime(1970, 1, 1)).total_seconds()
+
+    store.sweep(now=now)
+
+    assert len(store) == 2
+    assert store.get("later", now=now).document_id == "doc2"
+    # Rows are deleted through the sweeper's own session, never the caller's
+    sweep_db.query.return_value.filter.return_value.delete.assert_called_once()
+    sweep_db.close.assert_called_once()
+    mock_db.query.return_value.filter.return_value.delete.assert_not_called()
+
+def test_parse_expiry_normalises_to_utc():
+    assert parse_expiry("2024-01-01T12:00:00+02:00") == datetime(2024, 1, 1, 10, 0)
+    assert parse_expiry(None) is None
+
+def test_sweeper_deletes_off_the_event_loop(mock_db, sweep_db):
+    threads = []
+
+    def session_factory():
+        threads.append(threading.get_ident())
+        return sweep_db
+
+    store = ShareLinkStore(mock_db, sweep_interval=0.01, session_factory=session_factory)
+
+    async def scenario():
+        store.start_sweeper()
+        await asyncio.sleep(0.05)
+        await store.stop_sweeper()
+
+    asyncio.run(scenario())
+    assert threads
+    assert threading.get_ident() not in threads
@@ -0,0 +1,46 @@
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from ..services.versioning import VersioningService
+from ..utils.pagination import decode_cursor, encode_cursor
+
+def make_version(number):
+    return Mock(
+        id=f"v{number}",
+        document_id="doc1",
+        version_number=number,
+        content=f"Version {number}",
+        metadata={},
+        created_by="user1",
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 1)
+    )
+
+@pytest.fixture
+def mock_db():
+    return Mock()
+
+def test_page_returns_opaque_next_cursor(mock_db):
+    query = mock_db.query.return_value.filter.return_value
+    query.order_by.return_value.limit.return_value.all.return_value = [make_version(n) for n in (5, 4, 3)]
+
+    items, next_cursor = VersioningService(mock_db).get_versions("doc1", limit=2)
+
+    assert [item.version_number for item in items] == [5, 4]
+    assert decode_cursor(next_cursor) == (4, "v4")
+    query.order_by.return_value.limit.assert_called_once_with(3)
+
+def test_last_page_has_no_cursor_and_seeks_past_the_cursor(mock_db):
+    seek = mock_db.query.return_value.filter.return_value.filter.return_value
+    seek.order_by.return_value.limit.return_value.all.return_value = [make_version(3)]
+
+    items, next_cursor = VersioningService(mock_db).get_versions("doc1", cursor=encode_cursor(4, "v4"), limit=2)
+
+    assert [item.version_number for item in items] == [3]
+    assert next_cursor is None
+
+def test_malformed_cursor_is_rejected(mock_db):
+    with pytest.raises(ValueError):
+        VersioningService(mock_db).get_versions("doc1", cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        VersioningService(mock_db).get_versions("doc1", cursor=encode_cursor("4", "v4"))
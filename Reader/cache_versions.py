@@ -0,0 +1,124 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+from .config import settings
+
+
+class VersionStore(ABC):
+    """Named counters shared by every worker.
+
+    Caches stamp their entries with a counter's value and bump it on
+    invalidation; an entry stamped with an older value is stale everywhere.
+    """
+
+    # True when reads leave the process, so callers should not read on every hit
+    remote = False
+
+    @abstractmethod
+    def get(self, name: str) -> int:
+        """Return the counter's current value, 0 if it was never bumped."""
+        pass
+
+    @abstractmethod
+    def incr(self, name: str) -> int:
+        """Bump the counter and return its new value."""
+        pass
+
+
+class InMemoryVersionStore(VersionStore):
+    """Single-process store for development and tests."""
+
+    def __init__(self):
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+            return self._counters[name]
+
+
+class RedisVersionStore(VersionStore):
+    """Counters in Redis, bumped with INCR so concurrent bumps never collide."""
+
+    remote = True
+
+    def __init__(self, client, prefix: str = "version:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, name: str) -> int:
+        value = self.client.get(f"{self.prefix}{name}")
+        return int(value) if value is not None else 0
+
+    def incr(self, name: str) -> int:
+        return int(self.client.incr(f"{self.prefix}{name}"))
+
+
+def create_version_store(backend: str, redis_url: Optional[str] = None) -> VersionStore:
+    """Build the store named by ``CACHE_VERSION_BACKEND``."""
+    if backend == "redis":
+        import redis
+        return RedisVersionStore(redis.Redis.from_url(redis_url))
+    if backend == "memory":
+        return InMemoryVersionStore()
+    raise ValueError(f"Unknown cache version backend: {backend}")
+
+
+class SharedVersion:
+    """One counter in a ``VersionStore``, read at most every ``refresh_interval`` seconds.
+
+    A remote read is reused until the interval lapses, so a bump on another
+    worker is seen here within ``refresh_interval`` seconds; a bump made
+    through this object is seen at once.
+    """
+
+    def __init__(self, name: str, store: VersionStore, refresh_interval: float = 0.5):
+        self.name = name
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self._value = 0
+        self._read_at = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        """The last value read, without I/O; in-process stores are read directly."""
+        if not self.store.remote:
+            return self.store.get(self.name)
+        return self._value
+
+    def due(self) -> bool:
+        """True when the next ``get`` would read the remote store."""
+        return self.store.remote and time.monotonic() - self._read_at >= self.refresh_interval
+
+    def refresh(self) -> int:
+        value = self.store.get(self.name)
+        self._remember(value)
+        return value
+
+    def get(self) -> int:
+        if self.due():
+            return self.refresh()
+        return self.value
+
+    def bump(self) -> int:
+        value = self.store.incr(self.name)
+        self._remember(value)
+        return value
+
+    def _remember(self, value: int) -> None:
+        with self._lock:
+            # Never step back past a bump made here while a read was in flight
+            if value >= self._value:
+                self._value = value
+            self._read_at = time.monotonic()
+
+
+# Create global cache version store instance
+version_store = create_version_store(settings.CACHE_VERSION_BACKEND, settings.REDIS_URL)
@@ -4,7 +4,8 @@ import json
 import os
 from pathlib import Path
 from sqlalchemy.orm import Session
-from .. import models, schemas, logger, monitor, exceptions, storage
+from .. import models, schemas, logger, exceptions, storage
+from ..monitoring import monitor
 from ..auth import access_control
 
 class BackupManager:
@@ -13,7 +14,8 @@ class BackupManager:
         self.backup_dir.mkdir(exist_ok=True)
         self.logger = logger.logger
 
-    async def create_backup(
+    @monitor.timer("backup.create_backup")
+    def create_backup(
         self,
         db: Session,
         collection_id: int,
@@ -29,7 +31,7 @@ class BackupManager:
             if not collection:
                 return None
 
-            if collection.owner_id != user_id and not await access_control.check_permission(
+            if collection.owner_id != user_id and not access_control.has_permission(
                 db, user_id, "manage_collections"
             ):
                 raise exceptions.AuthorizationError("Not authorized to backup this collection")
@@ -72,14 +74,14 @@ class BackupManager:
                 json.dump(collection_data, f, indent=2)
 
             self.logger.info(f"Created backup for collection {collection_id}")
-            monitor.track_request(0)  # Track backup creation
             return str(backup_file)
         except Exception as e:
             self.logger.error(f"Error creating backup: {str(e)}")
             monitor.track_error("Backup", str(e))
             raise
 
-    async def restore_backup(
+    @monitor.timer("backup.restore_backup")
+    def restore_backup(
         self,
         db: Session,
         backup_file: str,
@@ -103,7 +105,7 @@ class BackupManager:
 
             if collection:
                 # Update existing collection
-                if collection.owner_id != user_id and not await access_control.check_permission(
+                if collection.owner_id != user_id and not access_control.has_permission(
                     db, user_id, "manage_collections"
                 ):
                     raise exceptions.AuthorizationError("Not authorized to restore this collection")
@@ -156,14 +158,14 @@ class BackupManager:
             db.commit()
 
             self.logger.info(f"Restored collection from backup {backup_file}")
-            monitor.track_request(0)  # Track backup restoration
             return schemas.Collection.from_orm(collection)
         except Exception as e:
             self.logger.error(f"Error restoring backup: {str(e)}")
             monitor.track_error("Backup", str(e))
             raise
 
-    async def list_backups(
+    @monitor.timer("backup.list_backups")
+    def list_backups(
         self,
         db: Session,
         collection_id: int,
@@ -179,7 +181,7 @@ class BackupManager:
             if not collection:
                 return []
 
-            if collection.owner_id != user_id and not await access_control.check_permission(
+            if collection.owner_id != user_id and not access_control.has_permission(
                 db, user_id, "manage_collections"
             ):
                 raise exceptions.AuthorizationError("Not authorized to list backups for this collection")
@@ -190,7 +192,6 @@ class BackupManager:
                 backups.append(str(file))
 
             self.logger.info(f"Listed backups for collection {collection_id}")
-            monitor.track_request(0)  # Track backup listing
             return backups
         except Exception as e:
             self.logger.error(f"Error listing backups: {str(e)}")
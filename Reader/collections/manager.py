@@ -1,13 +1,15 @@
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from .. import models, schemas, logger, monitor, exceptions
+from .. import models, schemas, logger, exceptions
+from ..monitoring import monitor
 from ..auth import access_control
 
 class CollectionManager:
     def __init__(self):
         self.logger = logger.logger
 
-    async def create_collection(
+    @monitor.timer("collections.create_collection")
+    def create_collection(
         self,
         db: Session,
         user_id: int,
@@ -16,7 +18,7 @@ class CollectionManager:
         """Create a new collection."""
         try:
             # Check permissions
-            if not await access_control.check_permission(db, user_id, "manage_own_collections"):
+            if not access_control.has_permission(db, user_id, "manage_own_collections"):
                 raise exceptions.AuthorizationError("Not authorized to create collections")
 
             # Create collection
@@ -29,14 +31,14 @@ class CollectionManager:
             db.refresh(collection)
 
             self.logger.info(f"Created collection {collection.id} for user {user_id}")
-            monitor.track_request(0)  # Track collection creation
             return schemas.Collection.from_orm(collection)
         except Exception as e:
             self.logger.error(f"Error creating collection: {str(e)}")
             monitor.track_error("Collection", str(e))
             raise
 
-    async def get_collection(
+    @monitor.timer("collections.get_collection")
+    def get_collection(
         self,
         db: Session,
         collection_id: int,
@@ -52,20 +54,20 @@ class CollectionManager:
                 return None
 
             # Check permissions
-            if collection.owner_id != user_id and not await access_control.check_permission(
+            if collection.owner_id != user_id and not access_control.has_permission(
                 db, user_id, "view_public_collections"
             ):
                 raise exceptions.AuthorizationError("Not authorized to view this collection")
 
             self.logger.info(f"Retrieved collection {collection_id}")
-            monitor.track_request(0)  # Track collection retrieval
             return schemas.Collection.from_orm(collection)
         except Exception as e:
             self.logger.error(f"Error getting collection: {str(e)}")
             monitor.track_error("Collection", str(e))
             raise
 
-    async def update_collection(
+    @monitor.timer("collections.update_collection")
+    def update_collection(
         self,
         db: Session,
         collection_id: int,
@@ -82,7 +84,7 @@ class CollectionManager:
                 return None
 
             # Check permissions
-            if collection.owner_id != user_id and not await access_control.check_permission(
+            if collection.owner_id != user_id and not access_control.has_permission(
                 db, user_id, "manage_collections"
             ):
                 raise exceptions.AuthorizationError("Not authorized to update this collection")
@@ -95,14 +97,14 @@ class CollectionManager:
             db.refresh(collection)
 
             self.logger.info(f"Updated collection {collection_id}")
-            monitor.track_request(0)  # Track collection update
             return schemas.Collection.from_orm(collection)
         except Exception as e:
             self.logger.error(f"Error updating collection: {str(e)}")
             monitor.track_error("Collection", str(e))
             raise
 
-    async def delete_collection(
+    @monitor.timer("collections.delete_collection")
+    def delete_collection(
         self,
         db: Session,
         collection_id: int,
@@ -118,7 +120,7 @@ class CollectionManager:
                 return False
 
             # Check permissions
-            if collection.owner_id != user_id and not await access_control.check_permission(
+            if collection.owner_id != user_id and not access_control.has_permission(
                 db, user_id, "manage_collections"
             ):
                 raise exceptions.AuthorizationError("Not authorized to delete this collection")
@@ -127,14 +129,14 @@ class CollectionManager:
             db.commit()
 
             self.logger.info(f"Deleted collection {collection_id}")
-            monitor.track_request(0)  # Track collection deletion
             return True
         except Exception as e:
             self.logger.error(f"Error deleting collection: {str(e)}")
             monitor.track_error("Collection", str(e))
             raise
 
-    async def add_document_to_collection(
+    @monitor.timer("collections.add_document_to_collection")
+    def add_document_to_collection(
         self,
         db: Session,
         collection_id: int,
@@ -151,7 +153,7 @@ class CollectionManager:
             if not collection:
                 return False
 
-            if collection.owner_id != user_id and not await access_control.check_permission(
+            if collection.owner_id != user_id and not access_control.has_permission(
                 db, user_id, "manage_collections"
             ):
                 raise exceptions.AuthorizationError("Not authorized to modify this collection")
@@ -164,7 +166,7 @@ class CollectionManager:
             if not document:
                 return False
 
-            if document.owner_id != user_id and not await access_control.check_permission(
+            if document.owner_id != user_id and not access_control.has_permission(
                 db, user_id, "manage_documents"
             ):
                 raise exceptions.AuthorizationError("Not authorized to add this document")
@@ -178,14 +180,14 @@ class CollectionManager:
             db.commit()
 
             self.logger.info(f"Added document {document_id} to collection {collection_id}")
-            monitor.track_request(0)  # Track document addition
             return True
         except Exception as e:
             self.logger.error(f"Error adding document to collection: {str(e)}")
             monitor.track_error("Collection", str(e))
             raise
 
-    async def remove_document_from_collection(
+    @monitor.timer("collections.remove_document_from_collection")
+    def remove_document_from_collection(
         self,
         db: Session,
         collection_id: int,
@@ -202,7 +204,7 @@ class CollectionManager:
             if not collection:
                 return False
 
-            if collection.owner_id != user_id and not await access_control.check_permission(
+            if collection.owner_id != user_id and not access_control.has_permission(
                 db, user_id, "manage_collections"
             ):
                 raise exceptions.AuthorizationError("Not authorized to modify this collection")
@@ -218,7 +220,6 @@ class CollectionManager:
                 db.commit()
 
                 self.logger.info(f"Removed document {document_id} from collection {collection_id}")
-                monitor.track_request(0)  # Track document removal
                 return True
             return False
         except Exception as e:
@@ -1,13 +1,15 @@
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from .. import models, schemas, logger, monitor, exceptions
+from .. import models, schemas, logger, exceptions
+from ..monitoring import monitor
 from ..auth import access_control
 
 class SharingManager:
     def __init__(self):
         self.logger = logger.logger
 
-    async def share_collection(
+    @monitor.timer("sharing.share_collection")
+    def share_collection(
         self,
         db: Session,
         collection_id: int,
@@ -25,7 +27,7 @@ class SharingManager:
             if not collection:
                 return False
 
-            if collection.owner_id != user_id and not await access_control.check_permission(
+            if collection.owner_id != user_id and not access_control.has_permission(
                 db, user_id, "manage_collections"
             ):
                 raise exceptions.AuthorizationError("Not authorized to share this collection")
@@ -51,14 +53,14 @@ class SharingManager:
             db.commit()
 
             self.logger.info(f"Shared collection {collection_id} with user {target_user_id}")
-            monitor.track_request(0)  # Track sharing operation
             return True
         except Exception as e:
             self.logger.error(f"Error sharing collection: {str(e)}")
             monitor.track_error("Sharing", str(e))
             raise
 
-    async def unshare_collection(
+    @monitor.timer("sharing.unshare_collection")
+    def unshare_collection(
         self,
         db: Session,
         collection_id: int,
@@ -75,7 +77,7 @@ class SharingManager:
             if not collection:
                 return False
 
-            if collection.owner_id != user_id and not await access_control.check_permission(
+            if collection.owner_id != user_id and not access_control.has_permission(
                 db, user_id, "manage_collections"
             ):
                 raise exceptions.AuthorizationError("Not authorized to unshare this collection")
@@ -91,7 +93,6 @@ class SharingManager:
                 db.commit()
 
                 self.logger.info(f"Unshared collection {collection_id} from user {target_user_id}")
-                monitor.track_request(0)  # Track unsharing operation
                 return True
             return False
         except Exception as e:
@@ -99,7 +100,8 @@ class SharingManager:
             monitor.track_error("Sharing", str(e))
             raise
 
-    async def get_shared_collections(
+    @monitor.timer("sharing.get_shared_collections")
+    def get_shared_collections(
         self,
         db: Session,
         user_id: int
@@ -119,14 +121,14 @@ class SharingManager:
                     collections.append(schemas.Collection.from_orm(collection))
 
             self.logger.info(f"Retrieved shared collections for user {user_id}")
-            monitor.track_request(0)  # Track shared collections retrieval
             return collections
         except Exception as e:
             self.logger.error(f"Error getting shared collections: {str(e)}")
             monitor.track_error("Sharing", str(e))
             raise
 
-    async def get_collection_shares(
+    @monitor.timer("sharing.get_collection_shares")
+    def get_collection_shares(
         self,
         db: Session,
         collection_id: int,
@@ -142,7 +144,7 @@ class SharingManager:
             if not collection:
                 return []
 
-            if collection.owner_id != user_id and not await access_control.check_permission(
+            if collection.owner_id != user_id and not access_control.has_permission(
                 db, user_id, "manage_collections"
             ):
                 raise exceptions.AuthorizationError("Not authorized to view collection shares")
@@ -152,7 +154,6 @@ class SharingManager:
             ).all()
 
             self.logger.info(f"Retrieved shares for collection {collection_id}")
-            monitor.track_request(0)  # Track shares retrieval
             return [schemas.CollectionShare.from_orm(share) for share in shares]
         except Exception as e:
             self.logger.error(f"Error getting collection shares: {str(e)}")
@@ -1,5 +1,6 @@
 from pydantic import BaseSettings
 from typing import List
+import json
 import os
 from dotenv import load_dotenv
 
@@ -8,11 +9,38 @@ load_dotenv()
 class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./reader.db")
+    # Optional explicit asyncio URL; derived from DATABASE_URL when empty
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    DB_SQLITE_MMAP_SIZE: int = int(os.getenv("DB_SQLITE_MMAP_SIZE", "268435456"))  # 256MB
+    DB_SQLITE_CACHE_KB: int = int(os.getenv("DB_SQLITE_CACHE_KB", "65536"))  # 64MB
+    DB_ECHO: bool = os.getenv("DB_ECHO", "False").lower() == "true"
     
     # Security settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_TOKEN_CACHE_TTL_SECONDS", "30"))
+    AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+    PERMISSION_CACHE_TTL_SECONDS: int = int(os.getenv("PERMISSION_CACHE_TTL_SECONDS", "60"))
+    # Grants, revokes and API key changes bump a shared counter; other workers
+    # read it at most every CACHE_VERSION_REFRESH_SECONDS, which bounds their staleness
+    CACHE_VERSION_BACKEND: str = os.getenv("CACHE_VERSION_BACKEND", "memory")  # "memory" or "redis"
+    CACHE_VERSION_REFRESH_SECONDS: float = float(os.getenv("CACHE_VERSION_REFRESH_SECONDS", "0.5"))
+    
+    # Password hashing settings
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "2"))
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", "19456"))  # KiB
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", "1"))
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
     API_KEY: str = os.getenv("API_KEY", "your-api-key-here")
     
     # API settings
@@ -31,24 +59,94 @@ class Settings(BaseSettings):
     # Rate limiting settings
     RATE_LIMIT_MAX_REQUESTS: int = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "100"))
     RATE_LIMIT_TIME_WINDOW: int = int(os.getenv("RATE_LIMIT_TIME_WINDOW", "60"))
+    RATE_LIMIT_ALGORITHM: str = os.getenv("RATE_LIMIT_ALGORITHM", "sliding_window")  # or "token_bucket"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" or "redis"
+    # Per-route overrides, e.g. {"/auth/token": {"limit": 5, "window": 60}}
+    RATE_LIMIT_ROUTE_POLICIES: dict = json.loads(os.getenv("RATE_LIMIT_ROUTE_POLICIES", "{}"))
+    # Per-key buckets keyed by the key's public prefix, e.g. {"AbCd1234": {"limit": 1000, "window": 60}};
+    # keys not listed share their client's per-IP bucket
+    RATE_LIMIT_KEY_POLICIES: dict = json.loads(os.getenv("RATE_LIMIT_KEY_POLICIES", "{}"))
     
     # Monitoring settings
     MONITORING_ENABLED: bool = bool(os.getenv("MONITORING_ENABLED", "True"))
     PROMETHEUS_PORT: int = int(os.getenv("PROMETHEUS_PORT", "9090"))
+    # Metric labels use route templates; distinct templates beyond this share one label
+    METRICS_MAX_ROUTE_LABELS: int = int(os.getenv("METRICS_MAX_ROUTE_LABELS", "500"))
+    METRICS_ROUTE_CACHE_SIZE: int = int(os.getenv("METRICS_ROUTE_CACHE_SIZE", "10000"))
+    # System gauges (psutil) are refreshed in the background, not per scrape
+    METRICS_SAMPLE_INTERVAL_SECONDS: float = float(os.getenv("METRICS_SAMPLE_INTERVAL_SECONDS", "15"))
+
+    # Tracing settings; slow requests are always kept and logged with their span breakdown
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "True").lower() == "true"
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+    TRACE_SLOW_REQUEST_MS: float = float(os.getenv("TRACE_SLOW_REQUEST_MS", "1000"))
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+    TRACE_MAX_SPANS: int = int(os.getenv("TRACE_MAX_SPANS", "500"))
+    TRACE_MAX_STATEMENT_LENGTH: int = int(os.getenv("TRACE_MAX_STATEMENT_LENGTH", "1000"))
+    TRACE_DEBUG_ENDPOINT: bool = os.getenv("TRACE_DEBUG_ENDPOINT", "False").lower() == "true"
+
+    # Query profiling; a fingerprint repeated this often in one request is reported as N+1
+    DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+    DB_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5"))
     
     # Logging settings
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE: str = os.getenv("LOG_FILE", "reader.log")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")  # console format; files are always JSON
+    # Records are written by a background thread from a bounded queue
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Fraction of DEBUG/INFO records kept while the queue is over 80% full
+    LOG_OVERLOAD_SAMPLE_RATE: float = float(os.getenv("LOG_OVERLOAD_SAMPLE_RATE", "0.1"))
+    # Request lines: server errors and slow requests always, others sampled
+    REQUEST_LOG_SAMPLE_RATE: float = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "0.01"))
+    REQUEST_LOG_SLOW_MS: float = float(os.getenv("REQUEST_LOG_SLOW_MS", "1000"))
+    # Per-route sample rates keyed by path prefix, e.g. {"/auth": 1.0}
+    REQUEST_LOG_ROUTE_RATES: dict = json.loads(os.getenv("REQUEST_LOG_ROUTE_RATES", "{}"))
+    REQUEST_LOG_SUMMARY_INTERVAL_SECONDS: float = float(os.getenv("REQUEST_LOG_SUMMARY_INTERVAL_SECONDS", "60"))
+    REQUEST_LOG_SUMMARY_TOP: int = int(os.getenv("REQUEST_LOG_SUMMARY_TOP", "10"))
     
     # File storage settings
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", "10485760"))  # 10MB
+    # Uploads are copied to disk this many bytes at a time
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", "65536"))  # 64KB
+    ALLOWED_DOCUMENT_TYPES: list = [
+        "application/pdf",
+        "application/epub+zip",
+        "text/plain",
+        "text/html",
+        "text/markdown"
+    ]
+    
+    # API key cache settings
+    API_KEY_CACHE_TTL_SECONDS: float = float(os.getenv("API_KEY_CACHE_TTL_SECONDS", "60"))
+    API_KEY_CACHE_SIZE: int = int(os.getenv("API_KEY_CACHE_SIZE", "10000"))
+    API_KEY_NEGATIVE_CACHE_TTL_SECONDS: float = float(os.getenv("API_KEY_NEGATIVE_CACHE_TTL_SECONDS", "10"))
+    API_KEY_NEGATIVE_CACHE_SIZE: int = int(os.getenv("API_KEY_NEGATIVE_CACHE_SIZE", "10000"))
+    
+    # Login session settings
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory")  # "memory" or "redis"
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    SESSION_EXPIRE_HOURS: int = int(os.getenv("SESSION_EXPIRE_HOURS", "24"))
+    SESSION_NEAR_CACHE_TTL_SECONDS: float = float(os.getenv("SESSION_NEAR_CACHE_TTL_SECONDS", "2"))
+    SESSION_REFRESH_BATCH_SIZE: int = int(os.getenv("SESSION_REFRESH_BATCH_SIZE", "100"))
+    # Buffered refreshes reach the shared backend, and other workers, within this long
+    SESSION_REFRESH_FLUSH_SECONDS: float = float(os.getenv("SESSION_REFRESH_FLUSH_SECONDS", "5"))
+    
+    # Session telemetry store settings
+    SESSION_STORE_DIR: str = os.getenv("SESSION_STORE_DIR", "session_store")
+    # Buffered session events reach disk, and other workers, within this long
+    SESSION_STORE_FLUSH_SECONDS: float = float(os.getenv("SESSION_STORE_FLUSH_SECONDS", "5"))
+    SESSION_STORE_COMPACT_SECONDS: float = float(os.getenv("SESSION_STORE_COMPACT_SECONDS", "3600"))
+    SESSION_STORE_RETENTION_DAYS: int = int(os.getenv("SESSION_STORE_RETENTION_DAYS", "730"))  # 0 keeps everything
     
     # Security settings
     REQUEST_TIMEOUT: int = int(os.getenv("REQUEST_TIMEOUT", "300"))  # 5 minutes
     ALLOWED_METHODS: list = ["GET", "POST", "PUT", "DELETE"]
     ALLOWED_CONTENT_TYPES: list = ["application/json"]
     MAX_REQUEST_SIZE: int = int(os.getenv("MAX_REQUEST_SIZE", "1048576"))  # 1MB
+    MAX_SIGNED_BODY_SIZE: int = int(os.getenv("MAX_SIGNED_BODY_SIZE", "536870912"))  # 512MB
+    SIGNED_BODY_BUFFER_SIZE: int = int(os.getenv("SIGNED_BODY_BUFFER_SIZE", "1048576"))  # 1MB verified up front, larger bodies as they stream
     
     class Config:
         env_file = ".env"
@@ -1,9 +1,11 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime, timedelta
 from . import models, schemas
 from .auth import get_password_hash
+from .pagination import keyset_paginate
+from .session_store import session_store
 
 def get_user(db: Session, user_id: int):
     return db.query(models.User).filter(models.User.id == user_id).first()
@@ -11,8 +13,8 @@ def get_user(db: Session, user_id: int):
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    return keyset_paginate(db.query(models.User), models.User.created_at, models.User.id, cursor, limit)
 
 def create_user(db: Session, user: schemas.UserCreate):
     hashed_password = get_password_hash(user.password)
@@ -22,8 +24,8 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.refresh(db_user)
     return db_user
 
-def get_projects(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Project).offset(skip).limit(limit).all()
+def get_projects(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    return keyset_paginate(db.query(models.Project), models.Project.created_at, models.Project.id, cursor, limit)
 
 def create_project(db: Session, project: schemas.ProjectCreate, user_id: int):
     db_project = models.Project(**project.dict(), owner_id=user_id)
@@ -35,8 +37,9 @@ def create_project(db: Session, project: schemas.ProjectCreate, user_id: int):
 def get_project(db: Session, project_id: int):
     return db.query(models.Project).filter(models.Project.id == project_id).first()
 
-def get_user_projects(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Project).filter(models.Project.owner_id == user_id).offset(skip).limit(limit).all()
+def get_user_projects(db: Session, user_id: int, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(models.Project).filter(models.Project.owner_id == user_id)
+    return keyset_paginate(query, models.Project.created_at, models.Project.id, cursor, limit)
 
 def create_document(db: Session, document: schemas.DocumentCreate):
     db_document = models.Document(**document.dict())
@@ -45,8 +48,14 @@ def create_document(db: Session, document: schemas.DocumentCreate):
     db.refresh(db_document)
     return db_document
 
-def update_document(db: Session, document_id: int, document: schemas.DocumentUpdate):
-    db_document = db.query(models.Document).filter(models.Document.id == document_id).first()
+def update_document(
+    db: Session,
+    document_id: int,
+    document: schemas.DocumentUpdate,
+    db_document: Optional[models.Document] = None
+):
+    if db_document is None:
+        db_document = get_document(db, document_id)
     if not db_document:
         return None
     
@@ -63,24 +72,47 @@ def update_document(db: Session, document_id: int, document: schemas.DocumentUpd
     db.refresh(db_document)
     return db_document
 
-def get_documents(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Document).offset(skip).limit(limit).all()
+def get_documents(db: Session, cursor: Optional[str] = None, limit: int = 100, condition=None):
+    """Page documents, restricted by ``condition`` over Document and its Project when given."""
+    query = db.query(models.Document)
+    if condition is not None:
+        query = query.outerjoin(
+            models.Project, models.Project.id == models.Document.project_id
+        ).filter(condition)
+    return keyset_paginate(query, models.Document.created_at, models.Document.id, cursor, limit)
 
-def get_project_documents(db: Session, project_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Document).filter(models.Document.project_id == project_id).offset(skip).limit(limit).all()
+def get_project_documents(db: Session, project_id: int, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(models.Document).filter(models.Document.project_id == project_id)
+    return keyset_paginate(query, models.Document.created_at, models.Document.id, cursor, limit)
 
 def get_document(db: Session, document_id: int):
     return db.query(models.Document).filter(models.Document.id == document_id).first()
 
+def get_document_with_owner(db: Session, document_id: int):
+    """Fetch a document and its project's owner_id in one query; None if missing."""
+    return db.query(models.Document, models.Project.owner_id).outerjoin(
+        models.Project, models.Project.id == models.Document.project_id
+    ).filter(models.Document.id == document_id).first()
+
+def get_reading_session(db: Session, session_id: int):
+    return db.query(models.ReadingSession).filter(models.ReadingSession.id == session_id).first()
+
 def create_reading_session(db: Session, session: schemas.ReadingSessionCreate, user_id: int):
     db_session = models.ReadingSession(**session.dict(), user_id=user_id)
     db.add(db_session)
     db.commit()
     db.refresh(db_session)
+    session_store.append_session(db_session)
     return db_session
 
-def update_reading_session(db: Session, session_id: int, session: schemas.ReadingSessionUpdate):
-    db_session = db.query(models.ReadingSession).filter(models.ReadingSession.id == session_id).first()
+def update_reading_session(
+    db: Session,
+    session_id: int,
+    session: schemas.ReadingSessionUpdate,
+    db_session: Optional[models.ReadingSession] = None
+):
+    if db_session is None:
+        db_session = get_reading_session(db, session_id)
     if not db_session:
         return None
     
@@ -90,34 +122,43 @@ def update_reading_session(db: Session, session_id: int, session: schemas.Readin
     
     db.commit()
     db.refresh(db_session)
+    session_store.append_session(db_session)
     return db_session
 
-def get_user_reading_sessions(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.ReadingSession).filter(models.ReadingSession.user_id == user_id).offset(skip).limit(limit).all()
+def get_user_reading_sessions(db: Session, user_id: int, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(models.ReadingSession).filter(models.ReadingSession.user_id == user_id)
+    return keyset_paginate(query, models.ReadingSession.start_time, models.ReadingSession.id, cursor, limit)
 
-def get_document_reading_sessions(db: Session, document_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.ReadingSession).filter(models.ReadingSession.document_id == document_id).offset(skip).limit(limit).all()
+def get_document_reading_sessions(db: Session, document_id: int, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(models.ReadingSession).filter(models.ReadingSession.document_id == document_id)
+    return keyset_paginate(query, models.ReadingSession.start_time, models.ReadingSession.id, cursor, limit)
 
-def get_reading_progress(db: Session, document_id: int):
-    document = db.query(models.Document).filter(models.Document.id == document_id).first()
+def get_reading_progress(db: Session, document_id: int, document: Optional[models.Document] = None):
+    if document is None:
+        document = get_document(db, document_id)
     if not document:
         return None
     
-    last_session = db.query(models.ReadingSession).filter(
+    last_read = db.query(func.max(models.ReadingSession.start_time)).filter(
         models.ReadingSession.document_id == document_id
-    ).order_by(models.ReadingSession.start_time.desc()).first()
+    ).scalar()
     
     return schemas.ReadingProgress(
         document_id=document.id,
         current_page=document.current_page,
         total_pages=document.total_pages,
         reading_progress=document.reading_progress,
-        last_read=last_session.start_time if last_session else document.created_at
+        last_read=last_read or document.created_at
     )
 
-def get_document_analytics(db: Session, document_id: int) -> Optional[schemas.DocumentAnalytics]:
+def get_document_analytics(
+    db: Session,
+    document_id: int,
+    document: Optional[models.Document] = None
+) -> Optional[schemas.DocumentAnalytics]:
     """Calculate analytics for a specific document."""
-    document = db.query(models.Document).filter(models.Document.id == document_id).first()
+    if document is None:
+        document = get_document(db, document_id)
     if not document:
         return None
 
@@ -168,7 +209,42 @@ def get_document_analytics(db: Session, document_id: int) -> Optional[schemas.Do
         completion_percentage=completion
     )
 
-def get_all_document_analytics(db: Session, user_id: int) -> List[schemas.DocumentAnalytics]:
-    """Get analytics for all documents owned by a user."""
-    documents = db.query(models.Document).filter(models.Document.owner_id == user_id).all()
-    return [get_document_analytics(db, doc.id) for doc in documents if get_document_analytics(db, doc.id)] 
\ No newline at end of file
+def get_all_document_analytics(
+    db: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100
+):
+    """Get one page of analytics for the documents a user owns, aggregated in one query."""
+    query = db.query(
+        models.Document.id,
+        models.Document.total_pages,
+        func.count(models.ReadingSession.id),
+        func.coalesce(func.sum(models.ReadingSession.duration_minutes), 0),
+        func.coalesce(func.sum(models.ReadingSession.pages_read), 0),
+        func.max(models.ReadingSession.end_time)
+    ).join(
+        models.Project, models.Project.id == models.Document.project_id
+    ).outerjoin(
+        models.ReadingSession, models.ReadingSession.document_id == models.Document.id
+    ).filter(
+        models.Project.owner_id == user_id
+    ).group_by(
+        models.Document.id, models.Document.total_pages
+    )
+    rows, next_cursor = keyset_paginate(query, models.Document.id, models.Document.id, cursor, limit)
+
+    analytics = []
+    for document_id, document_pages, total_sessions, total_duration, total_pages, last_read in rows:
+        analytics.append(schemas.DocumentAnalytics(
+            document_id=document_id,
+            total_sessions=total_sessions,
+            total_duration_minutes=total_duration,
+            total_pages_read=total_pages,
+            average_session_duration=total_duration / total_sessions if total_sessions else 0,
+            average_pages_per_session=total_pages / total_sessions if total_sessions else 0,
+            last_read=last_read,
+            reading_speed_pages_per_hour=(total_pages / total_duration) * 60 if total_duration > 0 else 0,
+            completion_percentage=(total_pages / document_pages) * 100 if document_pages else 0
+        ))
+    return analytics, next_cursor
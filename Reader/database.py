@@ -1,13 +1,249 @@
-from sqlalchemy import create_engine
+import time
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 from .config import settings
+from .monitor.metrics import db_connections, db_pool_checkout_latency, db_pool_saturation
+from .tracing import CLIENT, tracer
+from .query_profiler import query_profiler
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Async drivers for each sync dialect we deploy on
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+class _TimedCheckout:
+    """Pool mixin observing how long each caller waits for a connection."""
+
+    pool_label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_latency.labels(pool=self.pool_label).observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool that records how long callers wait for a connection."""
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long callers wait for a connection."""
+
+    pool_label = "async"
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """Build ``create_engine`` keyword arguments for a URL from settings."""
+    url = make_url(database_url)
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "query_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "echo": settings.DB_ECHO,
+    }
+
+    if _is_memory_sqlite(url):
+        # One shared connection, otherwise every checkout sees an empty database
+        options.pop("pool_pre_ping")
+        options["poolclass"] = StaticPool
+        options["connect_args"] = {"check_same_thread": False}
+        return options
+
+    options.update({
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_use_lifo": True,
+    })
+
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.DB_POOL_TIMEOUT,
+        }
+    elif backend == "postgresql":
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}",
+        }
+        if url.get_driver_name() == "psycopg2":
+            options["executemany_mode"] = "values_plus_batch"
+    return options
+
+
+def _apply_sqlite_pragmas(engine: Engine) -> None:
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not _is_memory_sqlite(engine.url):
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={settings.DB_SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.DB_SQLITE_CACHE_KB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def _track_pool_usage(engine: Engine, max_overflow: int, label: str = "sync") -> None:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    capacity = pool.size() + max(max_overflow, 0)
+
+    def update_gauges(*args):
+        checked_out = pool.checkedout()
+        db_connections.labels(state="checked_out", pool=label).set(checked_out)
+        db_connections.labels(state="idle", pool=label).set(pool.checkedin())
+        db_connections.labels(state="overflow", pool=label).set(max(pool.overflow(), 0))
+        db_pool_saturation.labels(pool=label).set(checked_out / capacity if capacity else 0)
+
+    event.listen(engine, "checkout", update_gauges)
+    event.listen(engine, "checkin", update_gauges)
+
+
+def _trace_statements(engine: Engine) -> None:
+    """Record each statement as a child span of the current request's span."""
+    db_system = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement_span(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.start_span("db.query", CLIENT, {
+            "db.system": db_system,
+            "db.statement": statement[:settings.TRACE_MAX_STATEMENT_LENGTH],
+        })
+        if span is not None and context is not None:
+            context._trace_span = span
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def end_statement_span(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            if cursor.rowcount >= 0:
+                span.set_attribute("db.rows", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def fail_statement_span(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.end()
+
+
+def _profile_statements(engine: Engine) -> None:
+    """Time every statement for the query profiler."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_start", None)
+        if start is not None:
+            query_profiler.record(statement, time.perf_counter() - start)
+
+
+def create_db_engine(database_url: str = SQLALCHEMY_DATABASE_URL, **overrides) -> Engine:
+    """Create an engine with pool sizing and per-dialect tuning from settings."""
+    options = engine_options(database_url)
+    options.update(overrides)
+    engine = create_engine(database_url, **options)
+
+    if engine.dialect.name == "sqlite":
+        _apply_sqlite_pragmas(engine)
+    _track_pool_usage(engine, options.get("max_overflow", settings.DB_MAX_OVERFLOW))
+    _trace_statements(engine)
+    _profile_statements(engine)
+    return engine
+
+
+def async_database_url(database_url: str) -> str:
+    """Swap a sync database URL onto its asyncio driver."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    if url.get_driver_name() == ASYNC_DRIVERS[backend]:
+        return database_url
+    url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    if backend == "postgresql":
+        # asyncpg prepares every statement; keep the prepared plans per connection
+        url = url.update_query_dict({
+            "prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)
+        })
+    return url.render_as_string(hide_password=False)
+
+
+def create_async_db_engine(database_url: str = SQLALCHEMY_DATABASE_URL, **overrides) -> AsyncEngine:
+    """Create an asyncio engine with the same pool and dialect tuning as ``create_db_engine``."""
+    url = make_url(database_url)
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "query_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "echo": settings.DB_ECHO,
+    }
+
+    if _is_memory_sqlite(url):
+        options.pop("pool_pre_ping")
+        options["poolclass"] = StaticPool
+    else:
+        # aiosqlite defaults to NullPool for file databases, which rejects the sizing options
+        options.update({
+            "poolclass": InstrumentedAsyncQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_use_lifo": True,
+        })
+        if url.get_backend_name() == "sqlite":
+            options["connect_args"] = {"timeout": settings.DB_POOL_TIMEOUT}
+        elif url.get_backend_name() == "postgresql":
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+            }
+    options.update(overrides)
+
+    async_engine = create_async_engine(async_database_url(database_url), **options)
+    if async_engine.dialect.name == "sqlite":
+        _apply_sqlite_pragmas(async_engine.sync_engine)
+    _track_pool_usage(async_engine.sync_engine, options.get("max_overflow", settings.DB_MAX_OVERFLOW), "async")
+    _trace_statements(async_engine.sync_engine)
+    _profile_statements(async_engine.sync_engine)
+    return async_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_db_engine(settings.ASYNC_DATABASE_URL or SQLALCHEMY_DATABASE_URL)
+AsyncSessionLocal = sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 # Dependency
@@ -16,4 +252,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,7 +1,7 @@
 from fastapi import status
 from typing import Optional, Dict, Any
 from .logger import logger
-from .monitor import monitor
+from .monitoring import monitor
 
 class ReaderException(Exception):
     """Base exception class for Reader application."""
@@ -1,30 +1,176 @@
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
-from logging.handlers import RotatingFileHandler
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import List
+from .config import settings
 
 # Create logs directory if it doesn't exist
 log_dir = Path("logs")
 log_dir.mkdir(exist_ok=True)
 
-# Configure logging
-def setup_logger(name: str = "reader") -> logging.Logger:
-    """Set up and return a configured logger instance."""
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, including fields passed through ``extra``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+class BoundedQueueHandler(QueueHandler):
+    """Hand records to the listener thread without formatting or blocking.
+
+    Above ``high_watermark`` queued records, only ``overload_sample_rate``
+    of DEBUG/INFO records are kept; when the queue is full those are
+    dropped, while ERROR and above wait up to ``error_timeout`` seconds for
+    room. Drops are counted and reported once the queue drains.
+    """
+
+    def __init__(self, log_queue: "queue.Queue", high_watermark: int,
+                 overload_sample_rate: float = 0.1, error_timeout: float = 0.05):
+        super().__init__(log_queue)
+        self.high_watermark = high_watermark
+        self.overload_sample_rate = overload_sample_rate
+        self.error_timeout = error_timeout
+        # Approximate under concurrent emits; only used for reporting
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; only freeze the args,
+        # which the caller may mutate after this returns
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if (record.levelno < logging.WARNING
+                and self.queue.qsize() >= self.high_watermark
+                and random.random() >= self.overload_sample_rate):
+            self._drop()
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno < logging.ERROR:
+                self._drop()
+                return
+            try:
+                self.queue.put(record, timeout=self.error_timeout)
+            except queue.Full:
+                self._drop()
+                return
+        if self._unreported and self.queue.qsize() < self.high_watermark:
+            count, self._unreported = self._unreported, 0
+            try:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": "reader.logging",
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"Dropped {count} log records under load"
+                }))
+            except queue.Full:
+                self._unreported += count
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        self._unreported += 1
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener whose shutdown sentinel waits for room in a full queue.
+
+    The base class enqueues it with ``put_nowait``, which raises
+    ``queue.Full`` on a bounded queue under load and leaves the thread
+    running. Here the put blocks in ``sentinel_timeout`` steps while the
+    thread drains the queue, and gives up only once the thread is gone.
+    """
 
+    def __init__(self, log_queue: "queue.Queue", *handlers: logging.Handler,
+                 respect_handler_level: bool = False, sentinel_timeout: float = 1.0):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.sentinel_timeout = sentinel_timeout
+
+    def enqueue_sentinel(self) -> None:
+        try:
+            self.queue.put_nowait(self._sentinel)
+            return
+        except queue.Full:
+            pass
+        while True:
+            try:
+                self.queue.put(self._sentinel, timeout=self.sentinel_timeout)
+                return
+            except queue.Full:
+                if self._thread is None or not self._thread.is_alive():
+                    return
+
+class LogPipeline:
+    """Application loggers write to a bounded queue; one thread does the I/O.
+
+    Console and rotating file handlers (and their formatting, rotation
+    checks and writes) run on the listener thread, so a log call on the
+    event loop costs a record allocation and a queue put.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], queue_size: int = 10000,
+                 overload_sample_rate: float = 0.1):
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.handler = BoundedQueueHandler(
+            self.queue,
+            high_watermark=int(queue_size * 0.8),
+            overload_sample_rate=overload_sample_rate
+        )
+        self.listener = DrainingQueueListener(self.queue, *handlers, respect_handler_level=True)
+        self._running = False
+
+    def start(self) -> None:
+        if not self._running:
+            self.listener.start()
+            self._running = True
+
+    def stop(self) -> None:
+        """Write out everything still queued and stop the listener thread."""
+        if self._running:
+            self.listener.stop()
+            self._running = False
+
+def create_log_pipeline() -> LogPipeline:
+    """Build the console and rotating file handlers behind a log queue."""
     # Create formatters
     console_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(module)s - %(funcName)s - %(message)s'
-    )
+    file_formatter = JSONFormatter()
 
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(console_formatter)
+    console_handler.setFormatter(
+        file_formatter if settings.LOG_FORMAT == "json" else console_formatter
+    )
 
     # File handler for all logs
     file_handler = RotatingFileHandler(
@@ -44,18 +190,28 @@ def setup_logger(name: str = "reader") -> logging.Logger:
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(file_formatter)
 
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    logger.addHandler(error_handler)
+    return LogPipeline(
+        [console_handler, file_handler, error_handler],
+        queue_size=settings.LOG_QUEUE_SIZE,
+        overload_sample_rate=settings.LOG_OVERLOAD_SAMPLE_RATE
+    )
 
+# Configure logging
+def setup_logger(pipeline: LogPipeline, name: str = "reader") -> logging.Logger:
+    """Set up and return a logger that writes through the pipeline."""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(pipeline.handler)
+    pipeline.start()
     return logger
 
-# Create default logger instance
-logger = setup_logger()
+# Create the log pipeline and default logger instance
+log_pipeline = create_log_pipeline()
+atexit.register(log_pipeline.stop)
+logger = setup_logger(log_pipeline)
 
 # Create separate loggers for different components
 auth_logger = logging.getLogger("reader.auth")
 db_logger = logging.getLogger("reader.db")
 api_logger = logging.getLogger("reader.api")
-error_logger = logging.getLogger("reader.error") 
\ No newline at end of file
+error_logger = logging.getLogger("reader.error")
@@ -1,26 +1,25 @@
-from fastapi import FastAPI, Request, Depends
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 import time
-from fastapi.responses import JSONResponse
 from fastapi.openapi.utils import get_openapi
 
 from . import models, schemas
-from .database import engine, get_db
+from .database import engine, get_db, SessionLocal
 from .config import settings
 from .routes import router
-from .middleware import setup_middleware
-from .logger import logger
+from .middleware.pipeline import setup_middleware
+from .logger import logger, log_pipeline
 from .api import collections, documents, ai, auth
-from .middleware.rate_limit import RateLimitMiddleware
-from .middleware.api_metrics import APIMetricsMiddleware
-from .middleware.versioning import VersioningMiddleware
 from .docs.api_docs import custom_openapi
-from .auth.security import validate_signed_request, get_api_key
+from .auth.security import validate_signed_request
+from .auth.session import session_manager
 from .monitor.prometheus import prometheus_metrics
-from .middleware.security import security_middleware
-from .monitor import monitor
+from .tracing import tracer
+from .monitoring import monitor
+from .session_store import session_store
+from .request_logging import route_summary
+from .passwords import password_service
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
@@ -34,45 +33,9 @@ app = FastAPI(
     openapi_url=settings.OPENAPI_URL if settings.ENABLE_DOCS else None
 )
 
-# Setup middleware
+# Setup middleware; see middleware/pipeline.py for the layer order
 setup_middleware(app)
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Add versioning middleware
-app.add_middleware(VersioningMiddleware)
-
-# Add rate limiting middleware
-app.add_middleware(
-    RateLimitMiddleware,
-    max_requests=settings.RATE_LIMIT_MAX_REQUESTS,
-    time_window=settings.RATE_LIMIT_TIME_WINDOW
-)
-
-# Add API metrics middleware
-app.add_middleware(APIMetricsMiddleware)
-
-# Add security middleware
-@app.middleware("http")
-async def security_middleware_wrapper(request: Request, call_next):
-    try:
-        await security_middleware(request)
-        response = await call_next(request)
-        return response
-    except Exception as e:
-        logger.error(f"Security middleware error: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={"detail": "Internal server error"}
-        )
-
 # Include API routes
 app.include_router(router, prefix="/api/v1")
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
@@ -86,10 +49,26 @@ app.openapi = custom_openapi
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting Reader API")
+    session_store.recover()
+    db = SessionLocal()
+    try:
+        session_store.backfill(db)
+    finally:
+        db.close()
+    prometheus_metrics.start_sampler()
+    session_manager.start_flusher()
+    route_summary.start_reporter()
+    session_store.start_maintenance()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Reader API")
+    await prometheus_metrics.stop_sampler()
+    await session_manager.stop_flusher()
+    await route_summary.stop_reporter()
+    await session_store.stop_maintenance()
+    password_service.shutdown()
+    log_pipeline.stop()
 
 @app.get("/")
 async def root():
@@ -111,13 +90,20 @@ async def health_check():
 
 @app.get("/metrics")
 async def metrics():
-    """Metrics endpoint returning Prometheus metrics."""
-    return prometheus_metrics.get_metrics()
-
-# Add API key dependency for all routes except health check and metrics
-@app.middleware("http")
-async def api_key_middleware(request: Request, call_next):
-    if request.url.path not in ["/health", "/metrics"]:
-        await get_api_key(request.headers.get("X-API-Key"))
-    response = await call_next(request)
-    return response 
\ No newline at end of file
+    """Metrics endpoint returning Prometheus metrics in the text exposition format."""
+    content, media_type = prometheus_metrics.exposition()
+    return Response(content=content, media_type=media_type)
+
+if settings.TRACE_DEBUG_ENDPOINT:
+    @app.get("/debug/traces")
+    async def recent_traces(limit: int = 50):
+        """Recent sampled and slow traces with their span breakdown."""
+        return [trace.summary() for trace in tracer.exporter.traces(limit)]
+
+    @app.get("/debug/traces/{trace_id}")
+    async def trace_detail(trace_id: str):
+        """One trace in OTLP/JSON form."""
+        trace = tracer.exporter.get(trace_id)
+        if trace is None:
+            raise HTTPException(status_code=404, detail="Trace not found")
+        return trace.to_otlp(settings.API_TITLE)
@@ -1,37 +1,65 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import time
+from typing import Optional
 from ..monitor.api_metrics import api_monitor
+from ..monitor.route_labels import route_labels
+
+class APIMetricsMiddleware:
+    """Pass-through instrumentation: counts bytes as body messages flow.
+
+    Records time to first byte (when ``http.response.start`` goes out) and
+    total duration (until the last body message or an error) separately.
+    Only counters are kept, never the body, so streaming responses stay
+    streaming and memory does not grow with response size.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-class APIMetricsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
         # Start timer
-        start_time = time.time()
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate duration
-        duration = time.time() - start_time
-        
-        # Track metrics
-        await api_monitor.track_request(
-            endpoint=request.url.path,
-            method=request.method,
-            duration=duration,
-            status_code=response.status_code
-        )
-        
-        # Track response size
-        response_body = b""
-        async for chunk in response.body_iterator:
-            response_body += chunk
-        
-        await api_monitor.track_response_size(
-            endpoint=request.url.path,
-            method=request.method,
-            size=len(response_body)
-        )
-        
-        # Reconstruct response
-        return response 
\ No newline at end of file
+        start_time = time.perf_counter()
+        first_byte_time: Optional[float] = None
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal first_byte_time, status_code, response_size
+            if message["type"] == "http.response.start":
+                first_byte_time = time.perf_counter()
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            # Process request
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            # Route template, not the raw path, to keep label cardinality bounded
+            path = route_labels.resolve(scope)
+            method = scope["method"]
+
+            # Track metrics
+            await api_monitor.track_request(
+                endpoint=path,
+                method=method,
+                duration=duration,
+                status_code=status_code
+            )
+            if first_byte_time is not None:
+                await api_monitor.track_time_to_first_byte(
+                    endpoint=path,
+                    method=method,
+                    duration=first_byte_time - start_time
+                )
+            await api_monitor.track_response_size(
+                endpoint=path,
+                method=method,
+                size=response_size
+            )
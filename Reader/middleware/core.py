@@ -0,0 +1,157 @@
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import time
+from ..logger import error_logger, api_logger
+from ..exceptions import ReaderException
+from ..monitoring import monitor
+from ..auth.security import get_api_key
+from ..monitor.route_labels import route_labels
+from ..request_logging import RequestLogPolicy, RouteSummary, request_log_policy, route_summary
+
+class ErrorHandlerMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except ReaderException as e:
+            error_logger.error(f"Reader error: {e.detail}", exc_info=True)
+            monitor.track_error("Reader", e.detail)
+            if response_started:
+                raise
+            await JSONResponse({"detail": e.detail}, status_code=e.status_code)(scope, receive, send)
+        except Exception as e:
+            error_logger.error(f"Error processing request: {str(e)}", exc_info=True)
+            monitor.track_error("System", str(e))
+            if response_started:
+                raise
+            await JSONResponse({"detail": "Internal server error occurred"}, status_code=500)(scope, receive, send)
+
+class SecurityHeadersMiddleware:
+    headers = {
+        "X-Content-Type-Options": "nosniff",
+        "X-Frame-Options": "DENY",
+        "X-XSS-Protection": "1; mode=block",
+        "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+        "Content-Security-Policy": "default-src 'self'",
+    }
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in self.headers.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+class LoggingMiddleware:
+    """Log one line per sampled request and a periodic top-routes summary.
+
+    Every request is added to the route summary; only server errors, slow
+    requests and a sample of the rest get their own line.
+    """
+
+    def __init__(self, app: ASGIApp, policy: RequestLogPolicy = request_log_policy,
+                 summary: RouteSummary = route_summary) -> None:
+        self.app = app
+        self.policy = policy
+        self.summary = summary
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            method = scope["method"]
+            path = scope["path"]
+            self.summary.add(f"{method} {route_labels.resolve(scope)}", status_code, duration_ms)
+
+            if self.policy.should_log(path, status_code, duration_ms):
+                client = scope.get("client")
+                api_logger.info(
+                    f"{method} {path} {status_code} {duration_ms:.1f}ms",
+                    extra={
+                        "method": method,
+                        "path": path,
+                        "query_params": dict(QueryParams(scope.get("query_string", b""))),
+                        "client": client[0] if client else None,
+                        "status_code": status_code,
+                        "response_time": duration_ms / 1000
+                    }
+                )
+
+class ResponseTimeMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.time()
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Response-Time"] = str(time.time() - start_time)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The request-level feed for SystemMonitor's response time histogram
+            monitor.track_request(time.perf_counter() - start)
+
+class APIKeyMiddleware:
+    """Require a valid X-API-Key on every route except health check and metrics."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.exempt_paths = {"/health", "/metrics"}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] not in self.exempt_paths:
+            try:
+                await get_api_key(Headers(scope=scope).get("X-API-Key"))
+            except HTTPException as e:
+                await JSONResponse({"detail": e.detail}, status_code=e.status_code)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
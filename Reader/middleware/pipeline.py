@@ -0,0 +1,57 @@
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from typing import Any, Dict, List, Tuple, Type
+from ..config import settings
+from .api_metrics import APIMetricsMiddleware
+from .core import (
+    APIKeyMiddleware,
+    ErrorHandlerMiddleware,
+    LoggingMiddleware,
+    ResponseTimeMiddleware,
+    SecurityHeadersMiddleware,
+)
+from .query_profiler import QueryProfilerMiddleware
+from .rate_limit import RateLimitMiddleware
+from .security import SecurityMiddleware
+from .tracing import TracingMiddleware
+from .user_cache import RequestUserCacheMiddleware
+from .versioning import VersioningMiddleware
+
+Layer = Tuple[Type, Dict[str, Any]]
+
+def middleware_layers() -> List[Layer]:
+    """The application's middleware, outermost first.
+
+    Every layer is a plain ASGI callable that wraps ``send`` where it needs
+    the response, so a request costs one function call per layer rather
+    than a task and a memory stream per layer as with BaseHTTPMiddleware.
+    """
+    return [
+        (TracingMiddleware, {}),
+        (APIKeyMiddleware, {}),
+        (SecurityMiddleware, {}),
+        (RequestUserCacheMiddleware, {}),
+        (APIMetricsMiddleware, {}),
+        (QueryProfilerMiddleware, {}),
+        (RateLimitMiddleware, {
+            "max_requests": settings.RATE_LIMIT_MAX_REQUESTS,
+            "time_window": settings.RATE_LIMIT_TIME_WINDOW,
+        }),
+        (VersioningMiddleware, {}),
+        (CORSMiddleware, {
+            "allow_origins": settings.CORS_ORIGINS,
+            "allow_credentials": True,
+            "allow_methods": ["*"],
+            "allow_headers": ["*"],
+        }),
+        (ResponseTimeMiddleware, {}),
+        (LoggingMiddleware, {}),
+        (SecurityHeadersMiddleware, {}),
+        (ErrorHandlerMiddleware, {}),
+    ]
+
+def setup_middleware(app: FastAPI) -> None:
+    """Set up all middleware for the application."""
+    # add_middleware puts each new layer outside the previous ones
+    for cls, options in reversed(middleware_layers()):
+        app.add_middleware(cls, **options)
@@ -0,0 +1,20 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from ..monitor.route_labels import route_labels
+from ..query_profiler import query_profiler
+
+class QueryProfilerMiddleware:
+    """Collect the statements each request runs for slow-query and N+1 reporting."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = query_profiler.begin()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            query_profiler.end(token, route_labels.resolve(scope), scope["method"])
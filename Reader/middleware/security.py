@@ -1,100 +1,115 @@
-from fastapi import Request, HTTPException, status
-from fastapi.security import APIKeyHeader
-from typing import Optional, Dict, Any
+from collections import deque
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Deque, Optional
 import hmac
 import hashlib
-import time
-import json
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from ..config import settings
 from ..logger import logger
-from ..monitor import monitor
+from ..monitoring import monitor
 
 class SecurityMiddleware:
-    def __init__(self):
-        self.api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+    """Check API key, timestamp and HMAC body signature at the ASGI level.
+
+    The signed message is ``method + path + body + timestamp``, keyed by the
+    API key, and the HMAC is updated chunk by chunk as the body arrives.
+    Bodies of up to ``buffer_size`` bytes are read in memory and verified
+    before the app runs. Larger ones are streamed to the app as they arrive,
+    without any further copy: the final chunk is held back until the
+    signature matches. A mismatch raises out of the app's ``receive``, so
+    it never sees a complete unverified body. If the app answers before
+    reading the whole body, the rest is read and verified before its
+    response goes out. Either way the client gets 401. Bodies over
+    ``max_body_size`` are rejected with 413, before reading when
+    Content-Length declares it.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_body_size: int = settings.MAX_SIGNED_BODY_SIZE,
+        buffer_size: int = settings.SIGNED_BODY_BUFFER_SIZE
+    ):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.buffer_size = buffer_size
         self.signature_header = "X-Signature"
         self.timestamp_header = "X-Timestamp"
         self.max_request_age = 300  # 5 minutes in seconds
+        self.exempt_paths = {"/health", "/metrics"}
 
-    async def __call__(self, request: Request) -> None:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process incoming request for security checks."""
+        # Skip security checks for health and metrics endpoints
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        headers = Headers(scope=scope)
         try:
-            # Skip security checks for health and metrics endpoints
-            if request.url.path in ["/health", "/metrics"]:
+            api_key = self._validate_api_key(headers)
+            timestamp = self._validate_timestamp(headers)
+            signature = self._require_signature(headers)
+            self._validate_declared_size(headers)
+            stream = SignedBodyStream(
+                receive, self.max_body_size, signature, timestamp,
+                hmac.new(api_key.encode(), f"{scope['method']}{path}".encode(), hashlib.sha256)
+            )
+            if not await stream.prefetch(self.buffer_size):
+                # Client went away mid-upload; nothing to answer
                 return
-
-            # Validate API key
-            api_key = await self._validate_api_key(request)
-            
-            # Validate request signature
-            await self._validate_signature(request, api_key)
-            
-            # Validate request timestamp
-            await self._validate_timestamp(request)
-            
-            # Track security check
-            monitor.track_security_check(request.url.path, "success")
-            
-        except HTTPException as e:
-            monitor.track_security_check(request.url.path, "failed", str(e))
-            raise e
+        except (HTTPException, SignatureRejected) as e:
+            monitor.track_security_check(path, "failed", str(e.detail))
+            await self._reject(scope, receive, send, e.status_code, e.detail)
+            return
         except Exception as e:
             logger.error(f"Security middleware error: {str(e)}")
-            monitor.track_security_check(request.url.path, "error", str(e))
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
-            )
+            monitor.track_security_check(path, "error", str(e))
+            await self._reject(scope, receive, send, 500, "Internal server error")
+            return
 
-    async def _validate_api_key(self, request: Request) -> str:
+        verified_upfront = stream.verified
+        if verified_upfront:
+            monitor.track_security_check(path, "success")
+        try:
+            await self.app(scope, stream.receive, stream.guard(send))
+        except SignatureRejected as e:
+            monitor.track_security_check(path, "failed", str(e.detail))
+            if not stream.response_started:
+                await self._reject(scope, receive, send, e.status_code, e.detail)
+            return
+        if stream.verified and not verified_upfront:
+            monitor.track_security_check(path, "success")
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, status_code: int, detail: str) -> None:
+        response = JSONResponse({"detail": detail}, status_code=status_code)
+        await response(scope, receive, send)
+
+    def _validate_api_key(self, headers: Headers) -> str:
         """Validate API key from request header."""
-        api_key = await self.api_key_header(request)
+        api_key = headers.get("X-API-Key")
         if not api_key:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="API key is required"
             )
-        
-        if api_key != settings.API_KEY:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid API key"
-            )
-        
-        return api_key
 
-    async def _validate_signature(self, request: Request, api_key: str) -> None:
-        """Validate request signature."""
-        signature = request.headers.get(self.signature_header)
-        if not signature:
+        if not hmac.compare_digest(api_key, settings.API_KEY):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Request signature is required"
+                detail="Invalid API key"
             )
 
-        # Get request body
-        body = await self._get_request_body(request)
-        
-        # Calculate expected signature
-        expected_signature = self._calculate_signature(
-            method=request.method,
-            path=request.url.path,
-            body=body,
-            timestamp=request.headers.get(self.timestamp_header),
-            api_key=api_key
-        )
-
-        if not hmac.compare_digest(signature, expected_signature):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid request signature"
-            )
+        return api_key
 
-    async def _validate_timestamp(self, request: Request) -> None:
+    def _validate_timestamp(self, headers: Headers) -> str:
         """Validate request timestamp."""
-        timestamp = request.headers.get(self.timestamp_header)
+        timestamp = headers.get(self.timestamp_header)
         if not timestamp:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -103,43 +118,156 @@ class SecurityMiddleware:
 
         try:
             request_time = datetime.fromtimestamp(int(timestamp))
-            current_time = datetime.now()
-            
-            if abs((current_time - request_time).total_seconds()) > self.max_request_age:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Request timestamp is too old"
-                )
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid timestamp format"
             )
 
-    async def _get_request_body(self, request: Request) -> str:
-        """Get request body as string."""
-        try:
-            body = await request.body()
-            return body.decode()
-        except Exception:
-            return ""
+        if abs((datetime.now() - request_time).total_seconds()) > self.max_request_age:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Request timestamp is too old"
+            )
+        return timestamp
 
-    def _calculate_signature(
-        self,
-        method: str,
-        path: str,
-        body: str,
-        timestamp: str,
-        api_key: str
-    ) -> str:
-        """Calculate request signature."""
-        message = f"{method}{path}{body}{timestamp}"
-        signature = hmac.new(
-            api_key.encode(),
-            message.encode(),
-            hashlib.sha256
-        ).hexdigest()
+    def _require_signature(self, headers: Headers) -> str:
+        signature = headers.get(self.signature_header)
+        if not signature:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Request signature is required"
+            )
         return signature
 
-# Create global instance
-security_middleware = SecurityMiddleware() 
\ No newline at end of file
+    def _validate_declared_size(self, headers: Headers) -> None:
+        """Reject bodies whose Content-Length is over the limit before reading them."""
+        content_length = headers.get("content-length")
+        if content_length is None:
+            return
+        try:
+            declared = int(content_length)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid Content-Length"
+            )
+        if declared > self.max_body_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Request body too large"
+            )
+
+
+class SignatureRejected(Exception):
+    """Raised into the app's ``receive`` or ``send`` when the body fails its checks.
+
+    Deliberately not an HTTPException, so no handler inside the app turns it
+    into a response of its own.
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class SignedBodyStream:
+    """One request body, fed through an HMAC on its way to the app."""
+
+    def __init__(self, receive: Receive, max_body_size: int, signature: str, timestamp: str, mac):
+        self._receive = receive
+        self.max_body_size = max_body_size
+        self.signature = signature
+        self.timestamp = timestamp
+        self.mac = mac
+        self.received = 0
+        self.complete = False
+        self.verified = False
+        self.rejection: Optional[SignatureRejected] = None
+        self.response_started = False
+        self._buffered: Deque[bytes] = deque()
+
+    async def prefetch(self, buffer_size: int) -> bool:
+        """Read up to ``buffer_size`` bytes ahead; False if the client disconnects.
+
+        A body that ends within the buffer is verified here, before the app
+        runs.
+        """
+        buffered = 0
+        while not self.complete and buffered < buffer_size:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                return False
+            chunk = self._take(message)
+            buffered += len(chunk)
+            self._buffered.append(chunk)
+        return True
+
+    def _take(self, message: Message) -> bytes:
+        chunk = message.get("body", b"")
+        self.received += len(chunk)
+        if self.received > self.max_body_size:
+            self._reject(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        self.mac.update(chunk)
+        if not message.get("more_body", False):
+            self.complete = True
+            self._verify()
+        return chunk
+
+    def _verify(self) -> None:
+        self.mac.update(self.timestamp.encode())
+        if not hmac.compare_digest(self.signature, self.mac.hexdigest()):
+            self._reject(status.HTTP_401_UNAUTHORIZED, "Invalid request signature")
+        self.verified = True
+
+    def _reject(self, status_code: int, detail: str) -> None:
+        self.rejection = SignatureRejected(status_code, detail)
+        raise self.rejection
+
+    async def receive(self) -> Message:
+        """The app's ``receive``: buffered chunks first, then the live stream."""
+        if self._buffered:
+            chunk = self._buffered.popleft()
+            more_body = bool(self._buffered) or not self.complete
+            return {"type": "http.request", "body": chunk, "more_body": more_body}
+        if self.complete:
+            return await self._receive()
+        message = await self._receive()
+        if message["type"] == "http.disconnect":
+            return message
+        # Raises on the last chunk if the signature does not match
+        chunk = self._take(message)
+        return {"type": "http.request", "body": chunk, "more_body": not self.complete}
+
+    async def drain(self) -> None:
+        """Read and verify whatever of the body the app left unread."""
+        self._buffered.clear()
+        while not self.complete:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                self._reject(status.HTTP_400_BAD_REQUEST, "Request body incomplete")
+            self._take(message)
+
+    def guard(self, send: Send) -> Send:
+        """Hold the app's response until the body is verified.
+
+        Once the body has been rejected, no response from the app goes out,
+        not even an error page it renders for the rejection.
+        """
+        async def guarded_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                if self.rejection is None and not self.verified:
+                    await self.drain()
+                if self.rejection is not None:
+                    raise self.rejection
+                self.response_started = True
+            await send(message)
+
+        return guarded_send
+
+
+def sign_request(api_key: str, method: str, path: str, body: bytes, timestamp: str) -> str:
+    """Signature a client sends in ``X-Signature`` for the given request."""
+    message = f"{method}{path}".encode() + body + timestamp.encode()
+    return hmac.new(api_key.encode(), message, hashlib.sha256).hexdigest()
@@ -0,0 +1,45 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..monitor.route_labels import route_labels
+from ..tracing import tracer
+
+class TracingMiddleware:
+    """Open a root span per request and make it current for the layers below.
+
+    Continues an incoming W3C ``traceparent`` and returns the trace id in
+    ``X-Trace-Id`` so a slow response can be looked up at /debug/traces.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        root = tracer.start_trace(
+            f"{scope['method']} {scope['path']}",
+            traceparent=Headers(scope=scope).get("traceparent"),
+            attributes={"http.method": scope["method"], "http.target": scope["path"]}
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = "STATUS_CODE_ERROR"
+                MutableHeaders(scope=message)["X-Trace-Id"] = root.trace_id
+            await send(message)
+
+        try:
+            with tracer.activate(root):
+                await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            root.record_exception(e)
+            raise
+        finally:
+            route = route_labels.resolve(scope)
+            root.name = f"{scope['method']} {route}"
+            root.set_attribute("http.route", route)
+            tracer.finish_trace(root)
@@ -0,0 +1,19 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from ..user_cache import request_users
+
+class RequestUserCacheMiddleware:
+    """Give every HTTP request its own user identity map."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = request_users.begin()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_users.end(token)
@@ -1,23 +1,25 @@
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Callable, Awaitable
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from ..config import settings
 
-class VersioningMiddleware(BaseHTTPMiddleware):
+class VersioningMiddleware:
     """Middleware for API version negotiation."""
     
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.supported_versions = ["1.0.0", "1.1.0"]  # Add more versions as needed
         self.default_version = settings.API_VERSION
+        self.supported_header = ", ".join(self.supported_versions)
     
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Get requested version from header or query parameter
         requested_version = (
-            request.headers.get("X-API-Version") or
-            request.query_params.get("api-version") or
+            Headers(scope=scope).get("X-API-Version") or
+            QueryParams(scope.get("query_string", b"")).get("api-version") or
             self.default_version
         )
         
@@ -26,13 +28,15 @@ class VersioningMiddleware(BaseHTTPMiddleware):
             requested_version = self.default_version
         
         # Add version to request state
-        request.state.api_version = requested_version
+        scope.setdefault("state", {})["api_version"] = requested_version
         
+        async def send_wrapper(message: Message) -> None:
+            # Add version headers to response
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-API-Version"] = requested_version
+                headers["X-API-Supported-Versions"] = self.supported_header
+            await send(message)
+
         # Process request
-        response = await call_next(request)
-        
-        # Add version headers to response
-        response.headers["X-API-Version"] = requested_version
-        response.headers["X-API-Supported-Versions"] = ", ".join(self.supported_versions)
-        
-        return response 
\ No newline at end of file
+        await self.app(scope, receive, send_wrapper)
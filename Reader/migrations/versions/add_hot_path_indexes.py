@@ -0,0 +1,49 @@
+"""add composite indexes for hot query paths
+
+Revision ID: add_hot_path_indexes
+Revises: add_analytics_models
+Create Date: 2024-04-02 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_path_indexes'
+down_revision = 'add_analytics_models'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns, covering columns for PostgreSQL INCLUDE)
+INDEXES = [
+    ('ix_reading_sessions_user_id_start_time', 'reading_sessions', ['user_id', 'start_time'],
+     ['document_id', 'duration_minutes', 'pages_read']),
+    ('ix_reading_sessions_document_id_start_time', 'reading_sessions', ['document_id', 'start_time'],
+     ['duration_minutes', 'pages_read', 'end_time']),
+    ('ix_documents_project_id_created_at', 'documents', ['project_id', 'created_at'], []),
+    ('ix_projects_owner_id_created_at', 'projects', ['owner_id', 'created_at'], []),
+    ('ix_document_versions_document_id_version_number', 'document_versions',
+     ['document_id', 'version_number'], []),
+    ('ix_search_history_user_id_created_at', 'search_history', ['user_id', 'created_at'], []),
+    ('ix_collection_documents_collection_id_document_id', 'collection_documents',
+     ['collection_id', 'document_id'], []),
+]
+
+def _existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+def upgrade():
+    # Versioning, search and collection tables are only present in deployments
+    # that run those services, so skip indexes for tables that do not exist
+    tables = _existing_tables()
+    for name, table, columns, include in INDEXES:
+        if table not in tables:
+            continue
+        op.create_index(name, table, columns, unique=False, postgresql_include=include)
+
+def downgrade():
+    tables = _existing_tables()
+    for name, table, columns, include in reversed(INDEXES):
+        if table not in tables:
+            continue
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,35 @@
+"""add the permissions table behind AccessControl grants
+
+Revision ID: add_permissions
+Revises: hash_api_keys
+Create Date: 2024-04-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_permissions'
+down_revision = 'hash_api_keys'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'permissions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('permission', sa.String(), nullable=False),
+        sa.Column('resource_type', sa.String(), nullable=True),
+        sa.Column('resource_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_permissions_id'), 'permissions', ['id'], unique=False)
+    op.create_index('ix_permissions_user_id', 'permissions', ['user_id'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_permissions_user_id', table_name='permissions')
+    op.drop_index(op.f('ix_permissions_id'), table_name='permissions')
+    op.drop_table('permissions')
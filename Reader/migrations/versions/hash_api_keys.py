@@ -0,0 +1,70 @@
+"""store API keys as salted hashes behind a prefix index
+
+Revision ID: hash_api_keys
+Revises: add_hot_path_indexes
+Create Date: 2024-04-10 09:00:00.000000
+
+"""
+import hashlib
+import hmac
+import secrets
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'hash_api_keys'
+down_revision = 'add_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+# Frozen copies of api_keys.key_prefix / api_keys.hash_api_key so this
+# revision keeps producing the same encoding if the module changes
+PREFIX_LENGTH = 8
+
+def key_prefix(key):
+    return key[:PREFIX_LENGTH]
+
+def hash_api_key(key):
+    salt = secrets.token_hex(16)
+    digest = hmac.new(bytes.fromhex(salt), key.encode(), hashlib.sha256).hexdigest()
+    return f"sha256${salt}${digest}"
+
+def _has_api_keys():
+    return 'api_keys' in sa.inspect(op.get_bind()).get_table_names()
+
+def upgrade():
+    if not _has_api_keys():
+        return
+    op.add_column('api_keys', sa.Column('prefix', sa.String(16), nullable=True))
+    op.add_column('api_keys', sa.Column('key_hash', sa.String(), nullable=True))
+
+    # Hash existing keys so clients keep working across the upgrade
+    bind = op.get_bind()
+    api_keys = sa.table('api_keys', sa.column('id'), sa.column('key'),
+                        sa.column('prefix'), sa.column('key_hash'))
+    for row in bind.execute(sa.select(api_keys.c.id, api_keys.c.key)).fetchall():
+        bind.execute(
+            api_keys.update()
+            .where(api_keys.c.id == row.id)
+            .values(prefix=key_prefix(row.key), key_hash=hash_api_key(row.key))
+        )
+
+    with op.batch_alter_table('api_keys') as batch_op:
+        batch_op.alter_column('prefix', nullable=False)
+        batch_op.alter_column('key_hash', nullable=False)
+        batch_op.drop_index('ix_api_keys_key')
+        batch_op.drop_column('key')
+        batch_op.create_index('ix_api_keys_prefix', ['prefix'], unique=False)
+
+def downgrade():
+    # Plaintext keys cannot be recovered from their hashes; keys issued
+    # before the downgrade stop working and must be reissued
+    if not _has_api_keys():
+        return
+    with op.batch_alter_table('api_keys') as batch_op:
+        batch_op.drop_index('ix_api_keys_prefix')
+        batch_op.drop_column('key_hash')
+        batch_op.drop_column('prefix')
+        batch_op.add_column(sa.Column('key', sa.String(), nullable=True))
+        batch_op.create_index('ix_api_keys_key', ['key'], unique=True)
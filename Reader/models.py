@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -34,6 +34,9 @@ class Article(Base):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_owner_id_created_at", "owner_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -47,6 +50,9 @@ class Project(Base):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_project_id_created_at", "project_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -61,8 +67,32 @@ class Document(Base):
     project = relationship("Project", back_populates="documents")
     reading_sessions = relationship("ReadingSession", back_populates="document")
 
+class Permission(Base):
+    """An explicit grant; global when resource_type and resource_id are null."""
+    __tablename__ = "permissions"
+    __table_args__ = (
+        Index("ix_permissions_user_id", "user_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    permission = Column(String, nullable=False)
+    resource_type = Column(String, nullable=True)
+    resource_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class ReadingSession(Base):
     __tablename__ = "reading_sessions"
+    __table_args__ = (
+        Index(
+            "ix_reading_sessions_user_id_start_time", "user_id", "start_time",
+            postgresql_include=["document_id", "duration_minutes", "pages_read"]
+        ),
+        Index(
+            "ix_reading_sessions_document_id_start_time", "document_id", "start_time",
+            postgresql_include=["duration_minutes", "pages_read", "end_time"]
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
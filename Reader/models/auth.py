@@ -1,7 +1,6 @@
 from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from datetime import datetime
-import secrets
 
 from .base import Base
 
@@ -25,14 +24,11 @@ class APIKey(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
-    key = Column(String, unique=True, index=True, nullable=False)
+    prefix = Column(String(16), index=True, nullable=False)
+    key_hash = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     expires_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    user = relationship("User", back_populates="api_keys")
-
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.key = secrets.token_urlsafe(32) 
\ No newline at end of file
+    user = relationship("User", back_populates="api_keys") 
\ No newline at end of file
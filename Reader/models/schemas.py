@@ -32,7 +32,8 @@ class APIKeyCreate(APIKeyBase):
 class APIKey(APIKeyBase):
     id: int
     user_id: int
-    key: str
+    prefix: str
+    key: str  # Plaintext, only present in the creation response
     is_active: bool
     created_at: datetime
     updated_at: datetime
@@ -1,38 +1,22 @@
-from prometheus_client import Counter, Histogram, Gauge
 from typing import Dict, Any
-import time
-from ..monitor import monitor
-
-# API Metrics
-api_requests_total = Counter(
-    'api_requests_total',
-    'Total number of API requests',
-    ['endpoint', 'method', 'status_code']
-)
-
-api_request_duration = Histogram(
-    'api_request_duration_seconds',
-    'API request duration in seconds',
-    ['endpoint', 'method']
-)
-
-api_errors_total = Counter(
-    'api_errors_total',
-    'Total number of API errors',
-    ['endpoint', 'method', 'error_type']
-)
-
-api_rate_limited = Counter(
-    'api_rate_limited_total',
-    'Total number of rate-limited requests',
-    ['endpoint', 'method']
+from ..monitoring import monitor
+from .metrics import (
+    api_requests_total,
+    api_request_duration,
+    api_errors_total,
+    api_rate_limited,
+    api_response_size,
+    api_time_to_first_byte,
 )
 
-api_response_size = Histogram(
-    'api_response_size_bytes',
-    'API response size in bytes',
-    ['endpoint', 'method']
-)
+def _sample_total(metric, suffix: str) -> float:
+    """Sum one sample series (e.g. ``_total`` or ``_sum``) over every label set."""
+    return sum(
+        sample.value
+        for family in metric.collect()
+        for sample in family.samples
+        if sample.name == family.name + suffix
+    )
 
 class APIMonitor:
     def __init__(self):
@@ -75,14 +59,24 @@ class APIMonitor:
             method=method
         ).observe(size)
     
+    async def track_time_to_first_byte(self, endpoint: str, method: str, duration: float):
+        """Track time until the response started."""
+        api_time_to_first_byte.labels(
+            endpoint=endpoint,
+            method=method
+        ).observe(duration)
+    
     async def get_api_metrics(self) -> Dict[str, Any]:
-        """Get current API metrics."""
+        """Get this worker's API metrics, aggregated over all labels."""
+        total_requests = _sample_total(api_requests_total, "_total")
+        response_count = _sample_total(api_response_size, "_count")
+        duration_count = _sample_total(api_request_duration, "_count")
         return {
-            "total_requests": api_requests_total._value.get(),
-            "error_rate": api_errors_total._value.get() / api_requests_total._value.get() if api_requests_total._value.get() > 0 else 0,
-            "rate_limited_requests": api_rate_limited._value.get(),
-            "average_response_size": api_response_size._sum.get() / api_response_size._count.get() if api_response_size._count.get() > 0 else 0,
-            "average_response_time": api_request_duration._sum.get() / api_request_duration._count.get() if api_request_duration._count.get() > 0 else 0
+            "total_requests": total_requests,
+            "error_rate": _sample_total(api_errors_total, "_total") / total_requests if total_requests > 0 else 0,
+            "rate_limited_requests": _sample_total(api_rate_limited, "_total"),
+            "average_response_size": _sample_total(api_response_size, "_sum") / response_count if response_count > 0 else 0,
+            "average_response_time": _sample_total(api_request_duration, "_sum") / duration_count if duration_count > 0 else 0
         }
 
 # Global instance
@@ -0,0 +1,236 @@
+import os
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+def multiprocess_enabled() -> bool:
+    """True when uvicorn/gunicorn workers share metrics through PROMETHEUS_MULTIPROC_DIR."""
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+class LazyMetric:
+    """A metric declared at import but only created and registered on first use.
+
+    Attribute access (``labels``, ``inc``, ``observe``...) is forwarded to the
+    underlying prometheus_client metric.
+    """
+
+    def __init__(self, registry: "MetricsRegistry", kind: type, name: str, documentation: str,
+                 labelnames: Sequence[str], options: Dict[str, Any]):
+        self._registry = registry
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.options = options
+        self._metric = None
+
+    def get(self):
+        if self._metric is None:
+            with self._registry.lock:
+                if self._metric is None:
+                    self._metric = self.kind(
+                        self.name,
+                        self.documentation,
+                        self.labelnames,
+                        registry=self._registry.registry,
+                        **self.options
+                    )
+        return self._metric
+
+    def __getattr__(self, attr):
+        return getattr(self.get(), attr)
+
+class MetricsRegistry:
+    """The one place metrics are declared and exposed.
+
+    Declaring the same name twice with the same type and labels returns the
+    existing metric, so modules can share one without import-order races;
+    conflicting declarations fail immediately. ``exposition`` renders the
+    Prometheus text format, aggregating every worker's samples when
+    ``PROMETHEUS_MULTIPROC_DIR`` is set.
+    """
+
+    def __init__(self, registry: Optional[CollectorRegistry] = None):
+        self.registry = registry or CollectorRegistry(auto_describe=True)
+        self.lock = threading.RLock()
+        self._declared: Dict[str, LazyMetric] = {}
+
+    def _declare(self, kind: type, name: str, documentation: str,
+                 labelnames: Sequence[str], **options) -> LazyMetric:
+        with self.lock:
+            existing = self._declared.get(name)
+            if existing is not None:
+                if existing.kind is not kind or existing.labelnames != tuple(labelnames):
+                    raise ValueError(f"Metric {name} already declared with a different type or labels")
+                return existing
+            metric = LazyMetric(self, kind, name, documentation, labelnames, options)
+            self._declared[name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> LazyMetric:
+        return self._declare(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS) -> LazyMetric:
+        return self._declare(Histogram, name, documentation, labelnames, buckets=tuple(buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              multiprocess_mode: str = "livesum") -> LazyMetric:
+        """``multiprocess_mode`` says how worker values combine, e.g. livesum or livemax."""
+        return self._declare(Gauge, name, documentation, labelnames, multiprocess_mode=multiprocess_mode)
+
+    def exposition(self) -> Tuple[bytes, str]:
+        """Body and content type for a /metrics response.
+
+        Every declared metric is registered first so scrapes always see the
+        same families, even before a metric's first use.
+        """
+        for metric in list(self._declared.values()):
+            metric.get()
+        if multiprocess_enabled():
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry), CONTENT_TYPE_LATEST
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+    def mark_process_dead(self, pid: Optional[int] = None) -> None:
+        """Drop a finished worker's live gauges from the multiprocess directory."""
+        if multiprocess_enabled():
+            multiprocess.mark_process_dead(pid or os.getpid())
+
+# Create global metrics registry instance
+metrics = MetricsRegistry()
+
+# API Metrics
+api_requests_total = metrics.counter(
+    'api_requests_total',
+    'Total number of API requests',
+    ['endpoint', 'method', 'status_code']
+)
+
+api_request_duration = metrics.histogram(
+    'api_request_duration_seconds',
+    'API request duration in seconds',
+    ['endpoint', 'method']
+)
+
+api_time_to_first_byte = metrics.histogram(
+    'api_time_to_first_byte_seconds',
+    'Time from request start until response headers are sent',
+    ['endpoint', 'method']
+)
+
+api_errors_total = metrics.counter(
+    'api_errors_total',
+    'Total number of API errors',
+    ['endpoint', 'method', 'error_type']
+)
+
+api_rate_limited = metrics.counter(
+    'api_rate_limited_total',
+    'Total number of rate-limited requests',
+    ['endpoint', 'method']
+)
+
+api_response_size = metrics.histogram(
+    'api_response_size_bytes',
+    'API response size in bytes',
+    ['endpoint', 'method'],
+    buckets=[100, 1000, 10000, 100000, 1000000, 10000000]
+)
+
+# System Metrics; sampled in the background, identical on every worker
+system_uptime = metrics.gauge(
+    'system_uptime_seconds',
+    'Process uptime in seconds',
+    multiprocess_mode='livemax'
+)
+
+system_memory_usage = metrics.gauge(
+    'system_memory_usage_bytes',
+    'System memory usage in bytes',
+    multiprocess_mode='livemax'
+)
+
+system_memory_total = metrics.gauge(
+    'system_memory_total_bytes',
+    'System memory in bytes',
+    multiprocess_mode='livemax'
+)
+
+system_cpu_usage = metrics.gauge(
+    'system_cpu_usage_percent',
+    'System CPU usage percentage',
+    multiprocess_mode='livemax'
+)
+
+system_disk_usage = metrics.gauge(
+    'system_disk_usage_bytes',
+    'System disk usage in bytes',
+    multiprocess_mode='livemax'
+)
+
+# Application Metrics
+app_version = metrics.gauge(
+    'app_version',
+    'Application version',
+    ['version'],
+    multiprocess_mode='livemax'
+)
+
+# Database Metrics; each worker has its own pool, so connections add up
+# ``pool`` is "sync" or "async", one per engine
+db_connections = metrics.gauge(
+    'db_connections_total',
+    'Total number of database connections',
+    ['state', 'pool']
+)
+
+db_pool_checkout_latency = metrics.histogram(
+    'db_pool_checkout_latency_seconds',
+    'Time spent waiting for a connection from the pool',
+    ['pool'],
+    buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0]
+)
+
+db_pool_saturation = metrics.gauge(
+    'db_pool_saturation_ratio',
+    'Checked-out connections as a fraction of pool size plus overflow',
+    ['pool'],
+    multiprocess_mode='livemax'
+)
+
+db_query_duration = metrics.histogram(
+    'db_query_duration_seconds',
+    'Database query duration in seconds',
+    ['query_type'],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0]
+)
+
+db_queries_per_request = metrics.histogram(
+    'db_queries_per_request',
+    'Statements executed while serving one request',
+    ['endpoint', 'method'],
+    buckets=[1, 2, 5, 10, 20, 50, 100, 200]
+)
+
+db_n_plus_one_total = metrics.counter(
+    'db_n_plus_one_total',
+    'Requests repeating one statement fingerprint at least DB_N_PLUS_ONE_THRESHOLD times',
+    ['endpoint', 'method']
+)
+
+db_slow_queries_total = metrics.counter(
+    'db_slow_queries_total',
+    'Statements slower than DB_SLOW_QUERY_MS',
+    ['query_type']
+)
@@ -1,129 +1,71 @@
-from prometheus_client import start_http_server, Counter, Histogram, Gauge, Enum
+import asyncio
 import time
-from typing import Dict, Any
-from ..config import settings
 import psutil
-
-# API Metrics
-api_requests_total = Counter(
-    'api_requests_total',
-    'Total number of API requests',
-    ['method', 'endpoint', 'status_code']
-)
-
-api_request_duration = Histogram(
-    'api_request_duration_seconds',
-    'API request duration in seconds',
-    ['method', 'endpoint'],
-    buckets=[0.1, 0.5, 1.0, 2.0, 5.0]
-)
-
-api_errors_total = Counter(
-    'api_errors_total',
-    'Total number of API errors',
-    ['error_type', 'endpoint']
-)
-
-api_rate_limited = Counter(
-    'api_rate_limited_total',
-    'Total number of rate-limited requests',
-    ['endpoint']
-)
-
-api_response_size = Histogram(
-    'api_response_size_bytes',
-    'API response size in bytes',
-    ['method', 'endpoint'],
-    buckets=[100, 1000, 10000, 100000, 1000000]
-)
-
-# System Metrics
-system_uptime = Gauge(
-    'system_uptime_seconds',
-    'System uptime in seconds'
-)
-
-system_memory_usage = Gauge(
-    'system_memory_usage_bytes',
-    'System memory usage in bytes'
-)
-
-system_cpu_usage = Gauge(
-    'system_cpu_usage_percent',
-    'System CPU usage percentage'
-)
-
-system_disk_usage = Gauge(
-    'system_disk_usage_bytes',
-    'System disk usage in bytes'
-)
-
-# Application Metrics
-app_health = Enum(
-    'app_health',
-    'Application health status',
-    states=['healthy', 'degraded', 'unhealthy']
-)
-
-app_version = Gauge(
-    'app_version',
-    'Application version',
-    ['version']
+from typing import Optional, Tuple
+from ..config import settings
+from .. import logger
+from .metrics import (
+    metrics,
+    app_version,
+    system_uptime,
+    system_memory_usage,
+    system_memory_total,
+    system_cpu_usage,
+    system_disk_usage,
 )
 
-# Database Metrics
-db_connections = Gauge(
-    'db_connections_total',
-    'Total number of database connections'
-)
+class PrometheusMetrics:
+    """Exposes the metrics registry and samples system gauges in the background.
 
-db_query_duration = Histogram(
-    'db_query_duration_seconds',
-    'Database query duration in seconds',
-    ['query_type'],
-    buckets=[0.01, 0.05, 0.1, 0.5, 1.0]
-)
+    psutil calls (CPU percent in particular) are too slow for the scrape
+    path, so a task refreshes the system gauges every ``sample_interval``
+    seconds and ``/metrics`` only renders what is already there.
+    """
 
-class PrometheusMetrics:
-    def __init__(self):
+    def __init__(self, sample_interval: float = 15.0):
         self.start_time = time.time()
-        if settings.ENABLE_METRICS:
-            start_http_server(settings.METRICS_PORT)
-    
+        self.sample_interval = sample_interval
+        self.logger = logger.logger
+        self._sampler: Optional[asyncio.Task] = None
+
     def update_system_metrics(self):
         """Update system metrics."""
+        memory = psutil.virtual_memory()
         system_uptime.set(time.time() - self.start_time)
-        system_memory_usage.set(psutil.virtual_memory().used)
-        system_cpu_usage.set(psutil.cpu_percent())
+        system_memory_usage.set(memory.used)
+        system_memory_total.set(memory.total)
+        # Non-blocking: percentage since the previous call
+        system_cpu_usage.set(psutil.cpu_percent(interval=None))
         system_disk_usage.set(psutil.disk_usage('/').used)
-    
-    def get_metrics(self) -> Dict[str, Any]:
-        """Get current metrics data."""
-        self.update_system_metrics()
-        
-        return {
-            "api": {
-                "requests_total": api_requests_total._value.get(),
-                "request_duration": api_request_duration._sum.get(),
-                "errors_total": api_errors_total._value.get(),
-                "rate_limited": api_rate_limited._value.get(),
-                "response_size": api_response_size._sum.get()
-            },
-            "system": {
-                "uptime": system_uptime._value.get(),
-                "memory_usage": system_memory_usage._value.get(),
-                "cpu_usage": system_cpu_usage._value.get(),
-                "disk_usage": system_disk_usage._value.get()
-            },
-            "app": {
-                "health": app_health._value.get(),
-                "version": app_version._value.get()
-            },
-            "database": {
-                "connections": db_connections._value.get(),
-                "query_duration": db_query_duration._sum.get()
-            }
-        }
+
+    async def _sample(self):
+        while True:
+            try:
+                self.update_system_metrics()
+            except Exception as e:
+                self.logger.error(f"Error sampling system metrics: {str(e)}")
+            await asyncio.sleep(self.sample_interval)
+
+    def start_sampler(self):
+        """Start the background system sampler on the running loop."""
+        if settings.MONITORING_ENABLED and self._sampler is None:
+            app_version.labels(version=settings.API_VERSION).set(1)
+            self._sampler = asyncio.get_event_loop().create_task(self._sample())
+
+    async def stop_sampler(self):
+        """Stop the sampler and release this worker's multiprocess gauges."""
+        if self._sampler is not None:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+            self._sampler = None
+        metrics.mark_process_dead()
+
+    def exposition(self) -> Tuple[bytes, str]:
+        """Render all metrics in the Prometheus text format."""
+        return metrics.exposition()
 
 # Alerting rules
 ALERT_RULES = {
@@ -158,4 +100,4 @@ ALERT_RULES = {
 }
 
 # Global instance
-prometheus_metrics = PrometheusMetrics() 
\ No newline at end of file
+prometheus_metrics = PrometheusMetrics(sample_interval=settings.METRICS_SAMPLE_INTERVAL_SECONDS)
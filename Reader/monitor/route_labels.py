@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from starlette.routing import Match, Mount
+from starlette.types import Scope
+from typing import Optional, Set
+from ..config import settings
+
+UNMATCHED_LABEL = "__unmatched__"
+OVERFLOW_LABEL = "__other__"
+
+class RouteLabelResolver:
+    """Turn request paths into route templates for metric labels.
+
+    ``/documents/123`` becomes ``/documents/{document_id}``, so the number of
+    series grows with the number of routes rather than the number of ids.
+    Resolved paths are kept in an LRU of ``cache_size`` entries; paths that
+    match no route share one label, and once ``max_labels`` distinct
+    templates have been seen any new one falls into an overflow label.
+    """
+
+    def __init__(self, max_labels: int = 500, cache_size: int = 10000):
+        self.max_labels = max_labels
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._labels: Set[str] = set()
+
+    def resolve(self, scope: Scope) -> str:
+        path = scope["path"]
+        label = self._cache.get(path)
+        if label is not None:
+            self._cache.move_to_end(path)
+            return label
+
+        label = self._cap(self._match(scope) or UNMATCHED_LABEL)
+        self._cache[path] = label
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return label
+
+    def _match(self, scope: Scope) -> Optional[str]:
+        app = scope.get("app")
+        routes = getattr(app, "routes", None)
+        if not routes:
+            return None
+        partial = None
+        for route in routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return self._template(route)
+            if match == Match.PARTIAL and partial is None:
+                # Path matched but the method did not; still the same template
+                partial = self._template(route)
+        return partial
+
+    def _template(self, route) -> str:
+        path = getattr(route, "path_format", None) or route.path
+        if isinstance(route, Mount):
+            return f"{path}/{{path}}"
+        return path
+
+    def _cap(self, label: str) -> str:
+        if label in self._labels or label == UNMATCHED_LABEL:
+            return label
+        if len(self._labels) >= self.max_labels:
+            return OVERFLOW_LABEL
+        self._labels.add(label)
+        return label
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._labels.clear()
+
+# Create global route label resolver instance
+route_labels = RouteLabelResolver(
+    max_labels=settings.METRICS_MAX_ROUTE_LABELS,
+    cache_size=settings.METRICS_ROUTE_CACHE_SIZE
+)
@@ -1,17 +1,198 @@
+import asyncio
+import functools
+import math
+import threading
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from . import models, logger
 
+class ShardedCounter:
+    """A counter each thread increments in its own cell; reads sum the cells.
+
+    Increments never take a lock or contend with other threads; the lock is
+    only taken the first time a thread touches the counter.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def _cell(self) -> List[float]:
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = [0]
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+        return cell
+
+    def inc(self, amount: float = 1) -> None:
+        self._cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return sum(cell[0] for cell in list(self._cells))
+
+    def reset(self) -> None:
+        # Best effort: an increment racing with the reset may survive it
+        for cell in list(self._cells):
+            cell[0] = 0
+
+# Log-linear buckets: exact below SUB_BUCKETS µs, then HALF_BUCKETS per power of two
+SUB_BITS = 7
+SUB_BUCKETS = 1 << SUB_BITS
+HALF_BUCKETS = SUB_BUCKETS >> 1
+
+def bucket_index(micros: int) -> int:
+    """Bucket for a duration in microseconds."""
+    if micros < SUB_BUCKETS:
+        return micros
+    shift = micros.bit_length() - SUB_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + ((micros >> shift) - HALF_BUCKETS)
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """Lower (inclusive) and upper (exclusive) microseconds of a bucket."""
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift = (index - SUB_BUCKETS) // HALF_BUCKETS + 1
+    mantissa = (index - SUB_BUCKETS) % HALF_BUCKETS + HALF_BUCKETS
+    return mantissa << shift, (mantissa + 1) << shift
+
+class _HistogramShard:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+class LatencyHistogram:
+    """HDR-style latency histogram with per-thread shards merged on read.
+
+    Durations are bucketed log-linearly at microsecond resolution, so any
+    quantile is within about 1% of the true value whatever the range, in
+    a few hundred buckets. Memory does not grow with the number of samples.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_HistogramShard] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> _HistogramShard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _HistogramShard()
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def record(self, seconds: float) -> None:
+        shard = self._shard()
+        index = bucket_index(max(int(seconds * 1_000_000), 0))
+        shard.counts[index] = shard.counts.get(index, 0) + 1
+        shard.count += 1
+        shard.total += seconds
+        if seconds > shard.max:
+            shard.max = seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        """Count, sum, mean, max and p50/p95/p99 in seconds."""
+        counts: Dict[int, int] = {}
+        count, total, maximum = 0, 0.0, 0.0
+        for shard in list(self._shards):
+            for index, n in list(shard.counts.items()):
+                counts[index] = counts.get(index, 0) + n
+            count += shard.count
+            total += shard.total
+            maximum = max(maximum, shard.max)
+
+        # Walk the buckets once for all quantiles
+        quantiles = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+        values = {name: 0.0 for name in quantiles}
+        observed = sum(counts.values())
+        if observed:
+            ranks = sorted((max(1, math.ceil(q * observed)), name) for name, q in quantiles.items())
+            seen = 0
+            for index in sorted(counts):
+                seen += counts[index]
+                while ranks and ranks[0][0] <= seen:
+                    low, high = bucket_bounds(index)
+                    values[ranks.pop(0)[1]] = min((low + high) / 2 / 1_000_000, maximum)
+                if not ranks:
+                    break
+
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0,
+            "max": maximum,
+            **values
+        }
+
+    def reset(self) -> None:
+        for shard in list(self._shards):
+            shard.counts = {}
+            shard.count = 0
+            shard.total = 0.0
+            shard.max = 0.0
+
+class OperationTimer:
+    """Time a named operation, as ``with monitor.timer(name):`` or ``@monitor.timer(name)``."""
+
+    def __init__(self, monitor: "SystemMonitor", name: str):
+        self.monitor = monitor
+        self.name = name
+        self._start = 0.0
+
+    def __enter__(self) -> "OperationTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.monitor.track_operation(self.name, time.perf_counter() - self._start)
+
+    def __call__(self, fn: Callable) -> Callable:
+        # Each call times itself; the timer instance holds no per-call state
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self.monitor.track_operation(self.name, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.monitor.track_operation(self.name, time.perf_counter() - start)
+        return wrapper
+
 class SystemMonitor:
     def __init__(self):
-        self.metrics: Dict[str, Any] = {
-            "start_time": datetime.now(),
-            "requests_processed": 0,
-            "errors_encountered": 0,
-            "average_response_time": 0,
-            "total_response_time": 0,
+        self.start_time = datetime.now()
+        self.requests = ShardedCounter()
+        self.errors = ShardedCounter()
+        self.response_times = LatencyHistogram()
+        self.operations: Dict[str, LatencyHistogram] = {}
+        self._operations_lock = threading.Lock()
+        self.security_checks: Dict[str, ShardedCounter] = {
+            "success": ShardedCounter(),
+            "failed": ShardedCounter(),
+            "error": ShardedCounter()
+        }
+        self.gauges: Dict[str, float] = {
             "active_users": 0,
             "documents_processed": 0,
             "storage_used": 0
@@ -19,51 +200,83 @@ class SystemMonitor:
         self.logger = logger.logger
 
     def track_request(self, response_time: float):
-        """Track API request metrics."""
-        self.metrics["requests_processed"] += 1
-        self.metrics["total_response_time"] += response_time
-        self.metrics["average_response_time"] = (
-            self.metrics["total_response_time"] / self.metrics["requests_processed"]
-        )
+        """Track one API request's total response time."""
+        self.requests.inc()
+        self.response_times.record(response_time)
+
+    def track_operation(self, name: str, duration: float):
+        """Track a named operation's duration; request totals are kept separately."""
+        histogram = self.operations.get(name)
+        if histogram is None:
+            with self._operations_lock:
+                histogram = self.operations.setdefault(name, LatencyHistogram())
+        histogram.record(duration)
+
+    def timer(self, name: str) -> OperationTimer:
+        """Time an operation as a context manager or decorator."""
+        return OperationTimer(self, name)
 
     def track_error(self, error_type: str, error_message: str):
         """Track system errors."""
-        self.metrics["errors_encountered"] += 1
+        self.errors.inc()
         self.logger.error(f"{error_type}: {error_message}")
 
+    def track_security_check(self, path: str, outcome: str, detail: Optional[str] = None):
+        """Track a request signature check: "success", "failed" or "error"."""
+        counter = self.security_checks.get(outcome)
+        if counter is not None:
+            counter.inc()
+        if outcome == "failed":
+            self.logger.warning(f"Security check failed on {path}: {detail}")
+        elif outcome == "error":
+            self.track_error("SecurityCheck", f"{path}: {detail}")
+
     def update_user_metrics(self, db: Session):
         """Update metrics related to users and documents."""
         try:
-            self.metrics["active_users"] = db.query(models.User).count()
-            self.metrics["documents_processed"] = db.query(models.Document).count()
-            
+            self.gauges["active_users"] = db.query(models.User).count()
+            self.gauges["documents_processed"] = db.query(models.Document).count()
+
             # Calculate storage used (in MB)
             total_size = db.query(func.sum(models.Document.file_size)).scalar() or 0
-            self.metrics["storage_used"] = total_size / (1024 * 1024)  # Convert to MB
+            self.gauges["storage_used"] = total_size / (1024 * 1024)  # Convert to MB
         except Exception as e:
             self.logger.error(f"Error updating metrics: {str(e)}")
 
     def get_metrics(self) -> Dict[str, Any]:
         """Get current system metrics."""
-        uptime = datetime.now() - self.metrics["start_time"]
+        uptime = datetime.now() - self.start_time
+        response_times = self.response_times.snapshot()
         return {
-            **self.metrics,
+            "start_time": self.start_time,
+            "requests_processed": self.requests.value,
+            "errors_encountered": self.errors.value,
+            "average_response_time": response_times["mean"],
+            "total_response_time": response_times["sum"],
+            "response_time": response_times,
+            "operations": {
+                name: histogram.snapshot()
+                for name, histogram in list(self.operations.items())
+            },
+            "security_checks": {
+                outcome: counter.value for outcome, counter in self.security_checks.items()
+            },
+            **self.gauges,
             "uptime_seconds": uptime.total_seconds(),
             "uptime_hours": uptime.total_seconds() / 3600
         }
 
     def reset_metrics(self):
         """Reset all metrics except start_time."""
-        self.metrics = {
-            "start_time": self.metrics["start_time"],
-            "requests_processed": 0,
-            "errors_encountered": 0,
-            "average_response_time": 0,
-            "total_response_time": 0,
-            "active_users": 0,
-            "documents_processed": 0,
-            "storage_used": 0
-        }
+        self.requests.reset()
+        self.errors.reset()
+        self.response_times.reset()
+        for histogram in list(self.operations.values()):
+            histogram.reset()
+        for counter in self.security_checks.values():
+            counter.reset()
+        for name in self.gauges:
+            self.gauges[name] = 0
 
 # Create global monitor instance
-monitor = SystemMonitor() 
\ No newline at end of file
+monitor = SystemMonitor()
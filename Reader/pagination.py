@@ -0,0 +1,96 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import Select
+
+from .exceptions import ValidationError
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode a (sort_key, id) position as an opaque URL-safe cursor."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column) -> Tuple[Any, int]:
+    """Decode a cursor produced by ``encode_cursor`` for ``sort_column``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(sort_column.type, DateTime) and sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid pagination cursor")
+
+
+def _seek(query, sort_column, id_column, cursor: Optional[str], limit: int, descending: bool):
+    """Apply the keyset filter, ordering and limit to a Query or Select."""
+    position = tuple_(sort_column, id_column)
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column)
+        if descending:
+            query = query.filter(position < tuple_(sort_value, row_id))
+        else:
+            query = query.filter(position > tuple_(sort_value, row_id))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # One extra row tells us whether another page exists
+    return query.limit(limit + 1)
+
+
+def _page(rows: List[Any], sort_column, id_column, limit: int) -> Tuple[List[Any], Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+
+def keyset_paginate(
+    query: Query,
+    sort_column,
+    id_column,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = False
+) -> Tuple[List[Any], Optional[str]]:
+    """Fetch one page ordered by (sort_column, id_column) after ``cursor``.
+
+    Seeks straight to the cursor position with a row-value comparison, so the
+    cost of a page does not depend on how deep it is. Returns the rows and the
+    cursor for the next page, or ``None`` on the last page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = _seek(query, sort_column, id_column, cursor, limit, descending).all()
+    return _page(rows, sort_column, id_column, limit)
+
+
+async def keyset_paginate_async(
+    db: AsyncSession,
+    stmt: Select,
+    sort_column,
+    id_column,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = False
+) -> Tuple[List[Any], Optional[str]]:
+    """``keyset_paginate`` for a ``select()`` statement on an ``AsyncSession``."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    result = await db.execute(_seek(stmt, sort_column, id_column, cursor, limit, descending))
+    return _page(result.scalars().all(), sort_column, id_column, limit)
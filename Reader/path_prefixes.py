@@ -0,0 +1,19 @@
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class PathPrefixes(Generic[T]):
+    """Values keyed by URL path prefix, looked up by longest match."""
+
+    def __init__(self, entries: Optional[Dict[str, T]] = None):
+        # Longest prefix first so the most specific route matches
+        self._entries: List[Tuple[str, T]] = sorted(
+            (entries or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+
+    def match(self, path: str, default: T) -> T:
+        for prefix, value in self._entries:
+            if path.startswith(prefix):
+                return value
+        return default
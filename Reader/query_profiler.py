@@ -0,0 +1,124 @@
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, Tuple
+from . import logger
+from .config import settings
+from .monitor.metrics import (
+    db_query_duration,
+    db_queries_per_request,
+    db_n_plus_one_total,
+    db_slow_queries_total,
+)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\([^)]+\)s|\$\d+|(?<!:):[a-zA-Z_]\w*")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so executions differing only in values compare equal."""
+    statement = _STRING.sub("?", statement)
+    statement = _PARAM.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _LIST.sub("(...)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+def query_type(statement: str) -> str:
+    """Leading SQL verb, used as the ``query_type`` metric label."""
+    verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return verb if verb in ("select", "insert", "update", "delete") else "other"
+
+class RequestQueryStats:
+    """Statements executed while serving one request."""
+
+    def __init__(self):
+        self.endpoint = ""
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints: Counter = Counter()
+        self.slow: List[Tuple[str, float]] = []
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Fingerprints executed at least ``threshold`` times, most frequent first."""
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("query_stats", default=None)
+
+class QueryProfiler:
+    """Count, fingerprint and time the statements run by each request.
+
+    Every statement is observed in ``db_query_duration``. At the end of a
+    request, statements slower than ``slow_query_ms`` and fingerprints
+    repeated ``n_plus_one_threshold`` times or more (a query issued in a
+    loop) are logged and counted. Listeners receive each finished
+    request's stats, which is how the test suite enforces query budgets.
+    """
+
+    def __init__(self, slow_query_ms: float = 200.0, n_plus_one_threshold: int = 5):
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.listeners: List[Callable[[RequestQueryStats], None]] = []
+        self._lock = threading.Lock()
+        self.logger = logger.logger
+
+    def record(self, statement: str, duration: float) -> None:
+        """Record one executed statement."""
+        kind = query_type(statement)
+        db_query_duration.labels(query_type=kind).observe(duration)
+        slow = duration * 1000 >= self.slow_query_ms
+        if slow:
+            db_slow_queries_total.labels(query_type=kind).inc()
+
+        stats = _current_stats.get()
+        if stats is None:
+            if slow:
+                self.logger.warning(f"Slow query {duration * 1000:.1f}ms: {fingerprint(statement)}")
+            return
+        normalized = fingerprint(statement)
+        with self._lock:
+            stats.count += 1
+            stats.total_time += duration
+            stats.fingerprints[normalized] += 1
+            if slow:
+                stats.slow.append((normalized, duration))
+
+    def begin(self):
+        """Start collecting statements for the current request."""
+        return _current_stats.set(RequestQueryStats())
+
+    def end(self, token, endpoint: str, method: str) -> RequestQueryStats:
+        """Stop collecting, then log, count and publish what the request ran."""
+        stats = _current_stats.get()
+        _current_stats.reset(token)
+        stats.endpoint = f"{method} {endpoint}"
+
+        db_queries_per_request.labels(endpoint=endpoint, method=method).observe(stats.count)
+        for normalized, duration in stats.slow:
+            self.logger.warning(f"Slow query {duration * 1000:.1f}ms on {stats.endpoint}: {normalized}")
+        for normalized, n in stats.repeated(self.n_plus_one_threshold):
+            db_n_plus_one_total.labels(endpoint=endpoint, method=method).inc()
+            self.logger.warning(f"N+1 query pattern on {stats.endpoint}: {n}x {normalized}")
+
+        for listener in list(self.listeners):
+            listener(stats)
+        return stats
+
+    @contextmanager
+    def profile(self, endpoint: str = "", method: str = "") -> Iterator[RequestQueryStats]:
+        """Collect statements run inside a block, as for a request."""
+        token = self.begin()
+        stats = _current_stats.get()
+        try:
+            yield stats
+        finally:
+            self.end(token, endpoint, method)
+
+# Create global query profiler instance
+query_profiler = QueryProfiler(
+    slow_query_ms=settings.DB_SLOW_QUERY_MS,
+    n_plus_one_threshold=settings.DB_N_PLUS_ONE_THRESHOLD
+)
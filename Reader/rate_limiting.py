@@ -0,0 +1,271 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from .api_keys import key_prefix as api_key_prefix
+from .config import settings
+from .path_prefixes import PathPrefixes
+
+SLIDING_WINDOW = "sliding_window"
+TOKEN_BUCKET = "token_bucket"
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """``limit`` requests per ``window`` seconds for one client.
+
+    ``sliding_window`` weights the previous fixed window's count by how much
+    of it still overlaps the sliding window; ``token_bucket`` refills
+    ``limit`` tokens per ``window`` and allows bursts up to ``limit``. Both
+    keep O(1) state per client and cost O(1) per request.
+    """
+    name: str
+    limit: int
+    window: float
+    algorithm: str = SLIDING_WINDOW
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: int  # seconds, 0 when allowed
+
+
+def sliding_window_hit(
+    state: Optional[Tuple[int, int, int]],
+    policy: RateLimitPolicy,
+    now: float
+) -> Tuple[Tuple[int, int, int], RateLimitResult]:
+    """Apply one request to ``(window_index, current, previous)`` counts."""
+    index = int(now // policy.window)
+    if state is None or state[0] < index - 1:
+        current, previous = 0, 0
+    elif state[0] == index - 1:
+        current, previous = 0, state[1]
+    else:
+        current, previous = state[1], state[2]
+
+    elapsed = now - index * policy.window
+    weight = (policy.window - elapsed) / policy.window
+    estimate = previous * weight + current
+    if estimate + 1 > policy.limit:
+        if current + 1 > policy.limit or not previous:
+            retry_after = policy.window - elapsed
+        else:
+            # Wait until enough of the previous window has slid out
+            target_weight = (policy.limit - current - 1) / previous
+            retry_after = (weight - target_weight) * policy.window
+        return (index, current, previous), RateLimitResult(False, 0, max(1, math.ceil(retry_after)))
+
+    current += 1
+    remaining = int(policy.limit - (previous * weight + current))
+    return (index, current, previous), RateLimitResult(True, max(remaining, 0), 0)
+
+
+def token_bucket_hit(
+    state: Optional[Tuple[float, float]],
+    policy: RateLimitPolicy,
+    now: float
+) -> Tuple[Tuple[float, float], RateLimitResult]:
+    """Apply one request to ``(tokens, updated_at)``."""
+    rate = policy.limit / policy.window
+    if state is None:
+        tokens = float(policy.limit)
+    else:
+        tokens = min(float(policy.limit), state[0] + (now - state[1]) * rate)
+
+    if tokens < 1:
+        return (tokens, now), RateLimitResult(False, 0, max(1, math.ceil((1 - tokens) / rate)))
+    tokens -= 1
+    return (tokens, now), RateLimitResult(True, int(tokens), 0)
+
+
+_ALGORITHMS = {
+    SLIDING_WINDOW: sliding_window_hit,
+    TOKEN_BUCKET: token_bucket_hit,
+}
+
+
+class RateLimitBackend(ABC):
+    """Where per-client counters live."""
+
+    @abstractmethod
+    async def hit(self, key: str, policy: RateLimitPolicy, now: float) -> RateLimitResult:
+        """Count one request for ``key`` and decide whether it is allowed."""
+        pass
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process counters in an LRU bounded to ``max_keys`` clients.
+
+    Evicting the least recently seen client only forgets its counts, which
+    at worst lets it start a fresh window.
+    """
+
+    def __init__(self, max_keys: int = 1_000_000):
+        self.max_keys = max_keys
+        self._state: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def hit(self, key: str, policy: RateLimitPolicy, now: float) -> RateLimitResult:
+        state, result = _ALGORITHMS[policy.algorithm](self._state.get(key), policy, now)
+        self._state[key] = state
+        self._state.move_to_end(key)
+        if len(self._state) > self.max_keys:
+            self._state.popitem(last=False)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+
+# KEYS: current window counter, previous window counter
+# ARGV: limit, window, seconds elapsed in the current window
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local weight = (window - tonumber(ARGV[3])) / window
+if previous * weight + current + 1 > limit then
+  return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+  redis.call('EXPIRE', KEYS[1], math.ceil(window * 2))
+end
+return {1, current, previous}
+"""
+
+# KEYS: bucket hash; ARGV: limit, window, now
+TOKEN_BUCKET_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local rate = limit / tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or limit
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(limit, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(limit / rate * 2))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Counters shared by every worker, updated atomically by Lua scripts.
+
+    Each request is one EVALSHA round trip. Keys expire on their own, so
+    idle clients cost nothing.
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._sliding_window = client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._token_bucket = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def hit(self, key: str, policy: RateLimitPolicy, now: float) -> RateLimitResult:
+        base = f"{self.prefix}{policy.name}:{key}"
+        if policy.algorithm == TOKEN_BUCKET:
+            allowed, tokens = await self._token_bucket(
+                keys=[base], args=[policy.limit, policy.window, now]
+            )
+            state = (float(tokens), now)
+            if allowed:
+                return RateLimitResult(True, int(float(tokens)), 0)
+            # Recompute retry_after locally from the returned state
+            return token_bucket_hit(state, policy, now)[1]
+
+        index = int(now // policy.window)
+        elapsed = now - index * policy.window
+        allowed, current, previous = await self._sliding_window(
+            keys=[f"{base}:{index}", f"{base}:{index - 1}"],
+            args=[policy.limit, policy.window, elapsed]
+        )
+        if allowed:
+            weight = (policy.window - elapsed) / policy.window
+            return RateLimitResult(True, max(int(policy.limit - (int(previous) * weight + int(current))), 0), 0)
+        return sliding_window_hit((index, int(current), int(previous)), policy, now)[1]
+
+
+def create_rate_limit_backend(backend: str, redis_url: Optional[str] = None) -> RateLimitBackend:
+    """Build the backend named by ``RATE_LIMIT_BACKEND``."""
+    if backend == "redis":
+        from redis import asyncio as redis_asyncio
+        return RedisRateLimitBackend(redis_asyncio.from_url(redis_url))
+    if backend == "memory":
+        return InMemoryRateLimitBackend()
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+class RateLimiter:
+    """Pick a policy for each request and apply it through the backend.
+
+    Clients are limited per IP. Only keys whose public prefix appears in
+    ``key_policies`` get a bucket of their own, under that policy: every
+    client may send the shared ``API_KEY``, so keying on it by default
+    would throttle the whole deployment as one client. Otherwise the
+    longest matching ``route_policies`` path prefix wins, falling back to
+    ``default_policy``.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        default_policy: RateLimitPolicy,
+        route_policies: Optional[Dict[str, RateLimitPolicy]] = None,
+        key_policies: Optional[Dict[str, RateLimitPolicy]] = None
+    ):
+        self.backend = backend
+        self.default_policy = default_policy
+        self.key_policies = key_policies or {}
+        self._routes: PathPrefixes[RateLimitPolicy] = PathPrefixes(route_policies)
+
+    def policy_for(self, path: str, key_prefix: Optional[str] = None) -> RateLimitPolicy:
+        if key_prefix is not None and key_prefix in self.key_policies:
+            return self.key_policies[key_prefix]
+        return self._routes.match(path, self.default_policy)
+
+    async def hit(
+        self,
+        path: str,
+        client_ip: str,
+        api_key: Optional[str] = None,
+        now: Optional[float] = None
+    ) -> RateLimitResult:
+        key_prefix = api_key_prefix(api_key) if api_key else None
+        if key_prefix not in self.key_policies:
+            key_prefix = None
+        policy = self.policy_for(path, key_prefix)
+        client = f"key:{key_prefix}" if key_prefix else f"ip:{client_ip}"
+        return await self.backend.hit(client, policy, time.time() if now is None else now)
+
+
+def _policies(configured: Dict[str, dict], kind: str) -> Dict[str, RateLimitPolicy]:
+    return {
+        name: RateLimitPolicy(
+            name=f"{kind}{name}",
+            limit=int(options["limit"]),
+            window=float(options["window"]),
+            algorithm=options.get("algorithm", settings.RATE_LIMIT_ALGORITHM)
+        )
+        for name, options in configured.items()
+    }
+
+
+def policies_from_settings() -> Dict[str, RateLimitPolicy]:
+    """Route policies from ``RATE_LIMIT_ROUTE_POLICIES``."""
+    return _policies(settings.RATE_LIMIT_ROUTE_POLICIES, "route")
+
+
+def key_policies_from_settings() -> Dict[str, RateLimitPolicy]:
+    """Per-key policies from ``RATE_LIMIT_KEY_POLICIES``, keyed by public key prefix."""
+    return _policies(settings.RATE_LIMIT_KEY_POLICIES, "key:")
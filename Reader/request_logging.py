@@ -0,0 +1,110 @@
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+from .config import settings
+from .logger import api_logger
+from .path_prefixes import PathPrefixes
+
+class RequestLogPolicy:
+    """Decide which requests get a log line.
+
+    Server errors and requests slower than ``slow_ms`` are always logged;
+    the rest are sampled at ``sample_rate``, or at the rate of the longest
+    matching ``route_rates`` path prefix.
+    """
+
+    def __init__(self, sample_rate: float = 0.01, slow_ms: float = 1000.0,
+                 route_rates: Optional[Dict[str, float]] = None):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self._routes: PathPrefixes[float] = PathPrefixes(route_rates)
+
+    def rate_for(self, path: str) -> float:
+        return self._routes.match(path, self.sample_rate)
+
+    def should_log(self, path: str, status_code: int, duration_ms: float) -> bool:
+        if status_code >= 500 or duration_ms >= self.slow_ms:
+            return True
+        rate = self.rate_for(path)
+        return rate >= 1 or random.random() < rate
+
+class RouteSummary:
+    """Per-route request counts, emitted as one "top routes" line per interval.
+
+    Stands in for the per-request lines that sampling leaves out. The line is
+    logged by a background task, so it goes out on time even when traffic
+    stops, and once more at shutdown.
+    """
+
+    def __init__(self, interval: float = 60.0, top: int = 10):
+        self.interval = interval
+        self.top = top
+        self._routes: Dict[str, List[float]] = {}
+        self._started = time.monotonic()
+        self._reporter: Optional[asyncio.Task] = None
+
+    def add(self, route: str, status_code: int, duration_ms: float) -> None:
+        # count, errors, total ms, max ms
+        entry = self._routes.get(route)
+        if entry is None:
+            entry = self._routes[route] = [0, 0, 0.0, 0.0]
+        entry[0] += 1
+        if status_code >= 500:
+            entry[1] += 1
+        entry[2] += duration_ms
+        if duration_ms > entry[3]:
+            entry[3] = duration_ms
+
+    def flush(self, now: Optional[float] = None) -> Optional[str]:
+        """Summary of the routes seen since the last flush, busiest first."""
+        routes, self._routes = self._routes, {}
+        started, self._started = self._started, time.monotonic() if now is None else now
+        if not routes:
+            return None
+        total = sum(entry[0] for entry in routes.values())
+        busiest = sorted(routes.items(), key=lambda item: item[1][0], reverse=True)[:self.top]
+        lines = ", ".join(
+            f"{route} {int(count)} req {int(errors)} err "
+            f"avg {total_ms / count:.1f}ms max {max_ms:.1f}ms"
+            for route, (count, errors, total_ms, max_ms) in busiest
+        )
+        return f"Top routes over {self._started - started:.0f}s ({int(total)} requests): {lines}"
+
+    def report(self) -> None:
+        """Log the summary, if any requests arrived since the last one."""
+        summary = self.flush()
+        if summary:
+            api_logger.info(summary)
+
+    def start_reporter(self):
+        """Log the summary every ``interval`` seconds on the running loop."""
+        if self._reporter is None:
+            self._reporter = asyncio.get_event_loop().create_task(self._report_periodically())
+
+    async def stop_reporter(self):
+        """Stop the periodic summary and log whatever is left."""
+        if self._reporter is not None:
+            self._reporter.cancel()
+            try:
+                await self._reporter
+            except asyncio.CancelledError:
+                pass
+            self._reporter = None
+        self.report()
+
+    async def _report_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.report()
+
+# Create global request log policy and summary instances
+request_log_policy = RequestLogPolicy(
+    sample_rate=settings.REQUEST_LOG_SAMPLE_RATE,
+    slow_ms=settings.REQUEST_LOG_SLOW_MS,
+    route_rates=settings.REQUEST_LOG_ROUTE_RATES
+)
+route_summary = RouteSummary(
+    interval=settings.REQUEST_LOG_SUMMARY_INTERVAL_SECONDS,
+    top=settings.REQUEST_LOG_SUMMARY_TOP
+)
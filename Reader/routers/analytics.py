@@ -1,10 +1,11 @@
 from datetime import datetime, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, select
+from starlette.concurrency import run_in_threadpool
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models import User, Document, ReadingSession, ReadingGoal
 from ..schemas.analytics import (
     AnalyticsResponse,
@@ -14,6 +15,8 @@ from ..schemas.analytics import (
     ReadingGoalsUpdate
 )
 from ..auth import get_current_user
+from .. import session_store as store
+from ..session_store import session_store
 
 router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
 
@@ -21,7 +24,7 @@ router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
 async def get_analytics(
     time_range: str = Query("30", description="Time range in days (7, 30, 90, 365, all)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get comprehensive reading analytics for the current user."""
     try:
@@ -32,55 +35,43 @@ async def get_analytics(
         else:
             start_date = end_date - timedelta(days=int(time_range))
 
-        # Base query for reading sessions
-        base_query = db.query(ReadingSession).filter(
-            ReadingSession.user_id == current_user.id
-        )
-        if start_date:
-            base_query = base_query.filter(ReadingSession.start_time >= start_date)
+        # Session telemetry for the range, as columns
+        columns = await run_in_threadpool(session_store.scan, user_id=current_user.id, start=start_date)
 
         # Total reading time
-        total_reading_time = base_query.with_entities(
-            func.sum(ReadingSession.duration_minutes)
-        ).scalar() or 0
+        total_reading_time = store.total_duration(columns)
 
         # Documents read
-        documents_read = base_query.with_entities(
-            func.count(func.distinct(ReadingSession.document_id))
-        ).scalar() or 0
+        documents_read = store.distinct_documents(columns)
 
         # Average reading speed
-        avg_speed = base_query.with_entities(
-            func.avg(ReadingSession.reading_speed_pages_per_hour)
-        ).scalar() or 0
+        avg_speed = store.average(columns, "speed")
 
         # Reading streak
-        streak = calculate_reading_streak(db, current_user.id)
+        streak = await calculate_reading_streak(current_user.id)
 
         # Top documents
-        top_documents = get_top_documents(db, current_user.id, start_date)
+        top_documents = await get_top_documents(db, current_user.id, start_date)
 
         # Favorite reading time
-        favorite_time = get_favorite_reading_time(db, current_user.id, start_date)
+        favorite_time = get_favorite_reading_time(columns)
 
         # Average session length
-        avg_session_length = base_query.with_entities(
-            func.avg(ReadingSession.duration_minutes)
-        ).scalar() or 0
+        avg_session_length = store.average(columns, "duration")
 
         # Completion rate
-        completion_rate = calculate_completion_rate(db, current_user.id, start_date)
+        completion_rate = await calculate_completion_rate(db, current_user.id, start_date)
 
         # Reading goals
-        goals = db.query(ReadingGoal).filter(
-            ReadingGoal.user_id == current_user.id
-        ).first()
+        goals = (await db.execute(
+            select(ReadingGoal).where(ReadingGoal.user_id == current_user.id)
+        )).scalars().first()
 
         # Activity data
-        activity_data = get_activity_data(db, current_user.id, start_date, end_date)
+        activity_data = get_activity_data(columns, start_date, end_date)
 
         # Speed data
-        speed_data = get_speed_data(db, current_user.id, start_date, end_date)
+        speed_data = get_speed_data(columns, start_date, end_date)
 
         return AnalyticsResponse(
             total_reading_time_minutes=total_reading_time,
@@ -107,13 +98,13 @@ async def get_analytics(
 async def update_reading_goals(
     goals: ReadingGoalsUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update reading goals for the current user."""
     try:
-        reading_goal = db.query(ReadingGoal).filter(
-            ReadingGoal.user_id == current_user.id
-        ).first()
+        reading_goal = (await db.execute(
+            select(ReadingGoal).where(ReadingGoal.user_id == current_user.id)
+        )).scalars().first()
 
         if not reading_goal:
             reading_goal = ReadingGoal(user_id=current_user.id)
@@ -121,25 +112,27 @@ async def update_reading_goals(
 
         reading_goal.daily_target = goals.daily_target_minutes
         reading_goal.weekly_target = goals.weekly_target_minutes
-        db.commit()
+        await db.commit()
 
         return goals
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/documents/{document_id}/history", response_model=ReadingHistoryResponse)
 async def get_reading_history(
     document_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get reading history for a specific document."""
     try:
-        sessions = db.query(ReadingSession).filter(
-            ReadingSession.user_id == current_user.id,
-            ReadingSession.document_id == document_id
-        ).order_by(ReadingSession.start_time).all()
+        sessions = (await db.execute(
+            select(ReadingSession).where(
+                ReadingSession.user_id == current_user.id,
+                ReadingSession.document_id == document_id
+            ).order_by(ReadingSession.start_time)
+        )).scalars().all()
 
         return ReadingHistoryResponse(
             document_id=document_id,
@@ -159,16 +152,18 @@ async def get_reading_history(
 @router.get("/habits", response_model=ReadingHabitsResponse)
 async def get_reading_habits(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get reading habits for the current user."""
     try:
         # Get reading sessions for the last 30 days
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        sessions = db.query(ReadingSession).filter(
-            ReadingSession.user_id == current_user.id,
-            ReadingSession.start_time >= thirty_days_ago
-        ).all()
+        sessions = (await db.execute(
+            select(ReadingSession).where(
+                ReadingSession.user_id == current_user.id,
+                ReadingSession.start_time >= thirty_days_ago
+            )
+        )).scalars().all()
 
         # Calculate reading habits
         habits = {
@@ -185,49 +180,47 @@ async def get_reading_habits(
 @router.get("/streak", response_model=ReadingStreakResponse)
 async def get_reading_streak(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current reading streak for the user."""
     try:
-        streak = calculate_reading_streak(db, current_user.id)
+        streak = await calculate_reading_streak(current_user.id)
         return ReadingStreakResponse(streak_days=streak)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Helper functions
-def calculate_reading_streak(db: Session, user_id: int) -> int:
+async def calculate_reading_streak(user_id: int) -> int:
     """Calculate the current reading streak in days."""
     today = datetime.utcnow().date()
-    streak = 0
-    
-    while True:
-        date_to_check = today - timedelta(days=streak)
-        has_read = db.query(ReadingSession).filter(
-            ReadingSession.user_id == user_id,
-            func.date(ReadingSession.start_time) == date_to_check
-        ).first()
-        
-        if not has_read:
-            break
-        streak += 1
-    
-    return streak
+    # Only sessions that could belong to a streak ending today; a year of segments is read off the loop
+    columns = await run_in_threadpool(
+        session_store.scan,
+        user_id=user_id,
+        start=datetime.combine(today - timedelta(days=365), datetime.min.time())
+    )
+    return store.streak_days(columns, today)
 
-def get_top_documents(db: Session, user_id: int, start_date: Optional[datetime]) -> List[dict]:
+async def get_top_documents(db: AsyncSession, user_id: int, start_date: Optional[datetime]) -> List[dict]:
     """Get top documents by reading time."""
-    query = db.query(
+    query = select(
         Document,
         func.sum(ReadingSession.duration_minutes).label('total_time')
     ).join(
         ReadingSession,
         Document.id == ReadingSession.document_id
-    ).filter(
+    ).where(
         ReadingSession.user_id == user_id
     )
     
     if start_date:
-        query = query.filter(ReadingSession.start_time >= start_date)
+        query = query.where(ReadingSession.start_time >= start_date)
     
+    result = await db.execute(
+        query.group_by(Document.id)
+        .order_by(func.sum(ReadingSession.duration_minutes).desc())
+        .limit(5)
+    )
     return [
         {
             "id": doc.id,
@@ -237,32 +230,19 @@ def get_top_documents(db: Session, user_id: int, start_date: Optional[datetime])
             "completion_percentage": doc.completion_percentage,
             "last_read": doc.last_read
         }
-        for doc, total_time in query.group_by(Document.id)
-        .order_by(func.sum(ReadingSession.duration_minutes).desc())
-        .limit(5)
+        for doc, total_time in result.all()
     ]
 
-def get_favorite_reading_time(db: Session, user_id: int, start_date: Optional[datetime]) -> str:
+def get_favorite_reading_time(columns: dict) -> str:
     """Get the user's favorite time of day for reading."""
-    query = db.query(
-        func.hour(ReadingSession.start_time).label('hour'),
-        func.count().label('count')
-    ).filter(
-        ReadingSession.user_id == user_id
-    )
-    
-    if start_date:
-        query = query.filter(ReadingSession.start_time >= start_date)
-    
-    result = query.group_by('hour').order_by(func.count().desc()).first()
-    if result:
-        hour = result[0]
-        return f"{hour:02d}:00"
+    hours = store.hour_histogram(columns)
+    if hours.any():
+        return f"{int(hours.argmax()):02d}:00"
     return "Unknown"
 
-def calculate_completion_rate(db: Session, user_id: int, start_date: Optional[datetime]) -> float:
+async def calculate_completion_rate(db: AsyncSession, user_id: int, start_date: Optional[datetime]) -> float:
     """Calculate the completion rate of started documents."""
-    query = db.query(
+    query = select(
         func.count(func.distinct(ReadingSession.document_id)).label('total'),
         func.count(func.distinct(
             ReadingSession.document_id
@@ -272,77 +252,31 @@ def calculate_completion_rate(db: Session, user_id: int, start_date: Optional[da
     ).join(
         Document,
         ReadingSession.document_id == Document.id
-    ).filter(
+    ).where(
         ReadingSession.user_id == user_id
     )
     
     if start_date:
-        query = query.filter(ReadingSession.start_time >= start_date)
+        query = query.where(ReadingSession.start_time >= start_date)
     
-    result = query.first()
+    result = (await db.execute(query)).first()
     if result and result[0] > 0:
         return (result[1] / result[0]) * 100
     return 0.0
 
-def get_activity_data(db: Session, user_id: int, start_date: Optional[datetime], end_date: datetime) -> dict:
+def _chart_range(start_date: Optional[datetime], end_date: datetime):
+    first = start_date.date() if start_date else (end_date - timedelta(days=30)).date()
+    return first, end_date.date()
+
+def get_activity_data(columns: dict, start_date: Optional[datetime], end_date: datetime) -> dict:
     """Get reading activity data for charts."""
-    query = db.query(
-        func.date(ReadingSession.start_time).label('date'),
-        func.sum(ReadingSession.duration_minutes).label('total_time')
-    ).filter(
-        ReadingSession.user_id == user_id
-    )
-    
-    if start_date:
-        query = query.filter(ReadingSession.start_time >= start_date)
-    
-    results = query.group_by('date').order_by('date').all()
-    
-    labels = []
-    values = []
-    current_date = start_date.date() if start_date else (end_date - timedelta(days=30)).date()
-    
-    while current_date <= end_date.date():
-        labels.append(current_date)
-        values.append(0)
-        current_date += timedelta(days=1)
-    
-    for date, total_time in results:
-        if date in labels:
-            index = labels.index(date)
-            values[index] = total_time
-    
-    return {"labels": labels, "values": values}
+    first, last = _chart_range(start_date, end_date)
+    return store.daily_series(columns, "duration", first, last)
 
-def get_speed_data(db: Session, user_id: int, start_date: Optional[datetime], end_date: datetime) -> dict:
+def get_speed_data(columns: dict, start_date: Optional[datetime], end_date: datetime) -> dict:
     """Get reading speed data for charts."""
-    query = db.query(
-        func.date(ReadingSession.start_time).label('date'),
-        func.avg(ReadingSession.reading_speed_pages_per_hour).label('avg_speed')
-    ).filter(
-        ReadingSession.user_id == user_id
-    )
-    
-    if start_date:
-        query = query.filter(ReadingSession.start_time >= start_date)
-    
-    results = query.group_by('date').order_by('date').all()
-    
-    labels = []
-    values = []
-    current_date = start_date.date() if start_date else (end_date - timedelta(days=30)).date()
-    
-    while current_date <= end_date.date():
-        labels.append(current_date)
-        values.append(0)
-        current_date += timedelta(days=1)
-    
-    for date, avg_speed in results:
-        if date in labels:
-            index = labels.index(date)
-            values[index] = avg_speed
-    
-    return {"labels": labels, "values": values}
+    first, last = _chart_range(start_date, end_date)
+    return store.daily_series(columns, "speed", first, last, how="mean")
 
 def get_favorite_time_of_day(sessions: List[ReadingSession]) -> str:
     """Get the most common time of day for reading."""
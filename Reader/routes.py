@@ -1,21 +1,44 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List
-import magic
-import os
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from . import crud, models, schemas
-from .database import get_db
+from . import async_crud, crud, models, schemas
+from .database import get_async_db, get_db
 from .auth import get_current_active_user, create_access_token
+from .auth.access import access_control
+from .passwords import password_service
 from datetime import timedelta
 from .config import settings
+from .uploads import upload_path, upload_store
 
 router = APIRouter()
 
+def get_owned_document(db: Session, document_id: int, user: models.User, detail: str) -> models.Document:
+    """Load a document and authorize it against its project's owner in one query."""
+    row = crud.get_document_with_owner(db, document_id=document_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    document, owner_id = row
+    if owner_id != user.id:
+        raise HTTPException(status_code=403, detail=detail)
+    return document
+
 @router.post("/token", response_model=schemas.Token)
-async def login_for_access_token(form_data: schemas.UserCreate, db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email=form_data.email)
-    if not user or not crud.verify_password(form_data.password, user.hashed_password):
+async def login_for_access_token(form_data: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    user = await async_crud.get_user_by_email(db, email=form_data.email)
+    if user is None:
+        await password_service.dummy_verify_async()
+        verified = False
+    else:
+        verified, new_hash = await password_service.verify_and_update_async(
+            form_data.password, user.hashed_password
+        )
+        if verified and new_hash:
+            # Stored hash uses an old scheme or parameters; upgrade it now
+            user.hashed_password = new_hash
+            await db.commit()
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -46,15 +69,15 @@ def create_project(
 ):
     return crud.create_project(db=db, project=project, user_id=current_user.id)
 
-@router.get("/projects/", response_model=List[schemas.Project])
+@router.get("/projects/", response_model=schemas.Page[schemas.Project])
 def read_projects(
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    projects = crud.get_user_projects(db, user_id=current_user.id, skip=skip, limit=limit)
-    return projects
+    items, next_cursor = crud.get_user_projects(db, user_id=current_user.id, cursor=cursor, limit=limit)
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/projects/{project_id}", response_model=schemas.Project)
 def read_project(
@@ -91,20 +114,9 @@ def create_document(
 
     # Handle file upload if present
     if file:
-        # Validate file type
-        file_type = magic.from_buffer(file.file.read(2048), mime=True)
-        if file_type not in settings.ALLOWED_DOCUMENT_TYPES:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File type {file_type} not allowed"
-            )
-        file.file.seek(0)
-
-        # Save file
-        file_path = os.path.join(settings.UPLOAD_DIR, f"{document.title}_{file.filename}")
-        with open(file_path, "wb") as f:
-            f.write(file.file.read())
-        document.file_path = file_path
+        # Stream to disk under a generated name, checking type and size as it goes
+        file_path = upload_path(settings.UPLOAD_DIR, file.filename)
+        document.file_path = upload_store.save(file.file, str(file_path)).path
 
     return crud.create_document(db=db, document=document)
 
@@ -115,28 +127,25 @@ def update_document(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    db_document = crud.get_document(db, document_id=document_id)
-    if not db_document:
-        raise HTTPException(status_code=404, detail="Document not found")
-    project = crud.get_project(db, project_id=db_document.project_id)
-    if project.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this document")
-    return crud.update_document(db=db, document_id=document_id, document=document)
+    db_document = get_owned_document(db, document_id, current_user, "Not authorized to update this document")
+    return crud.update_document(db=db, document_id=document_id, document=document, db_document=db_document)
 
-@router.get("/documents/", response_model=List[schemas.Document])
+@router.get("/documents/", response_model=schemas.Page[schemas.Document])
 def read_documents(
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    documents = crud.get_documents(db, skip=skip, limit=limit)
-    return documents
+    # Own documents plus anything granted, filtered in SQL so every page is full
+    condition = access_control.document_filter(db, current_user.id, "manage_documents")
+    items, next_cursor = crud.get_documents(db, cursor=cursor, limit=limit, condition=condition)
+    return {"items": items, "next_cursor": next_cursor}
 
-@router.get("/projects/{project_id}/documents/", response_model=List[schemas.Document])
+@router.get("/projects/{project_id}/documents/", response_model=schemas.Page[schemas.Document])
 def read_project_documents(
     project_id: int,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
@@ -146,8 +155,8 @@ def read_project_documents(
         raise HTTPException(status_code=404, detail="Project not found")
     if project.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to access this project's documents")
-    documents = crud.get_project_documents(db, project_id=project_id, skip=skip, limit=limit)
-    return documents
+    items, next_cursor = crud.get_project_documents(db, project_id=project_id, cursor=cursor, limit=limit)
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.post("/reading-sessions/", response_model=schemas.ReadingSession)
 def create_reading_session(
@@ -155,12 +164,7 @@ def create_reading_session(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    document = crud.get_document(db, document_id=session.document_id)
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
-    project = crud.get_project(db, project_id=document.project_id)
-    if project.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to read this document")
+    get_owned_document(db, session.document_id, current_user, "Not authorized to read this document")
     return crud.create_reading_session(db=db, session=session, user_id=current_user.id)
 
 @router.put("/reading-sessions/{session_id}", response_model=schemas.ReadingSession)
@@ -170,39 +174,34 @@ def update_reading_session(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    db_session = crud.update_reading_session(db, session_id=session_id, session=session)
+    db_session = crud.get_reading_session(db, session_id=session_id)
     if not db_session:
         raise HTTPException(status_code=404, detail="Reading session not found")
     if db_session.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this session")
-    return db_session
+    return crud.update_reading_session(db, session_id=session_id, session=session, db_session=db_session)
 
-@router.get("/reading-sessions/", response_model=List[schemas.ReadingSession])
+@router.get("/reading-sessions/", response_model=schemas.Page[schemas.ReadingSession])
 def read_user_sessions(
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    sessions = crud.get_user_reading_sessions(db, user_id=current_user.id, skip=skip, limit=limit)
-    return sessions
+    items, next_cursor = crud.get_user_reading_sessions(db, user_id=current_user.id, cursor=cursor, limit=limit)
+    return {"items": items, "next_cursor": next_cursor}
 
-@router.get("/documents/{document_id}/reading-sessions/", response_model=List[schemas.ReadingSession])
+@router.get("/documents/{document_id}/reading-sessions/", response_model=schemas.Page[schemas.ReadingSession])
 def read_document_sessions(
     document_id: int,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    document = crud.get_document(db, document_id=document_id)
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
-    project = crud.get_project(db, project_id=document.project_id)
-    if project.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this document's sessions")
-    sessions = crud.get_document_reading_sessions(db, document_id=document_id, skip=skip, limit=limit)
-    return sessions
+    get_owned_document(db, document_id, current_user, "Not authorized to access this document's sessions")
+    items, next_cursor = crud.get_document_reading_sessions(db, document_id=document_id, cursor=cursor, limit=limit)
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/documents/{document_id}/progress", response_model=schemas.ReadingProgress)
 def get_document_progress(
@@ -210,26 +209,22 @@ def get_document_progress(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    document = crud.get_document(db, document_id=document_id)
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
-    project = crud.get_project(db, project_id=document.project_id)
-    if project.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this document's progress")
-    progress = crud.get_reading_progress(db, document_id=document_id)
+    document = get_owned_document(db, document_id, current_user, "Not authorized to access this document's progress")
+    progress = crud.get_reading_progress(db, document_id=document_id, document=document)
     if not progress:
         raise HTTPException(status_code=404, detail="Progress not found")
     return progress
 
-@router.get("/documents/analytics/", response_model=List[schemas.DocumentAnalytics])
+@router.get("/documents/analytics/", response_model=schemas.Page[schemas.DocumentAnalytics])
 def get_document_analytics(
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Get analytics for all documents"""
-    return crud.get_document_analytics(db, user_id=current_user.id, skip=skip, limit=limit)
+    items, next_cursor = crud.get_all_document_analytics(db, user_id=current_user.id, cursor=cursor, limit=limit)
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/documents/{document_id}/analytics/", response_model=schemas.DocumentAnalytics)
 def get_document_analytics(
@@ -238,18 +233,5 @@ def get_document_analytics(
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Get analytics for a specific document"""
-    document = crud.get_document(db, document_id=document_id)
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
-        )
-    
-    project = crud.get_project(db, project_id=document.project_id)
-    if project.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this document's analytics"
-        )
-    
-    return crud.get_document_analytics(db, document_id=document_id) 
\ No newline at end of file
+    document = get_owned_document(db, document_id, current_user, "Not authorized to view this document's analytics")
+    return crud.get_document_analytics(db, document_id=document_id, document=document) 
\ No newline at end of file
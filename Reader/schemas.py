@@ -1,7 +1,15 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic.generics import GenericModel
+from typing import Generic, Optional, List, TypeVar
 from datetime import datetime
 
+T = TypeVar("T")
+
+class Page(GenericModel, Generic[T]):
+    """One page of a keyset-paginated listing."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
 class UserBase(BaseModel):
     email: EmailStr
 
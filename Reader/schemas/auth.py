@@ -43,9 +43,12 @@ class APIKeyUpdate(APIKeyBase):
 class APIKeyInDB(APIKeyBase):
     id: int
     user_id: int
-    key: str
+    prefix: str
     created_at: datetime
     updated_at: datetime
 
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        orm_mode = True
+
+class APIKeyCreated(APIKeyInDB):
+    key: str  # Only returned by the creation response
@@ -5,7 +5,8 @@ from fastapi import HTTPException, status
 from ..models.auth import User, APIKey
 from ..schemas.auth import UserCreate, UserUpdate, APIKeyCreate, APIKeyUpdate
 from ..utils.auth import get_password_hash, verify_password, create_access_token
-from ..utils.security import generate_api_key
+from ..api_keys import api_key_cache, generate_api_key, hash_api_key, key_prefix, verify_api_key
+from ..user_cache import token_cache
 
 class AuthService:
     def __init__(self, db: Session):
@@ -43,6 +44,7 @@ class AuthService:
         
         self.db.commit()
         self.db.refresh(db_user)
+        token_cache.invalidate_user(user_id)
         return db_user
 
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
@@ -58,13 +60,23 @@ class AuthService:
         return self.db.query(APIKey).filter(APIKey.id == api_key_id).first()
 
     def get_api_key_by_key(self, key: str) -> Optional[APIKey]:
-        return self.db.query(APIKey).filter(APIKey.key == key).first()
+        """Find an active key by its indexed prefix, then check the salted hash."""
+        candidates = self.db.query(APIKey).filter(
+            APIKey.prefix == key_prefix(key),
+            APIKey.is_active == True
+        ).all()
+        for candidate in candidates:
+            if verify_api_key(key, candidate.key_hash):
+                return candidate
+        return None
 
     def create_api_key(self, user_id: int, api_key: APIKeyCreate) -> APIKey:
+        key = generate_api_key()
         db_api_key = APIKey(
             user_id=user_id,
             name=api_key.name,
-            key=generate_api_key(),
+            prefix=key_prefix(key),
+            key_hash=hash_api_key(key),
             description=api_key.description,
             is_active=api_key.is_active,
             expires_at=api_key.expires_at
@@ -72,6 +84,8 @@ class AuthService:
         self.db.add(db_api_key)
         self.db.commit()
         self.db.refresh(db_api_key)
+        # Plaintext is returned once, at creation, and never stored
+        db_api_key.key = key
         return db_api_key
 
     def update_api_key(self, api_key_id: int, api_key: APIKeyUpdate) -> APIKey:
@@ -85,6 +99,7 @@ class AuthService:
         
         self.db.commit()
         self.db.refresh(db_api_key)
+        api_key_cache.bump_version()
         return db_api_key
 
     def delete_api_key(self, api_key_id: int) -> None:
@@ -93,4 +108,5 @@ class AuthService:
             raise HTTPException(status_code=404, detail="API key not found")
         
         self.db.delete(db_api_key)
-        self.db.commit() 
\ No newline at end of file
+        self.db.commit()
+        api_key_cache.bump_version() 
\ No newline at end of file
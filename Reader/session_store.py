@@ -0,0 +1,531 @@
+import asyncio
+import calendar
+import fcntl
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .config import settings
+from .logger import logger
+
+SECONDS_PER_DAY = 86400
+
+# Column name -> dtype for every segment written by the store
+COLUMNS: Dict[str, np.dtype] = {
+    "session_id": np.dtype(np.int64),
+    "user_id": np.dtype(np.int64),
+    "document_id": np.dtype(np.int64),
+    "start": np.dtype(np.int64),  # epoch seconds, UTC
+    "duration": np.dtype(np.float64),  # minutes
+    "pages": np.dtype(np.int64),
+    "speed": np.dtype(np.float64),  # pages per hour
+    "version": np.dtype(np.int64),  # epoch nanoseconds of the write
+}
+
+# One fixed-size record per appended row in a worker's journal
+JOURNAL_DTYPE = np.dtype([(name, dtype.newbyteorder("<")) for name, dtype in COLUMNS.items()])
+
+
+def _to_epoch(value: Optional[datetime]) -> int:
+    """Convert a naive (UTC) or aware datetime to epoch seconds."""
+    if value is None:
+        value = datetime.utcnow()
+    if value.tzinfo is not None:
+        return int(value.timestamp())
+    return calendar.timegm(value.utctimetuple())
+
+
+def _empty_columns() -> Dict[str, np.ndarray]:
+    return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+
+class SessionEventStore:
+    """Append-only, day-partitioned columnar store for reading session telemetry.
+
+    Every write is an event row stamped with a ``version``; the row with the
+    highest version for a ``session_id`` wins when the store is scanned, so
+    updates to a session are plain appends and workers may flush in any
+    order. Rows are buffered in memory and flushed as NumPy ``.npz`` segments
+    under ``<base_path>/<YYYY-MM-DD>/u<bucket>/``, the bucket being the user
+    id modulo ``user_buckets``, once the buffer is full or every
+    ``flush_interval`` seconds; until then only this worker sees them. A scan
+    for one user opens only that user's bucket. Each buffered row is also
+    appended to a per-worker journal under ``<base_path>/journal/``, which
+    ``recover`` replays if the worker dies before flushing. ``compact`` folds
+    each bucket's segments into one, dropping superseded rows.
+    """
+
+    def __init__(
+        self,
+        base_path: str = "session_store",
+        flush_threshold: int = 1024,
+        flush_interval: float = 5.0,
+        compact_interval: float = 3600.0,
+        retention_days: int = 0,
+        user_buckets: int = 64
+    ):
+        # Directories are created on first write
+        self.base_path = Path(base_path)
+        self.user_buckets = user_buckets
+        self.flush_threshold = flush_threshold
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self.retention_days = retention_days
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._buffer: Dict[str, List] = {name: [] for name in COLUMNS}
+        self._journal_dir = self.base_path / "journal"
+        self._journal_fd: Optional[int] = None
+        self._journal_path: Optional[Path] = None
+        self._journal_pid: Optional[int] = None
+        self._maintainer: Optional[asyncio.Task] = None
+
+    # Writes
+
+    def append(
+        self,
+        session_id: int,
+        user_id: int,
+        document_id: int,
+        start: Optional[datetime],
+        duration: Optional[float] = None,
+        pages: Optional[int] = None,
+        speed: Optional[float] = None,
+        version: Optional[int] = None
+    ) -> None:
+        """Append one session event; flushes when the buffer is full.
+
+        ``version`` defaults to the current time, so the most recent write of
+        a session wins regardless of which worker flushes first.
+        """
+        duration = float(duration or 0)
+        pages = int(pages or 0)
+        if speed is None:
+            speed = (pages / duration) * 60 if duration > 0 else 0.0
+
+        with self._lock:
+            if version is None:
+                version = time.time_ns()
+            row = (session_id, user_id, document_id, _to_epoch(start), duration, pages, float(speed), version)
+            os.write(self._journal_locked(), np.array(row, dtype=JOURNAL_DTYPE).tobytes())
+            for name, value in zip(COLUMNS, row):
+                self._buffer[name].append(value)
+            if len(self._buffer["session_id"]) >= self.flush_threshold:
+                self._flush_locked()
+
+    def append_session(self, session) -> None:
+        """Append the current state of a ``ReadingSession`` ORM row."""
+        try:
+            self.append(
+                session_id=session.id,
+                user_id=session.user_id,
+                document_id=session.document_id,
+                start=session.start_time,
+                duration=session.duration_minutes,
+                pages=session.pages_read,
+                speed=getattr(session, "reading_speed_pages_per_hour", None)
+            )
+        except Exception as e:
+            # Telemetry must never fail the primary write
+            self.logger.error(f"Error appending session {getattr(session, 'id', None)} to store: {str(e)}")
+
+    def flush(self) -> None:
+        """Write any buffered rows to disk."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer["session_id"]:
+            return
+
+        self._write_columns(self._buffered_columns_locked())
+        self._buffer = {name: [] for name in COLUMNS}
+        # Everything journaled so far is now in a segment
+        os.ftruncate(self._journal_locked(), 0)
+
+    def _buffered_columns_locked(self) -> Dict[str, np.ndarray]:
+        return {
+            name: np.asarray(values, dtype=COLUMNS[name])
+            for name, values in self._buffer.items()
+        }
+
+    def _journal_locked(self) -> int:
+        """This worker's journal, opened on first use and again after a fork."""
+        if self._journal_pid != os.getpid():
+            self._journal_dir.mkdir(parents=True, exist_ok=True)
+            path = self._journal_dir / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.wal"
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            # Held until the worker exits; tells recover the journal is live
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self._journal_fd, self._journal_path, self._journal_pid = fd, path, os.getpid()
+        return self._journal_fd
+
+    def _write_columns(self, columns: Dict[str, np.ndarray]) -> None:
+        days = columns["start"] // SECONDS_PER_DAY
+        buckets = columns["user_id"] % self.user_buckets
+        for day in np.unique(days):
+            for bucket in np.unique(buckets[days == day]):
+                mask = (days == day) & (buckets == bucket)
+                self._write_segment(
+                    self._bucket_path(self._partition_path(int(day)), int(bucket)),
+                    {name: values[mask] for name, values in columns.items()}
+                )
+
+    def _partition_path(self, day: int) -> Path:
+        return self.base_path / (date(1970, 1, 1) + timedelta(days=day)).isoformat()
+
+    def _bucket_path(self, partition: Path, bucket: int) -> Path:
+        return partition / f"u{bucket:03d}"
+
+    def _write_segment(self, bucket_path: Path, columns: Dict[str, np.ndarray]) -> Path:
+        """Atomically write one segment into a user bucket of a day partition."""
+        bucket_path.mkdir(parents=True, exist_ok=True)
+        segment = bucket_path / f"segment-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.npz"
+        tmp_path = bucket_path / f".{segment.name}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp_path, segment)
+        return segment
+
+    # Reads
+
+    def _partitions(self, start_day: Optional[int], end_day: Optional[int]) -> List[Path]:
+        partitions = []
+        if not self.base_path.is_dir():
+            return partitions
+        for path in sorted(self.base_path.iterdir()):
+            if not path.is_dir():
+                continue
+            try:
+                day = (date.fromisoformat(path.name) - date(1970, 1, 1)).days
+            except ValueError:
+                continue
+            if start_day is not None and day < start_day:
+                continue
+            if end_day is not None and day > end_day:
+                continue
+            partitions.append(path)
+        return partitions
+
+    def _segments(self, partition: Path, user_id: Optional[int] = None) -> List[Path]:
+        """A partition's segments, only those of ``user_id``'s bucket when given."""
+        if user_id is not None:
+            return sorted(self._bucket_path(partition, user_id % self.user_buckets).glob("segment-*.npz"))
+        return sorted(partition.glob("u*/segment-*.npz"))
+
+    def _load_segments(self, segments: List[Path]) -> List[Dict[str, np.ndarray]]:
+        """Load segments, skipping any removed since they were listed."""
+        loaded = []
+        for segment in segments:
+            try:
+                with np.load(segment) as data:
+                    loaded.append({name: data[name] for name in COLUMNS})
+            except FileNotFoundError:
+                continue
+        return loaded
+
+    def _read_partition(self, partition: Path, user_id: Optional[int] = None) -> List[Dict[str, np.ndarray]]:
+        """Load a partition's segments, listing again when another worker compacts mid-read.
+
+        Compaction writes its merged segment before unlinking the inputs, so
+        the next listing holds every row that vanished; rows read twice
+        collapse to one in ``_latest_per_session``.
+        """
+        loaded = []
+        read = set()
+        while True:
+            segments = [segment for segment in self._segments(partition, user_id) if segment not in read]
+            if not segments:
+                return loaded
+            read.update(segments)
+            parts = self._load_segments(segments)
+            loaded.extend(parts)
+            if len(parts) == len(segments):
+                return loaded
+
+    def scan(
+        self,
+        user_id: Optional[int] = None,
+        document_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Dict[str, np.ndarray]:
+        """Return the latest row of each matching session as column arrays.
+
+        Rows still buffered by this worker are included without flushing them.
+        """
+        start_ts = _to_epoch(start) if start else None
+        end_ts = _to_epoch(end) if end else None
+        parts = []
+        for partition in self._partitions(
+            start_ts // SECONDS_PER_DAY if start_ts is not None else None,
+            end_ts // SECONDS_PER_DAY if end_ts is not None else None
+        ):
+            parts.extend(self._read_partition(partition, user_id))
+        with self._lock:
+            if self._buffer["session_id"]:
+                parts.append(self._buffered_columns_locked())
+
+        if not parts:
+            return _empty_columns()
+
+        columns = {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS}
+        columns = _latest_per_session(columns)
+
+        mask = np.ones(len(columns["session_id"]), dtype=bool)
+        if user_id is not None:
+            mask &= columns["user_id"] == user_id
+        if document_id is not None:
+            mask &= columns["document_id"] == document_id
+        if start_ts is not None:
+            mask &= columns["start"] >= start_ts
+        if end_ts is not None:
+            mask &= columns["start"] <= end_ts
+        return {name: values[mask] for name, values in columns.items()}
+
+    # Maintenance
+
+    def compact(self, day: Optional[date] = None) -> int:
+        """Merge each bucket's segments into one; returns buckets compacted."""
+        with self._lock:
+            self._flush_locked()
+            compacted = self._compact_locked(day)
+
+        if compacted:
+            self.logger.info(f"Compacted {compacted} session store buckets")
+        return compacted
+
+    def _compact_locked(self, day: Optional[date]) -> int:
+        compacted = 0
+        for partition in self._partitions(None, None):
+            if day is not None and partition.name != day.isoformat():
+                continue
+            for bucket_path in sorted(partition.glob("u*")):
+                segments = sorted(bucket_path.glob("segment-*.npz"))
+                if len(segments) < 2:
+                    continue
+
+                parts = self._load_segments(segments)
+                columns = {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS}
+                columns = _latest_per_session(columns)
+                order = np.argsort(columns["start"], kind="stable")
+                columns = {name: values[order] for name, values in columns.items()}
+
+                self._write_segment(bucket_path, columns)
+                for segment in segments:
+                    segment.unlink()
+                compacted += 1
+        return compacted
+
+    def drop_before(self, cutoff: date) -> int:
+        """Drop whole partitions older than ``cutoff``; returns partitions removed."""
+        removed = 0
+        cutoff_day = (cutoff - date(1970, 1, 1)).days
+        for partition in self._partitions(None, cutoff_day - 1):
+            shutil.rmtree(partition)
+            removed += 1
+
+        if removed:
+            self.logger.info(f"Dropped {removed} session store partitions before {cutoff.isoformat()}")
+        return removed
+
+    def maintain(self) -> None:
+        """Compact partitions and apply retention, unless another worker already is."""
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.base_path / ".maintenance.lock", os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            self.compact()
+            if self.retention_days:
+                self.drop_before(datetime.utcnow().date() - timedelta(days=self.retention_days))
+        finally:
+            os.close(fd)
+
+    def start_maintenance(self):
+        """Flush, compact and apply retention periodically on the running loop."""
+        if self._maintainer is None:
+            self._maintainer = asyncio.get_event_loop().create_task(self._maintain_periodically())
+
+    async def stop_maintenance(self):
+        """Stop periodic maintenance and write out whatever is still buffered."""
+        if self._maintainer is not None:
+            self._maintainer.cancel()
+            try:
+                await self._maintainer
+            except asyncio.CancelledError:
+                pass
+            self._maintainer = None
+        self.flush()
+
+    async def _maintain_periodically(self):
+        loop = asyncio.get_event_loop()
+        last_compacted = time.monotonic()
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await loop.run_in_executor(None, self.flush)
+                if time.monotonic() - last_compacted >= self.compact_interval:
+                    last_compacted = time.monotonic()
+                    await loop.run_in_executor(None, self.maintain)
+            except Exception as e:
+                self.logger.error(f"Error maintaining session store: {str(e)}")
+
+    # Startup
+
+    def recover(self) -> int:
+        """Write out rows journaled by workers that exited without flushing."""
+        recovered = 0
+        if not self._journal_dir.is_dir():
+            return recovered
+        for path in sorted(self._journal_dir.glob("*.wal")):
+            if path == self._journal_path:
+                continue
+            try:
+                fd = os.open(path, os.O_RDWR)
+            except FileNotFoundError:
+                continue  # recovered by another worker
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # owner is still running
+                with open(path, "rb") as f:
+                    data = f.read()
+                # A torn final record is dropped
+                rows = np.frombuffer(data[:len(data) - len(data) % JOURNAL_DTYPE.itemsize], dtype=JOURNAL_DTYPE)
+                if rows.size:
+                    self._write_columns({name: rows[name].astype(dtype) for name, dtype in COLUMNS.items()})
+                    recovered += rows.size
+                # Empty it first so a worker that opened it before the unlink replays nothing
+                os.ftruncate(fd, 0)
+                path.unlink()
+            finally:
+                os.close(fd)
+
+        if recovered:
+            self.logger.info(f"Recovered {recovered} journaled session events into session store")
+        return recovered
+
+    def max_session_id(self) -> int:
+        """Highest session id in the store, or 0 when it is empty."""
+        with self._lock:
+            latest = max(self._buffer["session_id"], default=0)
+        for partition in self._partitions(None, None):
+            for part in self._read_partition(partition):
+                if part["session_id"].size:
+                    latest = max(latest, int(part["session_id"].max()))
+        return latest
+
+    def backfill(self, db) -> int:
+        """Load reading sessions newer than any already in the store."""
+        from . import models
+
+        after = self.max_session_id()
+        count = 0
+        query = db.query(models.ReadingSession).filter(
+            models.ReadingSession.id > after
+        ).order_by(models.ReadingSession.id)
+        for session in query.yield_per(1000):
+            self.append_session(session)
+            count += 1
+        self.flush()
+        self.logger.info(f"Backfilled {count} reading sessions after id {after} into session store")
+        return count
+
+
+def _latest_per_session(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Keep only the highest-version row for each session id."""
+    session_ids = columns["session_id"]
+    if len(session_ids) == 0:
+        return columns
+    # Sort by session, then version; ties keep input order, so the later row wins
+    order = np.lexsort((columns["version"], session_ids))
+    ordered = session_ids[order]
+    last = np.append(ordered[1:] != ordered[:-1], True)
+    keep = np.sort(order[last])
+    return {name: values[keep] for name, values in columns.items()}
+
+
+# Vectorized aggregations
+
+def total_duration(columns: Dict[str, np.ndarray]) -> float:
+    return float(columns["duration"].sum())
+
+
+def distinct_documents(columns: Dict[str, np.ndarray]) -> int:
+    return int(np.unique(columns["document_id"]).size)
+
+
+def average(columns: Dict[str, np.ndarray], name: str) -> float:
+    values = columns[name]
+    return float(values.mean()) if values.size else 0.0
+
+
+def daily_series(
+    columns: Dict[str, np.ndarray],
+    name: str,
+    start_day: date,
+    end_day: date,
+    how: str = "sum"
+) -> Dict[str, list]:
+    """Per-day sum or mean of a column between two dates, zero-filled."""
+    first = (start_day - date(1970, 1, 1)).days
+    n_days = (end_day - start_day).days + 1
+    labels = [start_day + timedelta(days=i) for i in range(max(n_days, 0))]
+    if n_days <= 0:
+        return {"labels": [], "values": []}
+
+    offsets = columns["start"] // SECONDS_PER_DAY - first
+    mask = (offsets >= 0) & (offsets < n_days)
+    offsets = offsets[mask]
+    sums = np.bincount(offsets, weights=columns[name][mask], minlength=n_days)
+    if how == "mean":
+        counts = np.bincount(offsets, minlength=n_days)
+        sums = np.divide(sums, counts, out=np.zeros(n_days), where=counts > 0)
+    return {"labels": labels, "values": sums.tolist()}
+
+
+def hour_histogram(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Session counts per hour of day (UTC)."""
+    hours = (columns["start"] % SECONDS_PER_DAY) // 3600
+    return np.bincount(hours, minlength=24)
+
+
+def streak_days(columns: Dict[str, np.ndarray], today: Optional[date] = None) -> int:
+    """Consecutive days with at least one session, ending today."""
+    today = today or datetime.now(timezone.utc).date()
+    active = set(np.unique(columns["start"] // SECONDS_PER_DAY).tolist())
+    day = (today - date(1970, 1, 1)).days
+    streak = 0
+    while day - streak in active:
+        streak += 1
+    return streak
+
+
+def feature_matrix(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Session features in the layout ``AIModel._extract_features`` produces."""
+    return np.column_stack([
+        columns["duration"],
+        columns["pages"].astype(np.float64),
+        np.zeros(columns["duration"].shape),  # completion is tracked per document
+        columns["speed"],
+    ])
+
+
+# Create global session store instance
+session_store = SessionEventStore(
+    settings.SESSION_STORE_DIR,
+    flush_interval=settings.SESSION_STORE_FLUSH_SECONDS,
+    compact_interval=settings.SESSION_STORE_COMPACT_SECONDS,
+    retention_days=settings.SESSION_STORE_RETENTION_DAYS
+)
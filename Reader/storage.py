@@ -3,7 +3,9 @@ import shutil
 from pathlib import Path
 from typing import Optional, BinaryIO
 from fastapi import UploadFile
-from . import logger, monitor
+from . import logger
+from .monitoring import monitor
+from .tracing import tracer
 
 class FileStorage:
     def __init__(self, base_path: str = "storage"):
@@ -15,6 +17,8 @@ class FileStorage:
         """Get the full path for a document file."""
         return self.base_path / str(document_id) / filename
 
+    @tracer.traced("storage.save_file")
+    @monitor.timer("storage.save_file")
     async def save_file(self, document_id: int, file: UploadFile) -> Optional[str]:
         """Save an uploaded file to storage."""
         try:
@@ -28,13 +32,13 @@ class FileStorage:
                 shutil.copyfileobj(file.file, buffer)
 
             self.logger.info(f"File saved: {file_path}")
-            monitor.track_request(0)  # Track storage operation
             return str(file_path)
         except Exception as e:
             self.logger.error(f"Error saving file: {str(e)}")
             monitor.track_error("FileStorage", str(e))
             return None
 
+    @tracer.traced("storage.get_file")
     def get_file(self, document_id: int, filename: str) -> Optional[BinaryIO]:
         """Retrieve a file from storage."""
         try:
@@ -49,6 +53,7 @@ class FileStorage:
             monitor.track_error("FileStorage", str(e))
             return None
 
+    @tracer.traced("storage.delete_file")
     def delete_file(self, document_id: int, filename: str) -> bool:
         """Delete a file from storage."""
         try:
@@ -1,15 +1,26 @@
+import asyncio
+import os
+import uuid
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from ..database import Base, get_db
+from .. import crud, main
+from ..database import Base, _profile_statements, get_async_db, get_db
 from ..main import app
 from ..config import settings
+from ..routers import analytics
+from ..session_store import SessionEventStore
+from ..user_cache import token_cache
 
-# Override database settings for testing
-settings.DATABASE_URL = "sqlite:///:memory:"
+pytest_plugins = ["Reader.tests.query_budget", "Reader.tests.perf"]
+
+# Override database settings for testing; a shared-cache in-memory database
+# so the sync and async engines see the same tables
+settings.DATABASE_URL = "sqlite:///file:reader_test?mode=memory&cache=shared&uri=true"
 
 # Create test database engine
 engine = create_engine(
@@ -17,6 +28,13 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+async_engine = create_async_engine(
+    "sqlite+aiosqlite:///file:reader_test?mode=memory&cache=shared&uri=true",
+    poolclass=StaticPool,
+)
+# Count test statements like production ones, for query budgets
+_profile_statements(engine)
+_profile_statements(async_engine.sync_engine)
 
 # Create test session
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -32,8 +50,40 @@ def override_get_db():
     finally:
         db.close()
 
-# Override database dependency
+TestingAsyncSessionLocal = sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+async def override_get_async_db():
+    """Override async database dependency for testing."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+# Override database dependencies
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+@pytest.fixture(scope="session", autouse=True)
+def dispose_async_engine():
+    """Close the aiosqlite worker thread so the test run can exit."""
+    yield
+    asyncio.run(async_engine.dispose())
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """Users are recreated per test, so cached token snapshots must not leak."""
+    token_cache.clear()
+    yield
+
+@pytest.fixture(autouse=True)
+def session_store(tmp_path, monkeypatch):
+    """Keep segments and journals the app writes under the test's tmp_path."""
+    store = SessionEventStore(str(tmp_path / "session_store"))
+    for module in (crud, main, analytics):
+        monkeypatch.setattr(module, "session_store", store)
+    yield store
+    if store._journal_fd is not None:
+        os.close(store._journal_fd)
 
 @pytest.fixture
 def client():
@@ -64,6 +114,19 @@ def test_user(db_session):
     db_session.refresh(user)
     return user
 
+@pytest.fixture
+def owned_project(db_session):
+    """A project and its owner, committed, with ids safe to read after expiry."""
+    from ..models import Project, User
+    owner = User(email=f"owner-{uuid.uuid4().hex[:8]}@example.com", hashed_password="hashed_password")
+    db_session.add(owner)
+    db_session.flush()
+    project = Project(title="Owned", owner_id=owner.id)
+    db_session.add(project)
+    db_session.commit()
+    db_session.refresh(project)
+    return project
+
 @pytest.fixture
 def test_collection(db_session, test_user):
     """Create test collection."""
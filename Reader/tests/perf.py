@@ -0,0 +1,41 @@
+"""Pytest plugin for wall-clock comparisons too noisy to run on every build.
+
+Tests marked ``@pytest.mark.perf`` are skipped unless ``--perf`` is given.
+Figures passed to the ``perf_report`` fixture are listed in the terminal
+summary instead of being printed mid-run.
+"""
+import pytest
+
+reports = []
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--perf",
+        action="store_true",
+        default=False,
+        help="Run tests marked perf"
+    )
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "perf: wall-clock comparison, only run with --perf")
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("perf"):
+        return
+    skip = pytest.mark.skip(reason="perf test; run with --perf")
+    for item in items:
+        if item.get_closest_marker("perf"):
+            item.add_marker(skip)
+
+@pytest.fixture
+def perf_report(request):
+    """Record one line of figures for the perf summary."""
+    def report(line: str):
+        reports.append(f"{request.node.nodeid}: {line}")
+    return report
+
+def pytest_terminal_summary(terminalreporter):
+    if reports:
+        terminalreporter.section("perf")
+        for line in reports:
+            terminalreporter.write_line(line)
@@ -0,0 +1,54 @@
+"""Pytest plugin failing tests whose requests run more statements than budgeted.
+
+``@pytest.mark.query_budget(5)`` allows at most five statements per request
+made by the test; a dict keyed by ``"METHOD /route/{template}"`` sets
+per-endpoint budgets. ``--query-budget`` applies a default to every test.
+"""
+import pytest
+from ..query_profiler import query_profiler
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--query-budget",
+        type=int,
+        default=None,
+        help="Maximum statements per request for tests without a query_budget marker"
+    )
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(limit): maximum statements per request, an int or a dict keyed by 'METHOD /route'"
+    )
+
+def budget_for(budget, default, endpoint):
+    if isinstance(budget, dict):
+        return budget.get(endpoint, default)
+    return budget if budget is not None else default
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    budget = marker.args[0] if marker else None
+    default = item.config.getoption("query_budget")
+    if budget is None and default is None:
+        yield
+        return
+
+    requests = []
+    query_profiler.listeners.append(requests.append)
+    try:
+        outcome = yield
+    finally:
+        query_profiler.listeners.remove(requests.append)
+    if outcome.excinfo is not None:
+        return
+
+    over = []
+    for stats in requests:
+        limit = budget_for(budget, default, stats.endpoint)
+        if limit is not None and stats.count > limit:
+            repeated = "; ".join(f"{n}x {fp}" for fp, n in stats.fingerprints.most_common(3))
+            over.append(f"{stats.endpoint}: {stats.count} statements, budget {limit} ({repeated})")
+    if over:
+        pytest.fail("Query budget exceeded:\n" + "\n".join(over), pytrace=False)
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from .. import crud
+from ..auth.access import AccessControl
+from ..cache_versions import InMemoryVersionStore
+from ..database import Base
+from ..models import Document, Permission, Project, User
+
+@pytest.fixture
+def db():
+    """A fresh database with two users, each owning one project and document."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = Session(engine)
+    session.add_all([
+        User(id=1, email="owner@example.com", username="owner", is_active=True),
+        User(id=2, email="other@example.com", username="other", is_active=True),
+        User(id=3, email="gone@example.com", username="gone", is_active=False),
+        Project(id=1, title="Mine", owner_id=1),
+        Project(id=2, title="Theirs", owner_id=2),
+        Document(id=1, title="Mine", content="", project_id=1),
+        Document(id=2, title="Theirs", content="", project_id=2),
+        Document(id=3, title="Also theirs", content="", project_id=2),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+def test_role_and_explicit_grants_compile_to_bits():
+    access = AccessControl()
+    compiled = access.compile_permissions("guest", [
+        ("view_analytics", None, None),
+        ("manage_documents", 5, "document"),
+        ("not_a_permission", None, None),
+    ])
+    bits = access.permission_bits
+    assert compiled.mask & bits["view_public_documents"]
+    assert compiled.mask & bits["view_analytics"]
+    assert not compiled.mask & bits["manage_documents"]
+    assert compiled.resources[("document", 5)] == bits["manage_documents"]
+
+def test_active_users_get_the_user_role(db):
+    access = AccessControl()
+
+    assert asyncio.run(access.check_permission(db, 1, "manage_own_documents"))
+    assert not asyncio.run(access.check_permission(db, 1, "manage_documents"))
+    assert not asyncio.run(access.check_permission(db, 3, "manage_own_documents"))
+    assert not asyncio.run(access.check_permission(db, 99, "manage_own_documents"))
+
+def test_grants_and_revokes_recompile(db):
+    access = AccessControl()
+    compiled = access.resolve(db, 1)
+    assert access.resolve(db, 1) is compiled
+
+    assert asyncio.run(access.grant_permission(db, 1, "view_analytics"))
+    assert db.query(Permission).filter(Permission.user_id == 1).count() == 1
+    assert asyncio.run(access.check_permission(db, 1, "view_analytics"))
+
+    assert asyncio.run(access.revoke_permission(db, 1, "view_analytics"))
+    assert not asyncio.run(access.check_permission(db, 1, "view_analytics"))
+
+def test_ownership_goes_through_the_project(db):
+    access = AccessControl()
+
+    assert asyncio.run(access.check_permission(db, 1, "manage_documents", 1, "document"))
+    assert not asyncio.run(access.check_permission(db, 1, "manage_documents", 2, "document"))
+    assert asyncio.run(access.check_permission(db, 2, "manage_documents", 2, "project"))
+
+def test_filter_permitted_combines_ownership_and_grants(db):
+    access = AccessControl()
+    asyncio.run(access.grant_permission(db, 1, "manage_documents", 3, "document"))
+
+    allowed = asyncio.run(access.filter_permitted(db, 1, "manage_documents", "document", [1, 2, 3]))
+    assert allowed == {1, 3}
+
+    asyncio.run(access.grant_permission(db, 2, "manage_documents"))
+    assert access.permitted(db, 2, "manage_documents", "document", [1, 2, 3]) == {1, 2, 3}
+
+def test_document_pages_hold_only_permitted_rows(db):
+    access = AccessControl()
+    asyncio.run(access.grant_permission(db, 1, "manage_documents", 3, "document"))
+    condition = access.document_filter(db, 1, "manage_documents")
+
+    first, cursor = crud.get_documents(db, limit=1, condition=condition)
+    second, cursor = crud.get_documents(db, cursor=cursor, limit=1, condition=condition)
+    assert [document.id for document in first + second] == [1, 3]
+    assert cursor is None
+
+    assert access.document_filter(db, 99, "manage_documents") is not None
+    assert crud.get_documents(db, condition=access.document_filter(db, 99, "manage_documents"))[0] == []
+
+    asyncio.run(access.grant_permission(db, 2, "manage_documents"))
+    assert access.document_filter(db, 2, "manage_documents") is None
+
+def test_revoke_on_one_worker_reaches_the_others(db):
+    store = InMemoryVersionStore()
+    granting, serving = AccessControl(store), AccessControl(store)
+    asyncio.run(granting.grant_permission(db, 1, "view_analytics"))
+    assert serving.has_permission(db, 1, "view_analytics")
+
+    asyncio.run(granting.revoke_permission(db, 1, "view_analytics"))
+    assert not serving.has_permission(db, 1, "view_analytics")
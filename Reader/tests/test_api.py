@@ -6,6 +6,7 @@ from ..database import get_db, Base, engine
 from ..models import User, Document, Collection, DocumentAnalytics
 from ..auth import access_control
 import json
+from prometheus_client import CONTENT_TYPE_LATEST
 from tests.utils import (
     assert_response,
     create_test_user,
@@ -58,6 +59,7 @@ def test_collection(db_session, test_user):
     db_session.commit()
     return collection
 
+@pytest.mark.query_budget({"POST /collections/": 3})
 def test_create_collection(db_session, test_user):
     response = client.post(
         "/collections/",
@@ -72,6 +74,7 @@ def test_create_collection(db_session, test_user):
     assert data["name"] == "New Collection"
     assert data["description"] == "Test description"
 
+@pytest.mark.query_budget({"GET /collections/{collection_id}": 3})
 def test_get_collection(db_session, test_user, test_collection):
     response = client.get(
         f"/collections/{test_collection.id}",
@@ -82,6 +85,7 @@ def test_get_collection(db_session, test_user, test_collection):
     assert data["name"] == test_collection.name
     assert data["description"] == test_collection.description
 
+@pytest.mark.query_budget(5)
 def test_add_document_to_collection(db_session, test_user, test_collection, test_document):
     response = client.post(
         f"/collections/{test_collection.id}/documents/{test_document.id}",
@@ -91,6 +95,7 @@ def test_add_document_to_collection(db_session, test_user, test_collection, test
     data = response.json()
     assert data["message"] == "Document added to collection successfully"
 
+@pytest.mark.query_budget(4)
 def test_process_document(db_session, test_user, test_document):
     response = client.post(
         f"/documents/{test_document.id}/process",
@@ -102,6 +107,7 @@ def test_process_document(db_session, test_user, test_document):
     assert "embeddings" in data
     assert data["status"] == "success"
 
+@pytest.mark.query_budget(4)
 def test_analyze_reading_session(db_session, test_user, test_document):
     analytics = DocumentAnalytics(
         document_id=test_document.id,
@@ -133,20 +139,21 @@ def test_rate_limiting():
     response = client.get("/collections/")
     assert response.status_code == 429  # Too Many Requests
 
+@pytest.mark.query_budget(0)
 def test_health_check(client: TestClient):
     """Test health check endpoint."""
     response = client.get("/health")
     assert_response(response, data={"status": "ok"})
 
+@pytest.mark.query_budget(0)
 def test_metrics_endpoint(client: TestClient):
     """Test metrics endpoint."""
     response = client.get("/metrics")
-    assert_response(response)
-    data = response.json()
-    assert "uptime" in data
-    assert "requests" in data
-    assert "errors" in data
+    assert_response(response, content_type=CONTENT_TYPE_LATEST)
+    assert "# TYPE api_requests_total counter" in response.text
+    assert "# TYPE db_connections_total gauge" in response.text
 
+@pytest.mark.query_budget({"POST /api/v1/users/": 3})
 def test_user_registration(client: TestClient):
     """Test user registration."""
     response = client.post(
@@ -162,6 +169,7 @@ def test_user_registration(client: TestClient):
     assert "email" in data
     assert data["email"] == "newuser@example.com"
 
+@pytest.mark.query_budget({"POST /api/v1/token": 2})
 def test_user_login(client: TestClient):
     """Test user login."""
     # Create test user first
@@ -180,6 +188,7 @@ def test_user_login(client: TestClient):
     assert "token_type" in data
     assert data["token_type"] == "bearer"
 
+@pytest.mark.query_budget(5)
 def test_collection_operations(client: TestClient):
     """Test collection CRUD operations."""
     # Create user and get token
@@ -226,6 +235,7 @@ def test_collection_operations(client: TestClient):
     )
     assert_response(response, status_code=204)
 
+@pytest.mark.query_budget(5)
 def test_document_operations(client: TestClient):
     """Test document CRUD operations."""
     # Create user and get token
@@ -275,6 +285,7 @@ def test_document_operations(client: TestClient):
     )
     assert_response(response, status_code=204)
 
+@pytest.mark.query_budget(5)
 def test_analytics_operations(client: TestClient):
     """Test analytics operations."""
     # Create user and get token
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from ..api_keys import (
+    APIKeyCache,
+    APIKeyValidator,
+    INVALID,
+    generate_api_key,
+    hash_api_key,
+    key_prefix,
+    verify_api_key,
+)
+from ..cache_versions import InMemoryVersionStore
+
+class FakeKeyTable:
+    """Loader that mimics the prefix lookup and counts database hits."""
+
+    def __init__(self):
+        self.rows = []
+        self.lookups = 0
+
+    def add(self, key, expires_at=None):
+        row = SimpleNamespace(
+            id=len(self.rows) + 1,
+            user_id=7,
+            prefix=key_prefix(key),
+            key_hash=hash_api_key(key),
+            expires_at=expires_at,
+            is_active=True,
+        )
+        self.rows.append(row)
+        return row
+
+    def __call__(self, key):
+        self.lookups += 1
+        for row in self.rows:
+            if row.is_active and row.prefix == key_prefix(key) and verify_api_key(key, row.key_hash):
+                return row
+        return None
+
+def test_keys_are_stored_salted():
+    key = generate_api_key()
+    first, second = hash_api_key(key), hash_api_key(key)
+
+    assert key not in first
+    assert first != second
+    assert verify_api_key(key, first) and verify_api_key(key, second)
+    assert not verify_api_key(generate_api_key(), first)
+    assert not verify_api_key(key, "garbage")
+
+def test_valid_key_is_served_from_cache():
+    table = FakeKeyTable()
+    key = generate_api_key()
+    table.add(key)
+    validator = APIKeyValidator(table, APIKeyCache())
+
+    async def scenario():
+        for _ in range(100):
+            assert (await validator.validate(key)).user_id == 7
+
+    asyncio.run(scenario())
+    assert table.lookups == 1
+
+def test_bad_keys_are_negatively_cached():
+    table = FakeKeyTable()
+    validator = APIKeyValidator(table, APIKeyCache())
+
+    async def scenario():
+        for _ in range(10):
+            assert await validator.validate("not-a-key") is None
+
+    asyncio.run(scenario())
+    assert table.lookups == 1
+    assert validator.cache.get(validator.cache.digest("not-a-key")) is INVALID
+
+def test_revocation_invalidates_cached_keys():
+    table = FakeKeyTable()
+    key = generate_api_key()
+    row = table.add(key)
+    validator = APIKeyValidator(table, APIKeyCache())
+
+    async def scenario():
+        assert await validator.validate(key)
+        row.is_active = False
+        validator.cache.bump_version()
+        assert await validator.validate(key) is None
+
+    asyncio.run(scenario())
+    assert table.lookups == 2
+
+def test_revocation_on_one_worker_reaches_the_others():
+    table = FakeKeyTable()
+    key = generate_api_key()
+    row = table.add(key)
+    store = InMemoryVersionStore()
+    serving = APIKeyValidator(table, APIKeyCache(store=store))
+    revoking = APIKeyCache(store=store)
+
+    async def scenario():
+        assert await serving.validate(key)
+        row.is_active = False
+        revoking.bump_version()
+        assert await serving.validate(key) is None
+
+    asyncio.run(scenario())
+    assert table.lookups == 2
+
+def test_expired_key_is_rejected_even_when_cached():
+    table = FakeKeyTable()
+    key = generate_api_key()
+    table.add(key, expires_at=datetime.utcnow() + timedelta(hours=1))
+    validator = APIKeyValidator(table, APIKeyCache())
+    asyncio.run(validator.validate(key))
+
+    digest = validator.cache.digest(key)
+    cached = validator.cache.get(digest)
+    validator.cache.put(digest, cached.__class__(cached.id, cached.user_id, time.time() - 1))
+
+    assert asyncio.run(validator.validate(key)) is None
+
+def test_cache_hit_costs_microseconds():
+    cache = APIKeyCache()
+    table = FakeKeyTable()
+    key = generate_api_key()
+    table.add(key)
+    validator = APIKeyValidator(table, cache)
+
+    async def scenario(iterations):
+        await validator.validate(key)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await validator.validate(key)
+        return (time.perf_counter() - start) / iterations
+
+    assert asyncio.run(scenario(10000)) < 50e-6
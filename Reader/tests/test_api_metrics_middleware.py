@@ -0,0 +1,75 @@
+import asyncio
+import tracemalloc
+
+from ..middleware import api_metrics
+from ..middleware.api_metrics import APIMetricsMiddleware
+
+CHUNK = b"x" * (1024 * 1024)
+
+class RecordingMonitor:
+    def __init__(self):
+        self.calls = {}
+
+    async def track_request(self, endpoint, method, duration, status_code):
+        self.calls["request"] = (duration, status_code)
+
+    async def track_time_to_first_byte(self, endpoint, method, duration):
+        self.calls["ttfb"] = duration
+
+    async def track_response_size(self, endpoint, method, size):
+        self.calls["size"] = size
+
+def streaming_app(chunks, delay=0.0):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        for i in range(chunks):
+            await asyncio.sleep(delay)
+            await send({"type": "http.response.body", "body": CHUNK, "more_body": i < chunks - 1})
+    return app
+
+def run(app):
+    scope = {"type": "http", "method": "GET", "path": "/export", "headers": []}
+    received = {"bytes": 0, "messages": 0}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            received["bytes"] += len(message["body"])
+            received["messages"] += 1
+
+    asyncio.run(app(scope, receive, send))
+    return received
+
+def test_body_passes_through_and_is_counted(monkeypatch):
+    monitor = RecordingMonitor()
+    monkeypatch.setattr(api_metrics, "api_monitor", monitor)
+
+    received = run(APIMetricsMiddleware(streaming_app(5)))
+
+    assert received == {"bytes": 5 * len(CHUNK), "messages": 5}
+    assert monitor.calls["size"] == 5 * len(CHUNK)
+    assert monitor.calls["request"][1] == 200
+
+def test_time_to_first_byte_is_separate_from_duration(monkeypatch):
+    monitor = RecordingMonitor()
+    monkeypatch.setattr(api_metrics, "api_monitor", monitor)
+
+    run(APIMetricsMiddleware(streaming_app(3, delay=0.05)))
+
+    duration = monitor.calls["request"][0]
+    assert monitor.calls["ttfb"] < 0.05 <= duration
+
+def test_large_response_is_never_held_in_memory(monkeypatch):
+    monkeypatch.setattr(api_metrics, "api_monitor", RecordingMonitor())
+    middleware = APIMetricsMiddleware(streaming_app(200))
+
+    tracemalloc.start()
+    try:
+        run(middleware)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < len(CHUNK)
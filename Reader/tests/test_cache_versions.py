@@ -0,0 +1,51 @@
+import time
+
+from ..cache_versions import InMemoryVersionStore, SharedVersion
+
+class RemoteStore(InMemoryVersionStore):
+    """In-memory counters that report themselves remote and count reads."""
+
+    remote = True
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get(self, name):
+        self.reads += 1
+        return super().get(name)
+
+def test_remote_reads_are_reused_within_the_refresh_interval():
+    store = RemoteStore()
+    version = SharedVersion("permissions", store, refresh_interval=60)
+
+    assert [version.get() for _ in range(100)] == [0] * 100
+    assert store.reads == 1
+
+def test_bumps_on_other_workers_are_seen_within_the_refresh_interval():
+    store = RemoteStore()
+    here = SharedVersion("permissions", store, refresh_interval=0.05)
+    there = SharedVersion("permissions", store, refresh_interval=0.05)
+    assert here.get() == 0
+
+    there.bump()
+    assert here.get() == 0
+    time.sleep(0.05)
+    assert here.get() == 1
+
+def test_local_bumps_are_seen_at_once():
+    store = RemoteStore()
+    version = SharedVersion("api_keys", store, refresh_interval=60)
+    version.get()
+
+    assert version.bump() == 1
+    assert version.get() == version.value == 1
+
+def test_in_memory_store_is_read_directly():
+    store = InMemoryVersionStore()
+    here = SharedVersion("api_keys", store)
+    there = SharedVersion("api_keys", store)
+
+    there.bump()
+    assert here.value == here.get() == 1
+    assert not here.due()
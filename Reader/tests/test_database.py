@@ -0,0 +1,47 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from ..config import settings
+from ..database import create_async_db_engine, create_db_engine
+from ..monitor.metrics import metrics
+
+def test_async_engine_from_default_sqlite_url(tmp_path):
+    # Same shape as the default sqlite:///./reader.db, in a scratch directory
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'reader.db'}")
+
+    async def query():
+        async with engine.connect() as conn:
+            return (await conn.execute(text("SELECT 1"))).scalar()
+
+    try:
+        assert isinstance(engine.pool, AsyncAdaptedQueuePool)
+        assert engine.pool.size() == settings.DB_POOL_SIZE
+        assert asyncio.run(query()) == 1
+    finally:
+        asyncio.run(engine.dispose())
+
+def test_pool_saturation_uses_the_engine_overflow(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'reader.db'}", pool_size=2, max_overflow=2)
+    try:
+        with engine.connect():
+            assert metrics.registry.get_sample_value("db_pool_saturation_ratio", {"pool": "sync"}) == 0.25
+    finally:
+        engine.dispose()
+
+def test_async_checkouts_are_timed_and_tracked(tmp_path):
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'reader.db'}", pool_size=2, max_overflow=2)
+    labels = {"pool": "async"}
+    before = metrics.registry.get_sample_value("db_pool_checkout_latency_seconds_count", labels) or 0
+
+    async def checkout():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            return metrics.registry.get_sample_value("db_pool_saturation_ratio", labels)
+
+    try:
+        assert asyncio.run(checkout()) == 0.25
+        assert metrics.registry.get_sample_value("db_pool_checkout_latency_seconds_count", labels) == before + 1
+    finally:
+        asyncio.run(engine.dispose())
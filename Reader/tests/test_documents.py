@@ -6,6 +6,7 @@ from ..models import Document
 
 client = TestClient(app)
 
+@pytest.mark.query_budget({"POST /api/v1/documents/": 4})
 def test_create_document(test_token, test_project):
     response = client.post(
         "/api/v1/documents/",
@@ -22,27 +23,30 @@ def test_create_document(test_token, test_project):
     assert data["content"] == "Test Content"
     assert data["project_id"] == test_project.id
 
+@pytest.mark.query_budget({"GET /api/v1/documents/": 4})
 def test_get_documents(test_token, test_document):
     response = client.get(
         "/api/v1/documents/",
         headers={"Authorization": f"Bearer {test_token}"}
     )
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) > 0
     assert data[0]["title"] == test_document.title
 
+@pytest.mark.query_budget({"GET /api/v1/projects/{project_id}/documents/": 3})
 def test_get_project_documents(test_token, test_project, test_document):
     response = client.get(
         f"/api/v1/projects/{test_project.id}/documents/",
         headers={"Authorization": f"Bearer {test_token}"}
     )
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) > 0
     assert data[0]["title"] == test_document.title
     assert data[0]["project_id"] == test_project.id
 
+@pytest.mark.query_budget({"POST /api/v1/documents/": 2})
 def test_create_document_invalid_project(test_token):
     response = client.post(
         "/api/v1/documents/",
@@ -56,6 +60,7 @@ def test_create_document_invalid_project(test_token):
     assert response.status_code == 404
     assert response.json()["detail"] == "Project not found"
 
+@pytest.mark.query_budget(0)
 def test_create_document_unauthorized():
     response = client.post(
         "/api/v1/documents/",
@@ -66,4 +71,23 @@ def test_create_document_unauthorized():
         }
     )
     assert response.status_code == 401
-    assert response.json()["detail"] == "Not authenticated" 
\ No newline at end of file
+    assert response.json()["detail"] == "Not authenticated"
+
+def test_document_ownership_check_is_one_query(db_session, owned_project):
+    from .. import crud
+    from ..query_profiler import query_profiler
+
+    document = Document(title="Owned Document", content="", project_id=owned_project.id)
+    db_session.add(document)
+    db_session.flush()
+    # Bind ids before the commit expires the instances
+    owner_id, document_id = owned_project.owner_id, document.id
+    db_session.commit()
+
+    with query_profiler.profile() as stats:
+        fetched, fetched_owner_id = crud.get_document_with_owner(db_session, document_id)
+
+    assert stats.count == 1
+    assert fetched.id == document_id
+    assert fetched_owner_id == owner_id
+    assert crud.get_document_with_owner(db_session, 999999) is None
@@ -0,0 +1,113 @@
+import json
+import logging
+import sys
+import threading
+
+from ..logger import JSONFormatter, LogPipeline
+
+class Collector(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.add(threading.current_thread().name)
+
+def pipeline_logger(name, pipeline):
+    log = logging.getLogger(name)
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.handlers = [pipeline.handler]
+    return log
+
+def test_json_formatter_includes_extra_and_exception():
+    log = logging.getLogger("test.json")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = log.makeRecord(
+            "test.json", logging.ERROR, __file__, 1, "Failed %s", ("upload",), True,
+            extra={"path": "/documents", "status_code": 500}
+        )
+        record.exc_info = sys.exc_info()
+
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["message"] == "Failed upload"
+    assert entry["level"] == "ERROR"
+    assert entry["path"] == "/documents" and entry["status_code"] == 500
+    assert "ValueError: boom" in entry["exception"]
+
+def test_handlers_run_on_the_listener_thread():
+    collector = Collector()
+    pipeline = LogPipeline([collector], queue_size=100)
+    log = pipeline_logger("test.pipeline.thread", pipeline)
+    pipeline.start()
+
+    items = ["a"]
+    log.info("items %s", items)
+    items.append("b")  # args are frozen when the record is queued
+    pipeline.stop()
+
+    assert [r.getMessage() for r in collector.records] == ["items ['a']"]
+    assert threading.current_thread().name not in collector.threads
+
+def test_low_severity_records_are_shed_under_overload():
+    collector = Collector()
+    pipeline = LogPipeline([collector], queue_size=10, overload_sample_rate=0.0)
+    log = pipeline_logger("test.pipeline.overload", pipeline)
+
+    # Listener not started yet, so the queue fills up
+    for i in range(20):
+        log.info("request %d", i)
+    assert pipeline.handler.dropped == 12
+
+    pipeline.start()
+    pipeline.queue.join()
+    log.warning("recovered")
+    pipeline.stop()
+
+    messages = [r.getMessage() for r in collector.records]
+    assert messages[:8] == [f"request {i}" for i in range(8)]
+    assert messages[8:] == ["recovered", "Dropped 12 log records under load"]
+
+def test_errors_are_kept_while_info_is_sampled():
+    collector = Collector()
+    pipeline = LogPipeline([collector], queue_size=10, overload_sample_rate=0.0)
+    log = pipeline_logger("test.pipeline.errors", pipeline)
+
+    for i in range(8):
+        log.info("request %d", i)
+    log.info("shed")
+    log.error("kept")
+    pipeline.start()
+    pipeline.stop()
+
+    messages = [r.getMessage() for r in collector.records]
+    assert "kept" in messages and "shed" not in messages
+
+def test_stop_waits_for_room_when_the_queue_is_full():
+    release = threading.Event()
+
+    class Slow(Collector):
+        def emit(self, record):
+            release.wait()
+            super().emit(record)
+
+    slow = Slow()
+    pipeline = LogPipeline([slow], queue_size=5)
+    log = pipeline_logger("test.pipeline.shutdown", pipeline)
+    pipeline.start()
+    for i in range(20):
+        log.error("error %d", i)
+    assert pipeline.queue.full()
+
+    stopper = threading.Thread(target=pipeline.stop)
+    stopper.start()
+    release.set()
+    stopper.join(timeout=5)
+
+    assert not stopper.is_alive()
+    assert pipeline.listener._thread is None
+    assert len(slow.records) == 20 - pipeline.handler.dropped
@@ -0,0 +1,48 @@
+import pytest
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry
+
+from ..monitor.metrics import MetricsRegistry
+
+def names(registry):
+    return {family.name for family in registry.collect()}
+
+def test_declaring_registers_nothing_until_first_use():
+    registry = MetricsRegistry(CollectorRegistry())
+    requests = registry.counter("requests_total", "Requests", ["endpoint"])
+
+    assert names(registry.registry) == set()
+    requests.labels(endpoint="/a").inc()
+    assert names(registry.registry) == {"requests"}
+    assert registry.registry.get_sample_value("requests_total", {"endpoint": "/a"}) == 1
+
+def test_same_declaration_is_shared():
+    registry = MetricsRegistry(CollectorRegistry())
+    first = registry.histogram("duration_seconds", "Duration", ["endpoint"])
+    second = registry.histogram("duration_seconds", "Duration", ["endpoint"])
+
+    first.labels(endpoint="/a").observe(0.2)
+    second.labels(endpoint="/a").observe(0.3)
+    assert first is second
+    assert registry.registry.get_sample_value("duration_seconds_count", {"endpoint": "/a"}) == 2
+
+def test_conflicting_declaration_fails():
+    registry = MetricsRegistry(CollectorRegistry())
+    registry.counter("errors_total", "Errors", ["endpoint"])
+
+    with pytest.raises(ValueError):
+        registry.counter("errors_total", "Errors", ["endpoint", "method"])
+    with pytest.raises(ValueError):
+        registry.gauge("errors_total", "Errors", ["endpoint"])
+
+def test_exposition_is_prometheus_text(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    registry = MetricsRegistry(CollectorRegistry())
+    registry.gauge("pool_saturation_ratio", "Saturation", multiprocess_mode="livemax")
+    registry.counter("requests_total", "Requests", ["endpoint"]).labels(endpoint="/a").inc(3)
+
+    content, content_type = registry.exposition()
+    text = content.decode()
+    assert content_type == CONTENT_TYPE_LATEST
+    # Declared but unused metrics are still exposed
+    assert "# TYPE pool_saturation_ratio gauge" in text
+    assert 'requests_total{endpoint="/a"} 3.0' in text
@@ -0,0 +1,72 @@
+import asyncio
+import random
+import threading
+import time
+
+from ..monitoring import (
+    LatencyHistogram,
+    ShardedCounter,
+    SystemMonitor,
+    bucket_bounds,
+    bucket_index,
+)
+
+def test_bucket_bounds_contain_value():
+    for micros in [0, 1, 127, 128, 129, 255, 256, 1000, 123456, 3_600_000_000]:
+        low, high = bucket_bounds(bucket_index(micros))
+        assert low <= micros < high
+        # Relative bucket width stays under 2%
+        assert micros < 128 or (high - low) / low < 0.02
+
+def test_sharded_counter_is_exact_across_threads():
+    counter = ShardedCounter()
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value == 80000
+
+def test_histogram_quantiles_are_close_to_exact():
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(-4, 1) for _ in range(50000)]
+    histogram = LatencyHistogram()
+    for value in samples:
+        histogram.record(value)
+
+    snapshot = histogram.snapshot()
+    ordered = sorted(samples)
+    for name, q in [("p50", 0.5), ("p95", 0.95), ("p99", 0.99)]:
+        exact = ordered[int(q * len(ordered)) - 1]
+        assert abs(snapshot[name] - exact) / exact < 0.02
+    assert snapshot["count"] == len(samples)
+    assert snapshot["max"] == max(samples)
+
+def test_timer_records_real_durations():
+    monitor = SystemMonitor()
+
+    @monitor.timer("test.sleep")
+    async def sleep():
+        await asyncio.sleep(0.02)
+
+    asyncio.run(sleep())
+    with monitor.timer("test.block"):
+        time.sleep(0.01)
+
+    metrics = monitor.get_metrics()
+    assert metrics["operations"]["test.sleep"]["p50"] >= 0.02
+    assert metrics["operations"]["test.block"]["p50"] >= 0.01
+    # Operations are not requests
+    assert metrics["requests_processed"] == 0
+    assert metrics["response_time"]["count"] == 0
+
+def test_timed_modules_decorate_with_the_system_monitor():
+    from .. import monitoring, storage
+
+    assert storage.monitor is monitoring.monitor
+    assert storage.FileStorage.save_file.__wrapped__
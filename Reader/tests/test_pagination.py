@@ -0,0 +1,84 @@
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Index, Integer, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+from ..exceptions import ValidationError
+from ..pagination import decode_cursor, encode_cursor, keyset_paginate
+
+BenchBase = declarative_base()
+
+class Item(BenchBase):
+    __tablename__ = "pagination_items"
+    __table_args__ = (Index("ix_pagination_items_created_id", "created_at", "id"),)
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+PAGE_SIZE = 10
+TOTAL_ROWS = 100_010  # enough for page 10,000
+START = datetime(2024, 1, 1)
+
+@pytest.fixture(scope="module")
+def item_session():
+    engine = create_engine("sqlite://")
+    BenchBase.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            Item.__table__.insert(),
+            [{"id": i, "created_at": START + timedelta(seconds=i // 2)} for i in range(1, TOTAL_ROWS + 1)]
+        )
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(START, 42)
+    assert decode_cursor(cursor, Item.created_at) == (START, 42)
+
+def test_invalid_cursor_rejected():
+    with pytest.raises(ValidationError):
+        decode_cursor("not-a-cursor", Item.created_at)
+
+def test_pages_cover_rows_in_order_with_ties(item_session):
+    seen = []
+    cursor = None
+    for _ in range(5):
+        items, cursor = keyset_paginate(
+            item_session.query(Item), Item.created_at, Item.id, cursor, PAGE_SIZE
+        )
+        seen.extend(item.id for item in items)
+    assert seen == list(range(1, 5 * PAGE_SIZE + 1))
+
+def test_last_page_has_no_cursor(item_session):
+    last = item_session.query(Item).get(TOTAL_ROWS - 3)
+    items, cursor = keyset_paginate(
+        item_session.query(Item), Item.created_at, Item.id,
+        encode_cursor(last.created_at, last.id), PAGE_SIZE
+    )
+    assert [item.id for item in items] == [TOTAL_ROWS - 2, TOTAL_ROWS - 1, TOTAL_ROWS]
+    assert cursor is None
+
+def _median_page_time(item_session, cursor, runs=20):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        keyset_paginate(item_session.query(Item), Item.created_at, Item.id, cursor, PAGE_SIZE)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def test_deep_page_latency_is_flat(item_session):
+    """Page 10,000 should cost about the same as page 1."""
+    boundary = item_session.query(Item).get(PAGE_SIZE * 9_999)
+    deep_cursor = encode_cursor(boundary.created_at, boundary.id)
+
+    first_page = _median_page_time(item_session, None)
+    deep_page = _median_page_time(item_session, deep_cursor)
+
+    items, _ = keyset_paginate(item_session.query(Item), Item.created_at, Item.id, deep_cursor, PAGE_SIZE)
+    assert items[0].id == PAGE_SIZE * 9_999 + 1
+    assert deep_page < first_page * 3 + 0.002
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from passlib.context import CryptContext
+
+from ..exceptions import ServiceUnavailableError
+from ..passwords import PasswordService, benchmark_login_throughput
+
+def fast_context(time_cost=1, memory_cost=1024):
+    return CryptContext(
+        schemes=["argon2", "bcrypt"],
+        default="argon2",
+        deprecated="auto",
+        argon2__type="ID",
+        argon2__time_cost=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=1,
+        bcrypt__rounds=4,
+    )
+
+def test_bcrypt_hash_is_upgraded_to_argon2id():
+    service = PasswordService(fast_context(), workers=2)
+    legacy = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+
+    verified, new_hash = asyncio.run(service.verify_and_update_async("secret", legacy))
+
+    assert verified
+    assert new_hash.startswith("$argon2id$")
+    assert service.verify("secret", new_hash)
+
+def test_changed_parameters_trigger_rehash():
+    old = PasswordService(fast_context(time_cost=1), workers=1).hash("secret")
+    service = PasswordService(fast_context(time_cost=2), workers=1)
+
+    verified, new_hash = service.verify_and_update("secret", old)
+    assert verified and new_hash
+
+    verified, new_hash = service.verify_and_update("secret", new_hash)
+    assert verified and new_hash is None
+
+def test_excess_pending_work_is_rejected():
+    service = PasswordService(fast_context(), workers=1, max_pending=0)
+    with pytest.raises(ServiceUnavailableError):
+        asyncio.run(service.hash_async("secret"))
+
+def test_login_storm_does_not_stall_event_loop():
+    service = PasswordService(fast_context(time_cost=2, memory_cost=8192), workers=2)
+    result = asyncio.run(benchmark_login_throughput(service, logins=40, concurrency=10))
+
+    assert result["logins_per_second"] > 0
+    # Hashing inline would stall the heartbeat for most of the storm
+    assert result["max_loop_stall_seconds"] < result["elapsed_seconds"] / 2
@@ -24,7 +24,7 @@ def test_get_projects(test_token, test_project):
         headers={"Authorization": f"Bearer {test_token}"}
     )
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) > 0
     assert data[0]["title"] == test_project.title
 
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from ..database import Base
+from ..models import Document, Project, ReadingSession, User
+from ..pagination import _seek, encode_cursor
+
+HOT_TABLES = ("reading_sessions", "documents", "projects")
+START = datetime(2024, 1, 1)
+
+@pytest.fixture(scope="module")
+def seeded_db():
+    """A fresh SQLite database with enough rows for the planner to prefer indexes."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": i, "email": f"user{i}@example.com", "username": f"user{i}", "created_at": START}
+            for i in range(1, 51)
+        ])
+        conn.execute(Project.__table__.insert(), [
+            {"id": i, "title": f"Project {i}", "owner_id": i % 50 + 1,
+             "created_at": START + timedelta(minutes=i)}
+            for i in range(1, 201)
+        ])
+        conn.execute(Document.__table__.insert(), [
+            {"id": i, "title": f"Document {i}", "project_id": i % 200 + 1,
+             "created_at": START + timedelta(minutes=i)}
+            for i in range(1, 2001)
+        ])
+        conn.execute(ReadingSession.__table__.insert(), [
+            {"id": i, "user_id": i % 50 + 1, "document_id": i % 2000 + 1,
+             "start_time": START + timedelta(minutes=i), "duration_minutes": 30, "pages_read": 10}
+            for i in range(1, 20001)
+        ])
+        conn.exec_driver_sql("ANALYZE")
+    session = Session(engine)
+    yield session
+    session.close()
+
+def query_plan(db, query):
+    statement = getattr(query, "statement", query)
+    compiled = statement.compile(dialect=db.bind.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+    return [row[-1] for row in rows]
+
+def assert_indexed(plan):
+    for step in plan:
+        for table in HOT_TABLES:
+            assert not step.startswith(f"SCAN {table}"), f"sequential scan: {plan}"
+        assert "TEMP B-TREE" not in step, f"sort not served by an index: {plan}"
+
+def hot_queries(db):
+    cursor = encode_cursor(START + timedelta(days=3), 4000)
+    since = START + timedelta(days=7)
+    return {
+        "user_sessions_page": _seek(
+            db.query(ReadingSession).filter(ReadingSession.user_id == 7),
+            ReadingSession.start_time, ReadingSession.id, cursor, 100, False
+        ),
+        "document_sessions_page": _seek(
+            db.query(ReadingSession).filter(ReadingSession.document_id == 42),
+            ReadingSession.start_time, ReadingSession.id, None, 100, False
+        ),
+        "user_sessions_since": select(ReadingSession).where(
+            ReadingSession.user_id == 7, ReadingSession.start_time >= since
+        ),
+        "document_session_totals": select(
+            func.count(ReadingSession.id), func.sum(ReadingSession.duration_minutes)
+        ).where(ReadingSession.document_id == 42),
+        "project_documents_page": _seek(
+            db.query(Document).filter(Document.project_id == 9),
+            Document.created_at, Document.id, None, 100, False
+        ),
+        "user_projects_page": _seek(
+            db.query(Project).filter(Project.owner_id == 3),
+            Project.created_at, Project.id, None, 100, False
+        ),
+    }
+
+@pytest.mark.parametrize("name", [
+    "user_sessions_page",
+    "document_sessions_page",
+    "user_sessions_since",
+    "document_session_totals",
+    "project_documents_page",
+    "user_projects_page",
+])
+def test_hot_query_uses_index(seeded_db, name):
+    assert_indexed(query_plan(seeded_db, hot_queries(seeded_db)[name]))
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from ..database import _profile_statements
+from ..middleware.query_profiler import QueryProfilerMiddleware
+from ..query_profiler import fingerprint, query_profiler, query_type
+from .query_budget import budget_for
+
+engine = create_engine("sqlite://")
+_profile_statements(engine)
+
+async def collection(request):
+    with engine.connect() as conn:
+        # One query per document: the N+1 shape
+        for document_id in range(int(request.query_params.get("documents", "1"))):
+            conn.execute(text("SELECT :id AS id"), {"id": document_id}).fetchall()
+    return PlainTextResponse("ok")
+
+app = QueryProfilerMiddleware(Starlette(routes=[Route("/collections/{collection_id:int}", collection)]))
+
+def get(path, query=b""):
+    scope = {
+        "type": "http", "method": "GET", "path": path, "root_path": "",
+        "query_string": query, "headers": []
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    asyncio.run(app(scope, receive, send))
+
+def test_fingerprint_ignores_values():
+    assert fingerprint("SELECT * FROM documents WHERE id = 42") == fingerprint("SELECT * FROM documents  WHERE id = 7")
+    assert fingerprint("SELECT * FROM users WHERE email = 'a@b.c'") == "SELECT * FROM users WHERE email = ?"
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?)") == fingerprint("SELECT * FROM t WHERE id IN (?)")
+    assert fingerprint("SELECT x::text FROM t WHERE id = %(id_1)s") == "SELECT x::text FROM t WHERE id = ?"
+    assert query_type("  select 1") == "select"
+    assert query_type("PRAGMA foreign_keys=ON") == "other"
+
+def test_repeated_statements_are_reported_as_n_plus_one(monkeypatch, caplog):
+    monkeypatch.setattr(query_profiler, "n_plus_one_threshold", 5)
+    finished = []
+    monkeypatch.setattr(query_profiler, "listeners", [finished.append])
+
+    with caplog.at_level(logging.WARNING):
+        get("/collections/1", b"documents=8")
+        get("/collections/2", b"documents=2")
+
+    assert [stats.count for stats in finished] == [8, 2]
+    assert finished[0].endpoint == "GET /collections/{collection_id}"
+    assert finished[0].repeated(5) == [("SELECT ? AS id", 8)]
+    warnings = [r.getMessage() for r in caplog.records if "N+1" in r.getMessage()]
+    assert warnings == ["N+1 query pattern on GET /collections/{collection_id}: 8x SELECT ? AS id"]
+
+def test_slow_statements_are_logged(monkeypatch, caplog):
+    monkeypatch.setattr(query_profiler, "slow_query_ms", 0)
+
+    with caplog.at_level(logging.WARNING):
+        with query_profiler.profile("/job", "TASK") as stats:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1")).fetchall()
+
+    assert stats.slow and stats.slow[0][0] == "SELECT ?"
+    assert any("Slow query" in r.getMessage() and "TASK /job" in r.getMessage() for r in caplog.records)
+
+def test_budget_lookup():
+    assert budget_for(3, None, "GET /a") == 3
+    assert budget_for({"GET /a": 2}, 10, "GET /a") == 2
+    assert budget_for({"GET /a": 2}, 10, "GET /b") == 10
+    assert budget_for(None, None, "GET /a") is None
+
+@pytest.mark.query_budget({"GET /collections/{collection_id}": 3})
+def test_requests_within_budget_pass():
+    get("/collections/1", b"documents=3")
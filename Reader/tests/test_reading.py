@@ -62,7 +62,7 @@ def test_get_user_reading_sessions(test_token, test_document):
         headers={"Authorization": f"Bearer {test_token}"}
     )
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) > 0
     assert data[0]["document_id"] == test_document.id
 
@@ -79,7 +79,7 @@ def test_get_document_reading_sessions(test_token, test_document):
         headers={"Authorization": f"Bearer {test_token}"}
     )
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) > 0
     assert data[0]["document_id"] == test_document.id
 
@@ -123,4 +123,36 @@ def test_update_reading_session_unauthorized():
         json={"pages_read": 10}
     )
     assert response.status_code == 401
-    assert response.json()["detail"] == "Not authenticated" 
\ No newline at end of file
+    assert response.json()["detail"] == "Not authenticated"
+
+def test_all_document_analytics_is_one_query(db_session, owned_project):
+    from .. import crud
+    from ..query_profiler import query_profiler
+
+    read = Document(title="Read", content="", project_id=owned_project.id, total_pages=100)
+    unread = Document(title="Unread", content="", project_id=owned_project.id)
+    db_session.add_all([read, unread])
+    db_session.flush()
+    owner_id, read_id, unread_id = owned_project.owner_id, read.id, unread.id
+    db_session.add_all([
+        ReadingSession(user_id=owner_id, document_id=read_id, duration_minutes=30, pages_read=10),
+        ReadingSession(user_id=owner_id, document_id=read_id, duration_minutes=30, pages_read=20),
+    ])
+    db_session.commit()
+
+    with query_profiler.profile() as stats:
+        items, next_cursor = crud.get_all_document_analytics(db_session, owner_id)
+        analytics = {a.document_id: a for a in items}
+
+    assert stats.count == 1
+    assert next_cursor is None
+    assert analytics[read_id].total_sessions == 2
+    assert analytics[read_id].total_pages_read == 30
+    assert analytics[read_id].completion_percentage == 30
+    assert analytics[read_id].reading_speed_pages_per_hour == 30
+    assert analytics[unread_id].total_sessions == 0
+
+    first, cursor = crud.get_all_document_analytics(db_session, owner_id, limit=1)
+    second, last_cursor = crud.get_all_document_analytics(db_session, owner_id, cursor=cursor, limit=1)
+    assert [a.document_id for a in first + second] == sorted([read_id, unread_id])
+    assert last_cursor is None
@@ -0,0 +1,138 @@
+import asyncio
+import io
+import logging
+import time
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from ..middleware.core import LoggingMiddleware
+from ..request_logging import RequestLogPolicy, RouteSummary
+
+async def document(request):
+    return PlainTextResponse("ok", status_code=int(request.query_params.get("status", "200")))
+
+app = Starlette(routes=[
+    Route("/documents/{document_id:int}", document),
+    Route("/auth/token", document),
+])
+
+async def call(asgi, path, query=b""):
+    scope = {
+        "type": "http", "method": "GET", "path": path, "query_string": query,
+        "headers": [], "client": ("127.0.0.1", 1234), "root_path": "",
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await asgi(scope, receive, send)
+
+def request_lines(caplog):
+    return [r.getMessage() for r in caplog.records if r.name == "reader.api" and not r.getMessage().startswith("Top routes")]
+
+def test_policy_always_logs_errors_and_slow_requests():
+    policy = RequestLogPolicy(sample_rate=0.0, slow_ms=500, route_rates={"/auth": 1.0, "/auth/token/refresh": 0.0})
+
+    assert not policy.should_log("/documents/1", 200, 10)
+    assert policy.should_log("/documents/1", 503, 10)
+    assert policy.should_log("/documents/1", 200, 800)
+    assert policy.should_log("/auth/token", 200, 10)
+    assert not policy.should_log("/auth/token/refresh", 200, 10)
+
+def test_summary_lists_busiest_routes_first():
+    summary = RouteSummary(interval=60, top=2)
+    for _ in range(3):
+        summary.add("GET /documents/{document_id}", 200, 10.0)
+    summary.add("GET /auth/token", 500, 30.0)
+    summary.add("GET /health", 200, 1.0)
+
+    report = summary.flush()
+    assert "(5 requests)" in report
+    assert report.index("GET /documents/{document_id} 3 req 0 err avg 10.0ms") < report.index("GET /auth/token 1 req 1 err")
+    assert "/health" not in report
+    assert summary.flush() is None
+
+def test_sampled_out_requests_only_reach_the_summary(caplog):
+    summary = RouteSummary(interval=3600)
+    middleware = LoggingMiddleware(app, RequestLogPolicy(sample_rate=0.0), summary)
+
+    async def run():
+        for document_id in range(50):
+            await call(middleware, f"/documents/{document_id}")
+        await call(middleware, "/documents/7", b"status=502")
+
+    with caplog.at_level(logging.INFO, logger="reader.api"):
+        asyncio.run(run())
+
+    assert request_lines(caplog) == [r for r in request_lines(caplog) if " 502 " in r]
+    assert len(request_lines(caplog)) == 1
+    assert "GET /documents/{document_id} 51 req 1 err" in summary.flush()
+
+def test_summary_is_logged_on_a_timer_and_at_shutdown(caplog):
+    summary = RouteSummary(interval=0.01)
+
+    def reports():
+        return [r.getMessage() for r in caplog.records if r.getMessage().startswith("Top routes")]
+
+    async def run():
+        summary.start_reporter()
+        summary.add("GET /documents/{document_id}", 200, 5.0)
+        # No further requests arrive; the timer alone emits the line
+        await asyncio.sleep(0.05)
+        assert len(reports()) == 1
+
+        summary.interval = 3600
+        await asyncio.sleep(0.02)
+        summary.add("GET /auth/token", 200, 5.0)
+        await summary.stop_reporter()
+
+    with caplog.at_level(logging.INFO, logger="reader.api"):
+        asyncio.run(run())
+
+    assert len(reports()) == 2
+    assert "GET /auth/token 1 req" in reports()[1]
+
+@pytest.mark.perf
+def test_sampled_logging_keeps_throughput_close_to_logging_off(perf_report):
+    api_logger = logging.getLogger("reader.api")
+    handler = logging.StreamHandler(io.StringIO())
+    saved = api_logger.level, api_logger.propagate
+
+    def throughput(sample_rate, level, n=3000):
+        middleware = LoggingMiddleware(app, RequestLogPolicy(sample_rate=sample_rate), RouteSummary(interval=3600))
+        api_logger.setLevel(level)
+
+        async def run():
+            start = time.perf_counter()
+            for document_id in range(n):
+                await call(middleware, f"/documents/{document_id % 100}")
+            return n / (time.perf_counter() - start)
+
+        asyncio.run(run())
+        return asyncio.run(run())
+
+    api_logger.addHandler(handler)
+    api_logger.propagate = False
+    try:
+        off = throughput(1.0, logging.WARNING)
+        every = throughput(1.0, logging.INFO)
+        sampled = throughput(0.01, logging.INFO)
+    finally:
+        api_logger.removeHandler(handler)
+        api_logger.setLevel(saved[0])
+        api_logger.propagate = saved[1]
+
+    perf_report(
+        f"requests/s: logging off {off:.0f}, every request {every:.0f} ({every / off:.2f}x), "
+        f"1% sampled {sampled:.0f} ({sampled / off:.2f}x)"
+    )
+    # Sampling keeps throughput near logging off, well above logging every request
+    assert sampled / off > 0.8
+    assert sampled > every
@@ -0,0 +1,84 @@
+import asyncio
+
+from prometheus_client import CollectorRegistry, Counter
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from ..middleware import api_metrics
+from ..middleware.api_metrics import APIMetricsMiddleware
+from ..monitor.route_labels import OVERFLOW_LABEL, UNMATCHED_LABEL, RouteLabelResolver
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+app = Starlette(routes=[
+    Route("/documents/{document_id:int}", ok),
+    Route("/documents/{document_id:int}/versions/{version}", ok),
+    Route("/collections/", ok, methods=["POST"]),
+])
+
+def scope_for(path, method="GET"):
+    return {"type": "http", "path": path, "method": method, "app": app, "root_path": ""}
+
+def series_count(counter):
+    return len({
+        tuple(sorted(sample.labels.items()))
+        for metric in counter.collect()
+        for sample in metric.samples
+    })
+
+def test_paths_resolve_to_templates():
+    resolver = RouteLabelResolver()
+
+    assert resolver.resolve(scope_for("/documents/123")) == "/documents/{document_id}"
+    assert resolver.resolve(scope_for("/documents/7/versions/3")) == "/documents/{document_id}/versions/{version}"
+    # Method mismatch still names the route
+    assert resolver.resolve(scope_for("/collections/", "GET")) == "/collections/"
+    assert resolver.resolve(scope_for("/no/such/path")) == UNMATCHED_LABEL
+
+def test_100k_distinct_ids_produce_bounded_series():
+    resolver = RouteLabelResolver(cache_size=1000)
+    registry = CollectorRegistry()
+    requests = Counter("requests", "Requests", ["endpoint"], registry=registry)
+
+    for document_id in range(100000):
+        requests.labels(endpoint=resolver.resolve(scope_for(f"/documents/{document_id}"))).inc()
+        requests.labels(endpoint=resolver.resolve(scope_for(f"/random/{document_id}"))).inc()
+
+    assert series_count(requests) == 2
+    assert len(resolver._cache) == 1000
+
+def test_new_templates_beyond_cap_overflow():
+    resolver = RouteLabelResolver(max_labels=1)
+
+    assert resolver.resolve(scope_for("/documents/1")) == "/documents/{document_id}"
+    assert resolver.resolve(scope_for("/documents/1/versions/2")) == OVERFLOW_LABEL
+    assert resolver.resolve(scope_for("/documents/2")) == "/documents/{document_id}"
+
+def test_middleware_labels_requests_with_template(monkeypatch):
+    endpoints = []
+
+    class RecordingMonitor:
+        async def track_request(self, endpoint, method, duration, status_code):
+            endpoints.append(endpoint)
+
+        async def track_time_to_first_byte(self, endpoint, method, duration):
+            pass
+
+        async def track_response_size(self, endpoint, method, size):
+            pass
+
+    monkeypatch.setattr(api_metrics, "api_monitor", RecordingMonitor())
+    middleware = APIMetricsMiddleware(app.router)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for document_id in range(50):
+        asyncio.run(middleware(scope_for(f"/documents/{document_id}"), receive, send))
+
+    assert set(endpoints) == {"/documents/{document_id}"}
@@ -0,0 +1,179 @@
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+
+from ..session_store import SessionEventStore, daily_series, streak_days
+
+
+def partitions(path):
+    return sorted(p.name for p in path.iterdir() if p.is_dir() and p.name != "journal")
+
+
+def test_latest_event_per_session_wins(tmp_path):
+    store = SessionEventStore(str(tmp_path), flush_threshold=2)
+    start = datetime(2024, 3, 1, 9, 0)
+    store.append(1, user_id=1, document_id=10, start=start)
+    store.append(1, user_id=1, document_id=10, start=start, duration=30, pages=15)
+    store.append(2, user_id=2, document_id=10, start=start, duration=10, pages=2)
+
+    columns = store.scan(user_id=1)
+    assert columns["session_id"].tolist() == [1]
+    assert columns["duration"].tolist() == [30.0]
+    assert columns["speed"].tolist() == [30.0]
+
+
+def test_time_partitioning_and_compaction(tmp_path):
+    store = SessionEventStore(str(tmp_path), flush_threshold=1)
+    day_one = datetime(2024, 3, 1, 9, 0)
+    day_two = day_one + timedelta(days=1)
+    store.append(1, user_id=1, document_id=10, start=day_one, duration=5)
+    store.append(1, user_id=1, document_id=10, start=day_one, duration=20)
+    store.append(2, user_id=1, document_id=11, start=day_two, duration=40)
+
+    assert partitions(tmp_path) == ["2024-03-01", "2024-03-02"]
+    assert len(list((tmp_path / "2024-03-01").glob("u*/segment-*.npz"))) == 2
+
+    assert store.compact() == 1
+    assert len(list((tmp_path / "2024-03-01").glob("u*/segment-*.npz"))) == 1
+    assert store.scan(start=day_one, end=day_one + timedelta(hours=1))["duration"].tolist() == [20.0]
+
+
+def test_newest_version_wins_whatever_the_flush_order(tmp_path):
+    worker_a = SessionEventStore(str(tmp_path))
+    worker_b = SessionEventStore(str(tmp_path))
+    start = datetime(2024, 3, 1, 9, 0)
+    worker_a.append(1, user_id=1, document_id=10, start=start, duration=5, version=1)
+    worker_b.append(1, user_id=1, document_id=10, start=start, duration=30, version=2)
+    worker_b.flush()
+    worker_a.flush()
+
+    assert worker_a.scan(user_id=1)["duration"].tolist() == [30.0]
+    assert worker_a.compact() == 1
+    assert worker_a.scan(user_id=1)["duration"].tolist() == [30.0]
+
+
+def test_user_scan_opens_only_that_users_bucket(tmp_path, monkeypatch):
+    store = SessionEventStore(str(tmp_path), flush_threshold=1, user_buckets=4)
+    start = datetime(2024, 3, 1, 9, 0)
+    for user_id in range(8):
+        store.append(user_id, user_id=user_id, document_id=10, start=start, duration=user_id)
+
+    opened = []
+    real_load = store._load_segments
+    monkeypatch.setattr(store, "_load_segments", lambda segments: opened.extend(segments) or real_load(segments))
+
+    assert sorted(store.scan(user_id=5)["duration"].tolist()) == [5.0]
+    assert {segment.parent.name for segment in opened} == {"u001"}
+    assert len(opened) == 2
+
+
+def test_scan_survives_compaction_between_listing_and_loading(tmp_path, monkeypatch):
+    reader = SessionEventStore(str(tmp_path))
+    compactor = SessionEventStore(str(tmp_path), flush_threshold=1)
+    start = datetime(2024, 3, 1, 9, 0)
+    compactor.append(1, user_id=1, document_id=10, start=start, duration=5)
+    compactor.append(2, user_id=1, document_id=11, start=start, duration=20)
+
+    real_segments = reader._segments
+    listings = []
+
+    def compact_after_listing(partition, user_id=None):
+        segments = real_segments(partition, user_id)
+        listings.append(segments)
+        if len(listings) == 1:
+            compactor.compact()
+        return segments
+
+    monkeypatch.setattr(reader, "_segments", compact_after_listing)
+
+    assert sorted(reader.scan(user_id=1)["duration"].tolist()) == [5.0, 20.0]
+    assert len(listings) == 2
+
+def test_vectorized_aggregations(tmp_path):
+    store = SessionEventStore(str(tmp_path))
+    today = date(2024, 3, 3)
+    for i, days_ago in enumerate([0, 1, 1, 3]):
+        start = datetime.combine(today - timedelta(days=days_ago), datetime.min.time())
+        store.append(i, user_id=1, document_id=i, start=start, duration=10, pages=5)
+
+    columns = store.scan(user_id=1)
+    assert streak_days(columns, today) == 2
+
+    series = daily_series(columns, "duration", today - timedelta(days=3), today)
+    assert series["values"] == [10.0, 0.0, 20.0, 10.0]
+
+
+def test_scan_reads_buffered_rows_without_flushing(tmp_path):
+    store = SessionEventStore(str(tmp_path))
+    store.append(1, user_id=1, document_id=10, start=datetime(2024, 3, 1, 9, 0), duration=15)
+
+    assert store.scan(user_id=1)["duration"].tolist() == [15.0]
+    assert not list(tmp_path.glob("*/u*/segment-*.npz"))
+
+
+def test_journaled_rows_survive_a_crashed_worker(tmp_path):
+    crashed = SessionEventStore(str(tmp_path))
+    crashed.append(1, user_id=1, document_id=10, start=datetime(2024, 3, 1, 9, 0), duration=5)
+    crashed.append(1, user_id=1, document_id=10, start=datetime(2024, 3, 1, 9, 0), duration=25)
+    # The process dies without flushing; its journal lock goes with it
+    os.close(crashed._journal_fd)
+
+    store = SessionEventStore(str(tmp_path))
+    assert store.recover() == 2
+    assert store.scan(user_id=1)["duration"].tolist() == [25.0]
+    assert not list((tmp_path / "journal").glob("*.wal"))
+
+
+def test_live_worker_journal_is_not_recovered(tmp_path):
+    worker = SessionEventStore(str(tmp_path))
+    worker.append(1, user_id=1, document_id=10, start=datetime(2024, 3, 1, 9, 0))
+
+    assert SessionEventStore(str(tmp_path)).recover() == 0
+    worker.flush()
+    assert os.path.getsize(worker._journal_path) == 0
+
+
+def test_maintenance_flushes_compacts_and_applies_retention(tmp_path):
+    store = SessionEventStore(str(tmp_path), flush_interval=0.01, compact_interval=0, retention_days=30)
+    recent = datetime.utcnow() - timedelta(days=1)
+    store.append(1, user_id=1, document_id=10, start=recent, duration=5)
+    store.flush()
+    store.append(1, user_id=1, document_id=10, start=recent, duration=20)
+    store.append(2, user_id=1, document_id=11, start=recent - timedelta(days=90), duration=40)
+
+    async def scenario():
+        store.start_maintenance()
+        await asyncio.sleep(0.1)
+        await store.stop_maintenance()
+
+    asyncio.run(scenario())
+    assert partitions(tmp_path) == [recent.date().isoformat()]
+    assert len(list(tmp_path.glob("*/u*/segment-*.npz"))) == 1
+    assert store.scan(user_id=1)["duration"].tolist() == [20.0]
+    assert store.max_session_id() == 1
+
+
+def test_backfill_loads_only_sessions_missing_from_the_store(tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from ..database import Base
+    from ..models import ReadingSession
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = Session(engine)
+    start = datetime(2024, 3, 1, 9, 0)
+    for duration in (10, 20, 30):
+        db.add(ReadingSession(user_id=1, document_id=10, start_time=start, duration_minutes=duration))
+    db.commit()
+
+    store = SessionEventStore(str(tmp_path))
+    store.append(1, user_id=1, document_id=10, start=start, duration=10)
+    store.flush()
+    try:
+        assert store.backfill(db) == 2
+        assert store.backfill(db) == 0
+    finally:
+        db.close()
+    assert sorted(store.scan(user_id=1)["duration"].tolist()) == [10.0, 20.0, 30.0]
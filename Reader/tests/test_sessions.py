@@ -0,0 +1,217 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from ..auth.session import SessionManager
+from ..auth.session_backends import InMemorySessionBackend, RedisSessionBackend, SessionBackend
+
+class FakeRedis:
+    """Just enough of redis.asyncio for RedisSessionBackend, with call counts."""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = {"set": 0, "get": 0, "delete": 0, "execute": 0}
+
+    async def set(self, key, value, ex=None):
+        self.calls["set"] += 1
+        self.data[key] = (value, ex)
+
+    async def get(self, key):
+        self.calls["get"] += 1
+        entry = self.data.get(key)
+        return entry[0] if entry else None
+
+    async def delete(self, key):
+        self.calls["delete"] += 1
+        return 1 if self.data.pop(key, None) else 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None, xx=False):
+        self.ops.append((key, value, ex, xx))
+
+    async def execute(self):
+        self.redis.calls["execute"] += 1
+        for key, value, ex, xx in self.ops:
+            if xx and key not in self.redis.data:
+                continue
+            self.redis.data[key] = (value, ex)
+
+def session_data(expires_in=timedelta(hours=1)):
+    return {
+        "user_id": 1,
+        "email": "reader@example.com",
+        "provider": None,
+        "created_at": datetime.utcnow(),
+        "expires_at": datetime.utcnow() + expires_in,
+    }
+
+def test_session_is_visible_to_other_workers():
+    redis = FakeRedis()
+    worker_a = SessionManager(RedisSessionBackend(redis))
+    worker_b = SessionManager(RedisSessionBackend(redis))
+
+    async def scenario():
+        await worker_a.backend.set("s1", session_data(), worker_a.ttl_seconds)
+        assert (await worker_b.validate_session("s1"))["user_id"] == 1
+        # Second lookup is served by worker_b's near cache
+        await worker_b.validate_session("s1")
+        assert redis.calls["get"] == 1
+
+        assert await worker_a.invalidate_session("s1")
+        worker_b._near_cache.clear()
+        assert await worker_b.validate_session("s1") is None
+
+    asyncio.run(scenario())
+    assert redis.data == {}
+
+def test_keys_carry_ttl_and_expired_sessions_are_rejected():
+    redis = FakeRedis()
+    manager = SessionManager(RedisSessionBackend(redis))
+
+    async def scenario():
+        await manager.backend.set("old", session_data(timedelta(seconds=-1)), manager.ttl_seconds)
+        assert await manager.validate_session("old") is None
+
+    asyncio.run(scenario())
+    assert "session:old" not in redis.data
+
+    asyncio.run(manager.backend.set("s1", session_data(), manager.ttl_seconds))
+    assert redis.data["session:s1"][1] == manager.ttl_seconds
+
+def test_refreshes_are_written_in_batches():
+    redis = FakeRedis()
+    manager = SessionManager(RedisSessionBackend(redis), refresh_batch_size=10)
+
+    async def scenario():
+        for i in range(25):
+            await manager.backend.set(f"s{i}", session_data(), manager.ttl_seconds)
+        writes = redis.calls["set"]
+        for i in range(25):
+            assert await manager.refresh_session(f"s{i}")
+        assert redis.calls["set"] == writes
+        assert redis.calls["execute"] == 2
+        assert await manager.flush_refreshes() == 5
+
+    asyncio.run(scenario())
+    assert redis.calls["execute"] == 3
+
+def test_memory_backend_purges_without_scanning_live_sessions():
+    backend = InMemorySessionBackend()
+
+    async def scenario():
+        for i in range(1000):
+            await backend.set(f"live{i}", session_data(), 3600)
+        await backend.set("dead", session_data(), 0)
+        start = time.perf_counter()
+        purged = await backend.purge_expired()
+        return purged, time.perf_counter() - start
+
+    purged, elapsed = asyncio.run(scenario())
+    assert purged == 1
+    assert len(backend._entries) == 1000
+    assert elapsed < 0.01
+
+def test_buffered_refresh_wins_over_stale_backend_expiry():
+    redis = FakeRedis()
+    manager = SessionManager(RedisSessionBackend(redis), near_cache_ttl=0, refresh_flush_interval=60)
+
+    async def scenario():
+        await manager.backend.set("s1", session_data(timedelta(minutes=5)), manager.ttl_seconds)
+        assert await manager.refresh_session("s1")
+        # Time passes: the stored expiry lapses before the buffered refresh is flushed
+        await manager.backend.set("s1", session_data(timedelta(seconds=-1)), manager.ttl_seconds)
+        assert await manager.validate_session("s1")
+        assert await manager.flush_refreshes() == 1
+
+    asyncio.run(scenario())
+    assert "session:s1" in redis.data
+
+def test_refresh_near_expiry_is_visible_to_other_workers_at_once():
+    redis = FakeRedis()
+    worker_a = SessionManager(RedisSessionBackend(redis), refresh_flush_interval=60)
+    worker_b = SessionManager(RedisSessionBackend(redis))
+
+    async def scenario():
+        await worker_a.backend.set("s1", session_data(timedelta(seconds=30)), worker_a.ttl_seconds)
+        refreshed = await worker_a.refresh_session("s1")
+        assert worker_a._pending_refresh == {}
+        assert (await worker_b.validate_session("s1"))["expires_at"] == refreshed["expires_at"]
+
+    asyncio.run(scenario())
+
+def test_flusher_writes_refreshes_on_a_timer_and_at_shutdown():
+    redis = FakeRedis()
+    manager = SessionManager(RedisSessionBackend(redis), refresh_flush_interval=0.01)
+
+    async def scenario():
+        await manager.backend.set("s1", session_data(), manager.ttl_seconds)
+        await manager.backend.set("s2", session_data(), manager.ttl_seconds)
+        manager.start_flusher()
+        await manager.refresh_session("s1")
+        await asyncio.sleep(0.05)
+        assert redis.calls["execute"] >= 1
+        assert manager._pending_refresh == {}
+
+        manager.refresh_flush_interval = 600
+        await asyncio.sleep(0.02)
+        await manager.refresh_session("s2")
+        assert "s2" in manager._pending_refresh
+        await manager.stop_flusher()
+        assert manager._pending_refresh == {}
+
+    asyncio.run(scenario())
+
+def test_buffered_refresh_does_not_resurrect_a_session_logged_out_elsewhere():
+    redis = FakeRedis()
+    worker_a = SessionManager(RedisSessionBackend(redis), refresh_flush_interval=60)
+    worker_b = SessionManager(RedisSessionBackend(redis))
+
+    async def scenario():
+        await worker_a.backend.set("s1", session_data(), worker_a.ttl_seconds)
+        assert await worker_a.refresh_session("s1")
+        assert "s1" in worker_a._pending_refresh
+
+        assert await worker_b.invalidate_session("s1")
+        assert await worker_a.flush_refreshes() == 1
+        worker_b._near_cache.clear()
+        assert await worker_b.validate_session("s1") is None
+
+    asyncio.run(scenario())
+    assert "session:s1" not in redis.data
+
+def test_memory_backend_refresh_skips_deleted_sessions():
+    backend = InMemorySessionBackend()
+
+    async def scenario():
+        await backend.set("s1", session_data(), 3600)
+        await backend.set("s2", session_data(), 3600)
+        await backend.delete("s1")
+        await backend.refresh_many({"s1": session_data(), "s2": session_data()}, 3600)
+        return await backend.get("s1"), await backend.get("s2")
+
+    gone, kept = asyncio.run(scenario())
+    assert gone is None
+    assert kept is not None
+
+def test_backend_must_implement_every_operation():
+    class GetOnly(SessionBackend):
+        async def get(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import hmac
+import time
+import tracemalloc
+
+from ..config import settings
+from ..middleware.security import SecurityMiddleware, sign_request
+from ..monitoring import monitor
+
+CHUNK = b"x" * (1024 * 1024)
+
+class BodyDigestApp:
+    """Downstream app that hashes the body it receives, chunk by chunk."""
+
+    def __init__(self):
+        self.calls = 0
+        self.digest = None
+        self.size = 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        digest = hashlib.sha256()
+        more_body = True
+        while more_body:
+            message = await receive()
+            digest.update(message["body"])
+            self.size += len(message["body"])
+            more_body = message["more_body"]
+        self.digest = digest.hexdigest()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+class ReplyFirstApp:
+    """Downstream app that answers without reading the body."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+def sign_chunks(chunk, chunk_count, timestamp):
+    """Same as sign_request over ``chunk * chunk_count``, without building the body."""
+    mac = hmac.new(settings.API_KEY.encode(), b"POST/upload", hashlib.sha256)
+    for _ in range(chunk_count):
+        mac.update(chunk)
+    mac.update(timestamp.encode())
+    return mac.hexdigest()
+
+def run(middleware, chunk, chunk_count, signature=None, content_length=None):
+    timestamp = str(int(time.time()))
+    if signature is None:
+        signature = sign_chunks(chunk, chunk_count, timestamp)
+    headers = [
+        (b"x-api-key", settings.API_KEY.encode()),
+        (b"x-timestamp", timestamp.encode()),
+        (b"x-signature", signature.encode()),
+    ]
+    if content_length is not None:
+        headers.append((b"content-length", str(content_length).encode()))
+    scope = {"type": "http", "method": "POST", "path": "/upload", "headers": headers}
+
+    remaining = chunk_count
+    async def receive():
+        nonlocal remaining
+        remaining -= 1
+        return {"type": "http.request", "body": chunk, "more_body": remaining > 0}
+
+    sent = []
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"]
+
+def test_streaming_signature_matches_client_signature():
+    timestamp = "1700000000"
+    body = CHUNK * 3
+    assert sign_chunks(CHUNK, 3, timestamp) == sign_request(
+        settings.API_KEY, "POST", "/upload", body, timestamp
+    )
+
+def test_valid_signature_reaches_app_with_identical_body():
+    app = BodyDigestApp()
+    middleware = SecurityMiddleware(app, buffer_size=2 * len(CHUNK))
+
+    assert run(middleware, CHUNK, 5) == 200
+    assert app.size == 5 * len(CHUNK)
+    assert app.digest == hashlib.sha256(CHUNK * 5).hexdigest()
+
+def test_bad_signature_never_reaches_app():
+    app = BodyDigestApp()
+    middleware = SecurityMiddleware(app, buffer_size=4 * len(CHUNK))
+
+    failed = monitor.security_checks["failed"].value
+
+    assert run(middleware, CHUNK, 3, signature="0" * 64) == 401
+    assert app.calls == 0
+    assert monitor.security_checks["failed"].value == failed + 1
+
+def test_streamed_body_with_bad_signature_never_completes():
+    app = BodyDigestApp()
+    middleware = SecurityMiddleware(app, buffer_size=len(CHUNK))
+
+    assert run(middleware, CHUNK, 3, signature="0" * 64) == 401
+    # The final chunk is held back, so the app never finishes reading the body
+    assert app.size == 2 * len(CHUNK)
+    assert app.digest is None
+
+def test_unread_body_is_verified_before_the_response():
+    app = ReplyFirstApp()
+    middleware = SecurityMiddleware(app, buffer_size=len(CHUNK))
+
+    assert run(middleware, CHUNK, 3, signature="0" * 64) == 401
+    assert run(middleware, CHUNK, 3) == 200
+    assert app.calls == 2
+
+def test_oversized_body_is_rejected_early():
+    app = BodyDigestApp()
+    middleware = SecurityMiddleware(app, max_body_size=2 * len(CHUNK))
+
+    assert run(middleware, CHUNK, 3, content_length=3 * len(CHUNK)) == 413
+    assert app.calls == 0
+    # Without Content-Length the stream is cut off once it crosses the limit
+    assert run(middleware, CHUNK, 100) == 413
+    assert app.digest is None
+
+def test_memory_stays_flat_for_large_uploads():
+    app = BodyDigestApp()
+    middleware = SecurityMiddleware(app, max_body_size=1 << 30, buffer_size=len(CHUNK))
+
+    tracemalloc.start()
+    try:
+        assert run(middleware, CHUNK, 200) == 200
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert app.size == 200 * len(CHUNK)
+    assert peak < 8 * len(CHUNK)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+
+from sqlalchemy import create_engine, text
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from ..database import _trace_statements
+from ..middleware.tracing import TracingMiddleware
+from ..tracing import CLIENT, parse_traceparent, tracer
+
+engine = create_engine("sqlite://")
+_trace_statements(engine)
+
+@tracer.traced("storage.read")
+def read_file():
+    return b"data"
+
+async def document(request):
+    with engine.connect() as conn:
+        for _ in range(3):
+            conn.execute(text("SELECT 1")).fetchall()
+    read_file()
+    return PlainTextResponse("ok")
+
+app = TracingMiddleware(Starlette(routes=[Route("/documents/{document_id:int}", document)]))
+
+def get(path, headers=()):
+    scope = {
+        "type": "http", "method": "GET", "path": path, "root_path": "",
+        "query_string": b"", "headers": list(headers)
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return dict(sent[0]["headers"])
+
+def keep_everything(monkeypatch, slow_request_ms=60_000):
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    monkeypatch.setattr(tracer, "slow_request_ms", slow_request_ms)
+    tracer.exporter.clear()
+
+def test_parse_traceparent():
+    trace_id, span_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    assert parse_traceparent(f"00-{trace_id}-{span_id}-01") == (trace_id, span_id, True)
+    assert parse_traceparent(f"00-{trace_id}-{span_id}-00") == (trace_id, span_id, False)
+    assert parse_traceparent("00-xyz-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(None) is None
+
+def test_request_records_db_and_storage_spans(monkeypatch):
+    keep_everything(monkeypatch)
+
+    headers = get("/documents/42")
+
+    trace = tracer.exporter.traces()[0]
+    assert headers[b"x-trace-id"].decode() == trace.trace_id
+    assert trace.root.name == "GET /documents/{document_id}"
+    assert trace.root.attributes["http.status_code"] == 200
+    queries = [span for span in trace.spans if span.name == "db.query"]
+    assert len(queries) == 3
+    assert all(span.kind == CLIENT and span.parent_id == trace.root.span_id for span in queries)
+    assert trace.breakdown()["storage.read"]["count"] == 1
+    assert trace.to_otlp("reader")["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == trace.root.name
+
+def test_incoming_traceparent_is_continued(monkeypatch):
+    keep_everything(monkeypatch)
+    trace_id, span_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+    get("/documents/1", [(b"traceparent", f"00-{trace_id}-{span_id}-01".encode())])
+
+    trace = tracer.exporter.get(trace_id)
+    assert trace is not None
+    assert trace.root.parent_id == span_id
+
+def test_unsampled_fast_requests_are_not_kept(monkeypatch):
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+    monkeypatch.setattr(tracer, "slow_request_ms", 60_000)
+    tracer.exporter.clear()
+
+    get("/documents/1")
+
+    assert tracer.exporter.traces() == []
+
+def test_slow_requests_are_logged_with_breakdown(monkeypatch, caplog):
+    keep_everything(monkeypatch, slow_request_ms=0)
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+
+    with caplog.at_level(logging.WARNING):
+        get("/documents/7")
+
+    assert tracer.exporter.traces()
+    message = next(r.getMessage() for r in caplog.records if "Slow request" in r.getMessage())
+    assert "GET /documents/{document_id}" in message
+    assert "db.query=" in message and "/3" in message
+
+def test_spans_outside_a_request_are_noops():
+    with tracer.span("background") as span:
+        assert span is None
+    assert read_file() == b"data"
@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from ..uploads import UploadStore, upload_path
+
+PDF = b"%PDF-1.4\n" + b"0" * 200_000
+
+class CountingReader(io.BytesIO):
+    """Source that records how much each read asked for."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.requested = []
+
+    def read(self, size=-1):
+        self.requested.append(size)
+        return super().read(size)
+
+def leftovers(directory):
+    return [path.name for path in directory.iterdir() if path.name.endswith(".part")]
+
+def test_streams_in_chunks_and_hashes(tmp_path):
+    store = UploadStore(max_size=1_000_000, chunk_size=4096, allowed_types={"application/pdf"})
+    source = CountingReader(PDF)
+
+    stored = store.save(source, str(tmp_path / "docs" / "book.pdf"))
+
+    assert (tmp_path / "docs" / "book.pdf").read_bytes() == PDF
+    assert stored.size == len(PDF)
+    assert stored.sha256 == hashlib.sha256(PDF).hexdigest()
+    assert stored.content_type == "application/pdf"
+    assert set(source.requested) == {4096}
+    assert leftovers(tmp_path / "docs") == []
+
+def test_oversized_upload_stops_reading_and_leaves_nothing(tmp_path):
+    store = UploadStore(max_size=50_000, chunk_size=4096)
+    source = CountingReader(PDF)
+
+    with pytest.raises(HTTPException) as exc:
+        store.save(source, str(tmp_path / "book.pdf"))
+
+    assert exc.value.status_code == 413
+    assert len(source.requested) == 50_000 // 4096 + 1
+    assert not (tmp_path / "book.pdf").exists()
+    assert leftovers(tmp_path) == []
+
+def test_disallowed_type_rejected_on_first_chunk(tmp_path):
+    store = UploadStore(max_size=1_000_000, chunk_size=4096, allowed_types={"image/png"})
+    source = CountingReader(PDF)
+
+    with pytest.raises(HTTPException) as exc:
+        store.save(source, str(tmp_path / "book.pdf"))
+
+    assert exc.value.status_code == 400
+    assert len(source.requested) == 1
+    assert leftovers(tmp_path) == []
+
+def test_failed_upload_keeps_existing_file(tmp_path):
+    destination = tmp_path / "book.pdf"
+    destination.write_bytes(b"previous")
+
+    with pytest.raises(HTTPException):
+        UploadStore(max_size=10, chunk_size=4).save(io.BytesIO(PDF), str(destination))
+
+    assert destination.read_bytes() == b"previous"
+
+def test_save_upload_file(tmp_path):
+    store = UploadStore(max_size=1_000_000, chunk_size=4096)
+    upload = UploadFile("book.pdf", io.BytesIO(PDF))
+
+    stored = asyncio.run(store.save_upload(upload, str(tmp_path / "book.pdf"), {"application/pdf"}))
+
+    assert stored.sha256 == hashlib.sha256(PDF).hexdigest()
+
+@pytest.mark.parametrize("filename", ["../../x/y.pdf", "/etc/passwd", "..", None])
+def test_upload_path_stays_in_directory(tmp_path, filename):
+    path = upload_path(str(tmp_path), filename)
+
+    assert path.parent == tmp_path.resolve()
+    assert ".." not in path.name
+
+def test_upload_path_keeps_only_the_extension(tmp_path):
+    assert upload_path(str(tmp_path), "../notes/book.pdf").suffix == ".pdf"
+    assert upload_path(str(tmp_path), "book.p/df").suffix == ""
@@ -0,0 +1,87 @@
+import time
+from types import SimpleNamespace
+
+from ..user_cache import RequestUserCache, TokenCache, UserSnapshot
+
+def make_user(user_id, email=None):
+    return SimpleNamespace(
+        id=user_id,
+        email=email or f"user{user_id}@example.com",
+        username=None,
+        is_active=True,
+        created_at=None,
+        updated_at=None
+    )
+
+def test_token_cache_returns_snapshot_until_ttl(monkeypatch):
+    cache = TokenCache(ttl_seconds=30)
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    cache.put("token", make_user(1))
+    snapshot = cache.get("token")
+    assert isinstance(snapshot, UserSnapshot)
+    assert snapshot.id == 1
+
+    now[0] += 31
+    assert cache.get("token") is None
+
+def test_token_cache_never_outlives_token_expiry():
+    cache = TokenCache(ttl_seconds=30)
+    cache.put("expired", make_user(1), token_exp=time.time() - 1)
+    assert cache.get("expired") is None
+
+def test_token_cache_evicts_least_recent_and_invalidates_user():
+    cache = TokenCache(ttl_seconds=30, max_entries=2)
+    cache.put("a", make_user(1))
+    cache.put("b", make_user(2))
+    cache.get("a")
+    cache.put("c", make_user(3))
+    assert cache.get("b") is None
+    assert cache.get("a").id == 1
+
+    cache.invalidate_user(1)
+    assert cache.get("a") is None
+    assert cache.get("c").id == 3
+
+def test_request_user_cache_is_scoped_to_request():
+    users = RequestUserCache()
+    user = make_user(7)
+    users.add(user)
+    assert users.get(7) is None
+
+    token = users.begin()
+    users.add(user)
+    assert users.get(7) is user
+    users.end(token)
+    assert users.get(7) is None
+
+def test_get_current_user_returns_its_connection_before_the_handler(tmp_path):
+    import asyncio
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from ..auth import create_access_token, get_current_user
+    from ..database import Base, create_async_db_engine
+    from ..models import User
+    from ..user_cache import token_cache
+
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'reader.db'}")
+    token = create_access_token({"sub": "cached@example.com"})
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as db:
+            db.add(User(email="cached@example.com", hashed_password="hashed_password"))
+            await db.commit()
+
+        async with AsyncSession(engine) as db:
+            user = await get_current_user(token, db)
+            assert not db.in_transaction()
+            assert engine.pool.checkedout() == 0
+        return user
+
+    try:
+        assert asyncio.run(scenario()).email == "cached@example.com"
+    finally:
+        token_cache.clear()
+        asyncio.run(engine.dispose())
@@ -0,0 +1,325 @@
+import asyncio
+import functools
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from . import logger
+from .config import settings
+
+# OpenTelemetry span kinds, as used in OTLP
+INTERNAL = "SPAN_KIND_INTERNAL"
+SERVER = "SPAN_KIND_SERVER"
+CLIENT = "SPAN_KIND_CLIENT"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """``(trace_id, parent_span_id, sampled)`` from a W3C traceparent header."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+class Trace:
+    """All spans recorded in-process for one request."""
+
+    __slots__ = ("trace_id", "sampled", "spans", "dropped", "max_spans")
+
+    def __init__(self, trace_id: str, sampled: bool, max_spans: int):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+        self.dropped = 0
+        self.max_spans = max_spans
+
+    def add(self, span: "Span") -> bool:
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return False
+        self.spans.append(span)
+        return True
+
+    def breakdown(self) -> Dict[str, Dict[str, float]]:
+        """Count and total milliseconds per span name, excluding the root."""
+        totals: Dict[str, Dict[str, float]] = {}
+        for span in self.spans[1:]:
+            entry = totals.setdefault(span.name, {"count": 0, "ms": 0.0})
+            entry["count"] += 1
+            entry["ms"] += span.duration_ms
+        return totals
+
+    @property
+    def root(self) -> "Span":
+        return self.spans[0]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "duration_ms": round(self.root.duration_ms, 3),
+            "sampled": self.sampled,
+            "spans": len(self.spans),
+            "dropped_spans": self.dropped,
+            "breakdown": self.breakdown()
+        }
+
+    def to_otlp(self, service_name: str) -> Dict[str, Any]:
+        """The trace as an OTLP/JSON ExportTraceServiceRequest."""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": service_name}}
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "reader.tracing"},
+                    "spans": [span.to_otlp() for span in self.spans]
+                }]
+            }]
+        }
+
+class Span:
+    """One timed operation, modelled on the OpenTelemetry span."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "attributes",
+                 "start_ns", "end_ns", "status", "_perf_start", "_perf_end")
+
+    def __init__(self, trace: Trace, name: str, kind: str, parent_id: Optional[str],
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes) if attributes else {}
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = "STATUS_CODE_UNSET"
+        self._perf_start = time.perf_counter()
+        self._perf_end = 0.0
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    @property
+    def duration_ms(self) -> float:
+        end = self._perf_end or time.perf_counter()
+        return (end - self._perf_start) * 1000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "STATUS_CODE_ERROR"
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+
+    def end(self) -> None:
+        if not self._perf_end:
+            self._perf_end = time.perf_counter()
+            self.end_ns = self.start_ns + int((self._perf_end - self._perf_start) * 1_000_000_000)
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.trace.sampled else '00'}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status}
+        }
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class RingBufferExporter:
+    """Keep the most recent finished traces in memory for the debug endpoint."""
+
+    def __init__(self, size: int = 200):
+        self._traces: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+
+    def traces(self, limit: int = 50) -> List[Trace]:
+        with self._lock:
+            return list(self._traces)[::-1][:limit]
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            for trace in self._traces:
+                if trace.trace_id == trace_id:
+                    return trace
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+class Tracer:
+    """Per-request tracing with an in-process exporter.
+
+    Every request records its spans, which costs a few microseconds each, so
+    that a slow request can always be logged with its breakdown. Finished
+    traces go to the exporter when head-sampled at ``sample_rate`` (or by an
+    upstream traceparent) or when they exceed ``slow_request_ms``. Spans are
+    only recorded inside a trace; outside one, ``span`` is a no-op.
+    """
+
+    def __init__(
+        self,
+        exporter: RingBufferExporter,
+        enabled: bool = True,
+        sample_rate: float = 0.01,
+        slow_request_ms: float = 1000.0,
+        max_spans: int = 500
+    ):
+        self.exporter = exporter
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slow_request_ms = slow_request_ms
+        self.max_spans = max_spans
+        self.logger = logger.logger
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None,
+                    attributes: Optional[Dict[str, Any]] = None) -> Optional[Span]:
+        """Start a root span, continuing an upstream trace when given one."""
+        if not self.enabled:
+            return None
+        remote = parse_traceparent(traceparent)
+        if remote:
+            trace_id, parent_id, sampled = remote
+        else:
+            trace_id, parent_id = _new_id(16), None
+            sampled = random.random() < self.sample_rate
+        trace = Trace(trace_id, sampled, self.max_spans)
+        root = Span(trace, name, SERVER, parent_id, attributes)
+        trace.add(root)
+        return root
+
+    def finish_trace(self, root: Span) -> None:
+        """End the root span, export the trace if kept and log it if slow."""
+        root.end()
+        trace = root.trace
+        slow = root.duration_ms >= self.slow_request_ms
+        if trace.sampled or slow:
+            self.exporter.export(trace)
+        if slow:
+            breakdown = ", ".join(
+                f"{name}={entry['ms']:.1f}ms/{int(entry['count'])}"
+                for name, entry in sorted(trace.breakdown().items(), key=lambda item: -item[1]["ms"])
+            )
+            self.logger.warning(
+                f"Slow request {root.name} took {root.duration_ms:.1f}ms "
+                f"(trace {trace.trace_id}): {breakdown or 'no spans'}"
+            )
+
+    def start_span(self, name: str, kind: str = INTERNAL,
+                   attributes: Optional[Dict[str, Any]] = None) -> Optional[Span]:
+        """Start a child of the current span without making it current; caller ends it."""
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        span = Span(parent.trace, name, kind, parent.span_id, attributes)
+        return span if parent.trace.add(span) else None
+
+    @contextmanager
+    def span(self, name: str, kind: str = INTERNAL,
+             attributes: Optional[Dict[str, Any]] = None) -> Iterator[Optional[Span]]:
+        """Record a child span around a block and make it current."""
+        span = self.start_span(name, kind, attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    @contextmanager
+    def activate(self, span: Optional[Span]) -> Iterator[Optional[Span]]:
+        """Make an existing span current, e.g. a request's root span."""
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    def traced(self, name: str, kind: str = INTERNAL) -> Callable[[Callable], Callable]:
+        """Decorate a function or coroutine function to run inside a span."""
+        def decorator(fn: Callable) -> Callable:
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name, kind):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name, kind):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def inject(self, headers: Dict[str, str]) -> Dict[str, str]:
+        """Add a traceparent header for an outbound call made in the current span."""
+        span = _current_span.get()
+        if span is not None:
+            headers["traceparent"] = span.traceparent()
+        return headers
+
+# Create global tracer instance
+tracer = Tracer(
+    exporter=RingBufferExporter(settings.TRACE_BUFFER_SIZE),
+    enabled=settings.TRACING_ENABLED,
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    slow_request_ms=settings.TRACE_SLOW_REQUEST_MS,
+    max_spans=settings.TRACE_MAX_SPANS
+)
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Iterable, NamedTuple, Optional
+import magic
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from . import logger
+from .monitoring import monitor
+from .config import settings
+from .tracing import tracer
+
+class StoredUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+    content_type: str
+
+def upload_path(directory: str, filename: Optional[str]) -> Path:
+    """A fresh path directly under ``directory`` for a client-named upload.
+
+    Only the extension of the client's file name is kept, so the name can
+    neither escape ``directory`` nor create directories under it.
+    """
+    suffix = Path(Path(filename or "").name).suffix
+    if not suffix[1:].isalnum():
+        suffix = ""
+    root = Path(directory).resolve()
+    path = (root / f"{uuid.uuid4().hex}{suffix}").resolve()
+    if path.parent != root:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file name")
+    return path
+
+class UploadWriter:
+    """Write one upload to a temporary file in the destination directory.
+
+    Each chunk is size-checked, hashed and written as it arrives; the MIME
+    type is sniffed from the first ``sniff_size`` bytes. Nothing but the
+    current chunk and that header is held in memory. ``commit`` fsyncs and
+    renames the file into place, so readers never see a partial upload;
+    leaving the ``with`` block without committing removes the temp file.
+    """
+
+    def __init__(self, directory: Path, max_size: int,
+                 allowed_types: Optional[Iterable[str]] = None, sniff_size: int = 2048):
+        self.max_size = max_size
+        self.allowed_types = set(allowed_types) if allowed_types is not None else None
+        self.sniff_size = sniff_size
+        self.size = 0
+        self.content_type: Optional[str] = None
+        self._hash = hashlib.sha256()
+        self._head = bytearray()
+        # Same directory as the destination, so the final rename is atomic
+        fd, self.temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+        self._committed = False
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File exceeds the {self.max_size} byte limit"
+            )
+        if self.content_type is None:
+            self._head += chunk[:self.sniff_size - len(self._head)]
+            if len(self._head) >= self.sniff_size:
+                self._sniff()
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def _sniff(self) -> None:
+        self.content_type = magic.from_buffer(bytes(self._head), mime=True)
+        self._head = bytearray()
+        if self.allowed_types is not None and self.content_type not in self.allowed_types:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File type {self.content_type} not allowed"
+            )
+
+    def commit(self, destination: Path) -> StoredUpload:
+        """Make the upload durable and move it to ``destination``."""
+        if self.content_type is None:
+            # Shorter than the sniff window
+            self._sniff()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_path, destination)
+        self._committed = True
+        return StoredUpload(str(destination), self.size, self._hash.hexdigest(), self.content_type)
+
+    def abort(self) -> None:
+        self._file.close()
+        try:
+            os.unlink(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "UploadWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if not self._committed:
+            self.abort()
+
+class UploadStore:
+    """Stream uploads to disk in fixed-size chunks with bounded memory."""
+
+    def __init__(self, max_size: int = 10485760, chunk_size: int = 64 * 1024,
+                 allowed_types: Optional[Iterable[str]] = None):
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.allowed_types = allowed_types
+        self.logger = logger.logger
+
+    @tracer.traced("uploads.save")
+    @monitor.timer("uploads.save")
+    def save(self, source: BinaryIO, destination: str,
+             allowed_types: Optional[Iterable[str]] = None) -> StoredUpload:
+        """Copy ``source`` to ``destination``, rejecting oversized or disallowed files.
+
+        Raises HTTPException with 413 or 400; the destination is left untouched.
+        """
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with UploadWriter(
+            destination.parent,
+            self.max_size,
+            allowed_types if allowed_types is not None else self.allowed_types
+        ) as writer:
+            while True:
+                chunk = source.read(self.chunk_size)
+                if not chunk:
+                    break
+                writer.write(chunk)
+            stored = writer.commit(destination)
+        self.logger.info(f"Upload saved: {stored.path} ({stored.size} bytes, {stored.content_type})")
+        return stored
+
+    async def save_upload(self, file: UploadFile, destination: str,
+                          allowed_types: Optional[Iterable[str]] = None) -> StoredUpload:
+        """``save`` for an UploadFile, off the event loop."""
+        await file.seek(0)
+        return await run_in_threadpool(self.save, file.file, destination, allowed_types)
+
+# Create global upload store instance
+upload_store = UploadStore(
+    max_size=settings.MAX_FILE_SIZE,
+    chunk_size=settings.UPLOAD_CHUNK_SIZE,
+    allowed_types=settings.ALLOWED_DOCUMENT_TYPES
+)
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from .config import settings
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Read-only copy of the user columns routes need, safe to share across requests."""
+    id: int
+    email: str
+    username: Optional[str] = None
+    is_active: bool = True
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=bool(user.is_active),
+            created_at=user.created_at,
+            updated_at=user.updated_at
+        )
+
+
+class TokenCache:
+    """Process-level LRU of decoded bearer tokens to user snapshots.
+
+    Entries live for ``ttl_seconds`` or until the token expires, whichever is
+    sooner, so a deactivated user is locked out within one TTL at most.
+    """
+
+    def __init__(self, ttl_seconds: int = 30, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[UserSnapshot]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            snapshot, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return snapshot
+
+    def put(self, token: str, user, token_exp: Optional[float] = None) -> UserSnapshot:
+        """Cache ``user`` for ``token``; ``token_exp`` is the JWT ``exp`` claim."""
+        snapshot = user if isinstance(user, UserSnapshot) else UserSnapshot.from_user(user)
+        if self.ttl_seconds <= 0:
+            return snapshot
+
+        lifetime = self.ttl_seconds
+        if token_exp is not None:
+            lifetime = min(lifetime, token_exp - time.time())
+        if lifetime <= 0:
+            return snapshot
+
+        with self._lock:
+            self._entries[token] = (snapshot, time.monotonic() + lifetime)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached token for a user, e.g. after deactivation."""
+        with self._lock:
+            for token in [t for t, (s, _) in self._entries.items() if s.id == user_id]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RequestUserCache:
+    """Identity map of users loaded during the current request.
+
+    ``begin`` installs a fresh map in a context variable; FastAPI copies the
+    context into threadpool workers, so sync handlers and dependencies share
+    the same map. Outside a request nothing is cached.
+    """
+
+    def __init__(self):
+        self._users: ContextVar[Optional[Dict[int, Any]]] = ContextVar("request_users", default=None)
+
+    def begin(self) -> Token:
+        return self._users.set({})
+
+    def end(self, token: Token) -> None:
+        self._users.reset(token)
+
+    def get(self, user_id: int):
+        users = self._users.get()
+        return users.get(user_id) if users is not None else None
+
+    def add(self, user) -> None:
+        users = self._users.get()
+        if users is not None and user is not None:
+            users[user.id] = user
+
+
+# Create global user cache instances
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_TTL_SECONDS, settings.AUTH_TOKEN_CACHE_SIZE)
+request_users = RequestUserCache()
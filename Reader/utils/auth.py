@@ -1,10 +1,8 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from ..config import settings
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from ..passwords import pwd_context
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -6,10 +6,19 @@ from typing import Optional, BinaryIO
 import magic
 from fastapi import UploadFile
 import logging
+from ..tracing import tracer
+from ..uploads import upload_store
 
 logger = logging.getLogger(__name__)
 
 class FileStorage:
+    ALLOWED_TYPES = {
+        'image/jpeg',
+        'image/png',
+        'image/gif',
+        'image/webp'
+    }
+
     def __init__(self, base_path: str = "storage"):
         self.base_path = Path(base_path)
         self._ensure_directories()
@@ -29,43 +38,22 @@ class FileStorage:
         ext = Path(original_filename).suffix
         return f"{uuid.uuid4()}{ext}"
     
-    def _validate_file_type(self, file_path: Path) -> bool:
-        """Validate file type using python-magic."""
-        try:
-            file_type = magic.from_file(str(file_path), mime=True)
-            allowed_types = {
-                'image/jpeg',
-                'image/png',
-                'image/gif',
-                'image/webp'
-            }
-            return file_type in allowed_types
-        except Exception as e:
-            logger.error(f"Error validating file type: {e}")
-            return False
-    
+    @tracer.traced("file_storage.save_upload")
     async def save_upload(self, file: UploadFile) -> Optional[str]:
         """Save an uploaded file and return its path."""
         try:
             # Generate unique filename
             filename = self._generate_unique_filename(file.filename)
             file_path = self.base_path / "uploads" / filename
-            
-            # Save file
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
-            
-            # Validate file type
-            if not self._validate_file_type(file_path):
-                os.remove(file_path)
-                return None
-            
-            return str(file_path)
+
+            # Stream to disk; type and size are checked before it is renamed into place
+            stored = await upload_store.save_upload(file, str(file_path), self.ALLOWED_TYPES)
+            return stored.path
         except Exception as e:
             logger.error(f"Error saving upload: {e}")
             return None
     
+    @tracer.traced("file_storage.save_processed")
     def save_processed(self, source_path: str, filename: str) -> Optional[str]:
         """Save a processed file and return its path."""
         try:
@@ -90,6 +78,7 @@ class FileStorage:
             logger.error(f"Error getting file path: {e}")
             return None
     
+    @tracer.traced("file_storage.delete_file")
     def delete_file(self, filename: str, processed: bool = False) -> bool:
         """Delete a file."""
         try:
@@ -125,6 +114,7 @@ class FileStorage:
             logger.error(f"Error getting file size: {e}")
             return None
     
+    @tracer.traced("file_storage.get_file_metadata")
     def get_file_metadata(self, filename: str, processed: bool = False) -> Optional[dict]:
         """Get metadata about a file."""
         try:
@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
@@ -19,20 +18,9 @@ SECRET_KEY = "your-secret-key-here"  # In production, use environment variable
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """Generate a password hash."""
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a new access token."""
     to_encode = data.copy()
@@ -88,18 +76,22 @@ async def get_current_superuser(
 
 def create_api_key() -> str:
     """Generate a new API key."""
-    # Generate a secure random string
-    import secrets
-    return secrets.token_urlsafe(32)
+    from ..api_keys import generate_api_key
+    return generate_api_key()
 
 def verify_api_key(api_key: str, db: Session) -> Optional[User]:
     """Verify an API key and return the associated user."""
     from config.database import APIKey
-    api_key_obj = db.query(APIKey).filter(
-        APIKey.key == api_key,
+    from ..api_keys import key_prefix, verify_api_key as verify_key_hash
+    candidates = db.query(APIKey).filter(
+        APIKey.prefix == key_prefix(api_key),
         APIKey.is_active == True,
         APIKey.expires_at > datetime.utcnow()
-    ).first()
+    ).all()
+    api_key_obj = next(
+        (candidate for candidate in candidates if verify_key_hash(api_key, candidate.key_hash)),
+        None
+    )
     
     if not api_key_obj:
         return None